@@ -0,0 +1,177 @@
+"""
+Pluggable backends for the response cache (cache_key -> cache entry).
+
+- MemoryCacheBackend: the per-process TTLCache (default).
+- RedisCacheBackend: entries shared by every worker through a
+  Redis-protocol server (L2), with a small short-lived in-process L1 in
+  front so hot keys don't round-trip on every request. Set
+  QUOTE_CACHE_REDIS_URL to enable it; tests can pass a stand-in client.
+
+Entries carry their own fetched_at, so freshness (soft TTL) is judged from
+the entry, not from when a worker last saw it. If L2 is unreachable the
+backend degrades to its L1.
+"""
+
+import os
+import json
+import math
+import logging
+from typing import Dict, Optional
+
+from cachetools import TTLCache
+
+from quote_cache import CACHE_HARD_TTL
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+QUOTE_CACHE_REDIS_URL = os.getenv('QUOTE_CACHE_REDIS_URL')
+QUOTE_CACHE_MAX_SIZE = int(os.getenv('QUOTE_CACHE_MAX_SIZE', '2048'))
+# L1 entries are only kept briefly so refreshes by other workers show up quickly
+QUOTE_CACHE_L1_TTL = float(os.getenv('QUOTE_CACHE_L1_TTL', '5'))
+QUOTE_CACHE_L1_SIZE = int(os.getenv('QUOTE_CACHE_L1_SIZE', '512'))
+
+
+class CountingTTLCache(TTLCache):
+    """TTLCache that counts entries dropped for space (evictions) or age (expirations)."""
+
+    def __init__(self, maxsize, ttl, **kwargs):
+        super().__init__(maxsize, ttl, **kwargs)
+        self.evictions = 0
+        self.expirations = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.expirations += len(expired)
+        return expired
+
+
+class MemoryCacheBackend:
+    name = "memory"
+
+    def __init__(self, maxsize: int = QUOTE_CACHE_MAX_SIZE, ttl: float = CACHE_HARD_TTL):
+        self.entries = CountingTTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Dict]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    async def set(self, key: str, entry: Dict):
+        self.entries[key] = entry
+
+    def peek(self, key: str) -> Optional[Dict]:
+        """Local lookup without touching stats or the network."""
+        return self.entries.get(key)
+
+    def get_stats(self) -> Dict:
+        return {
+            "backend": self.name,
+            "size": len(self.entries),
+            "max_size": self.entries.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.entries.evictions,
+            "expirations": self.entries.expirations,
+        }
+
+    def counters(self) -> Dict[str, Dict[str, int]]:
+        """Event counters per cache layer (for /metrics)."""
+        return {"memory": {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.entries.evictions,
+            "expirations": self.entries.expirations,
+        }}
+
+
+class RedisCacheBackend:
+    """Shared L2 in a Redis-protocol server behind a per-process L1."""
+
+    name = "redis"
+
+    def __init__(self,
+                 client,
+                 ttl: float = CACHE_HARD_TTL,
+                 l1_ttl: float = QUOTE_CACHE_L1_TTL,
+                 l1_maxsize: int = QUOTE_CACHE_L1_SIZE,
+                 prefix: str = "remitbuddy:quote:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.l1 = MemoryCacheBackend(maxsize=l1_maxsize, ttl=l1_ttl)
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+
+    async def get(self, key: str) -> Optional[Dict]:
+        entry = self.l1.peek(key)
+        if entry is not None:
+            self.l1.hits += 1
+            return entry
+        self.l1.misses += 1
+
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            self.l2_errors += 1
+            logger.warning(f"Shared quote cache unavailable: {type(e).__name__} - {e}")
+            return None
+
+        if raw is None:
+            self.l2_misses += 1
+            return None
+        self.l2_hits += 1
+        entry = json.loads(raw)
+        await self.l1.set(key, entry)
+        return entry
+
+    async def set(self, key: str, entry: Dict):
+        await self.l1.set(key, entry)
+        try:
+            await self.client.set(self.prefix + key, json.dumps(entry, ensure_ascii=False), ex=math.ceil(self.ttl))
+        except Exception as e:
+            self.l2_errors += 1
+            logger.warning(f"Failed to write shared quote cache: {type(e).__name__} - {e}")
+
+    def peek(self, key: str) -> Optional[Dict]:
+        return self.l1.peek(key)
+
+    def get_stats(self) -> Dict:
+        return {
+            "backend": self.name,
+            "l1": self.l1.get_stats(),
+            "l2_hits": self.l2_hits,
+            "l2_misses": self.l2_misses,
+            "l2_errors": self.l2_errors,
+        }
+
+    def counters(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "l1": self.l1.counters()["memory"],
+            "l2": {"hits": self.l2_hits, "misses": self.l2_misses, "errors": self.l2_errors},
+        }
+
+
+def create_cache_backend(redis_url: Optional[str] = QUOTE_CACHE_REDIS_URL):
+    """Shared backend when a Redis URL is configured (and redis is installed), else in-memory."""
+    if redis_url:
+        if aioredis is None:
+            logger.warning("QUOTE_CACHE_REDIS_URL is set but the 'redis' package is not installed; using the in-memory quote cache")
+        else:
+            return RedisCacheBackend(aioredis.from_url(redis_url))
+    return MemoryCacheBackend()
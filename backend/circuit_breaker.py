@@ -0,0 +1,157 @@
+"""
+Per-provider circuit breakers.
+
+Generalizes HanpassConnectionTracker's consecutive-failure detection to
+every provider:
+- closed: calls go through; consecutive failures are counted
+- open: the provider is skipped instantly until the open period ends
+- half-open: one probe call at a time (at most one per probe interval);
+  success closes the circuit, failure reopens it with a longer open period
+"""
+
+import os
+import time
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+BREAKER_OPEN_SECONDS = float(os.getenv('BREAKER_OPEN_SECONDS', '30'))
+BREAKER_MAX_OPEN_SECONDS = float(os.getenv('BREAKER_MAX_OPEN_SECONDS', '600'))
+BREAKER_PROBE_INTERVAL = float(os.getenv('BREAKER_PROBE_INTERVAL', '5'))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 open_seconds: float = BREAKER_OPEN_SECONDS,
+                 max_open_seconds: float = BREAKER_MAX_OPEN_SECONDS,
+                 probe_interval: float = BREAKER_PROBE_INTERVAL):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.probe_interval = probe_interval
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.current_open_seconds = open_seconds
+        self.open_until = 0.0
+        self.last_probe_time = 0.0
+        self.probe_in_flight = False
+        self.total_requests = 0
+        self.successful_requests = 0
+        self.skipped_requests = 0
+
+    def allow_request(self) -> bool:
+        """True if a call may go upstream now (claims the probe slot when half-open)."""
+        current_time = time.time()
+
+        if self.state == OPEN:
+            if current_time < self.open_until:
+                self.skipped_requests += 1
+                return False
+            self.state = HALF_OPEN
+            logger.info(f"Circuit for {self.name} half-open, probing")
+
+        if self.state == HALF_OPEN:
+            if self.probe_in_flight or current_time - self.last_probe_time < self.probe_interval:
+                self.skipped_requests += 1
+                return False
+            self.probe_in_flight = True
+            self.last_probe_time = current_time
+
+        return True
+
+    def record_success(self):
+        self.total_requests += 1
+        self.successful_requests += 1
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+        self.current_open_seconds = self.open_seconds
+
+    def record_failure(self):
+        self.total_requests += 1
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+
+        if self.state == HALF_OPEN:
+            # Probe failed: reopen for longer
+            self.current_open_seconds = min(self.current_open_seconds * 2, self.max_open_seconds)
+            self._open()
+        elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def record_neutral(self):
+        """The call finished without telling us anything (e.g. unsupported route)."""
+        self.probe_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self.open_until = time.time() + self.current_open_seconds
+        logger.warning(f"⚠️ Circuit for {self.name} opened for {int(self.current_open_seconds)}s "
+                       f"after {self.consecutive_failures} consecutive failures")
+
+    def reset(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.current_open_seconds = self.open_seconds
+        self.probe_in_flight = False
+
+    def get_stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_remaining_seconds": max(0, int(self.open_until - time.time())) if self.state == OPEN else 0,
+            "total_requests": self.total_requests,
+            "successful_requests": self.successful_requests,
+            "success_rate": f"{(self.successful_requests / max(self.total_requests, 1)) * 100:.1f}%",
+            "skipped_requests": self.skipped_requests,
+        }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per provider."""
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, provider: str) -> CircuitBreaker:
+        breaker = self.breakers.get(provider)
+        if breaker is None:
+            breaker = self.breakers[provider] = CircuitBreaker(provider)
+        return breaker
+
+    def allow_request(self, provider: str) -> bool:
+        return self.get(provider).allow_request()
+
+    def record_result(self, provider: str, success: bool, upstream: bool = True):
+        """
+        Outcome of a dispatched call. Providers are only dispatched on routes
+        they serve, so a call without a quote is a failure. A call answered
+        without reaching the provider (upstream=False) says nothing about its
+        health and can't close a half-open circuit.
+        """
+        breaker = self.get(provider)
+        if not upstream:
+            breaker.record_neutral()
+        elif success:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    def get_stats(self) -> Dict:
+        return {provider: breaker.get_stats() for provider, breaker in self.breakers.items()}
+
+
+# Global circuit breakers
+circuit_breakers = CircuitBreakerRegistry()
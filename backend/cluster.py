@@ -0,0 +1,177 @@
+"""
+Optional cluster mode: route sharding across API nodes.
+
+Every node lists the same peers (CLUSTER_PEERS, base URLs including its
+own CLUSTER_SELF_URL). A consistent-hash ring over those URLs assigns each
+`country:currency` route to one owner node. Only the owner scrapes a
+route; other nodes forward their cache misses to the owner's internal
+quote endpoint and cache the entry it returns.
+
+A peer that fails a forward is skipped for CLUSTER_PEER_RETRY_SECONDS,
+and its routes move to the next node on the ring meanwhile. Adding or
+removing a node only moves the routes adjacent to it on the ring.
+
+Cluster mode stays off unless CLUSTER_SECRET is set: the internal endpoint
+fans out to upstream providers, so it only answers peers that present the
+shared secret.
+"""
+
+import os
+import time
+import asyncio
+import hmac
+import hashlib
+import logging
+from bisect import bisect
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_SELF_URL = os.getenv('CLUSTER_SELF_URL', '').rstrip('/')
+CLUSTER_PEERS = [peer.strip().rstrip('/') for peer in os.getenv('CLUSTER_PEERS', '').split(',') if peer.strip()]
+# Sent with forwarded requests and required by the internal endpoint
+CLUSTER_SECRET = os.getenv('CLUSTER_SECRET', '')
+CLUSTER_VIRTUAL_NODES = int(os.getenv('CLUSTER_VIRTUAL_NODES', '100'))
+CLUSTER_PEER_RETRY_SECONDS = float(os.getenv('CLUSTER_PEER_RETRY_SECONDS', '15'))
+
+CLUSTER_QUOTE_PATH = "/internal/cluster/quote"
+CLUSTER_SECRET_HEADER = "X-Cluster-Secret"
+# Status the internal endpoint answers with when the route has no providers;
+# any other non-200 (a 404/403 from a peer with cluster mode off or a
+# different secret) means the peer can't serve forwards
+CLUSTER_NO_PROVIDERS_STATUS = 204
+
+
+class PeerUnavailableError(Exception):
+    """The owner node could not answer a forwarded request."""
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+
+def route_key(receive_country: str, receive_currency: str) -> str:
+    return f"{receive_country.lower()}:{receive_currency.upper()}"
+
+
+class ClusterRouter:
+    def __init__(self,
+                 self_url: str = CLUSTER_SELF_URL,
+                 peers: List[str] = CLUSTER_PEERS,
+                 virtual_nodes: int = CLUSTER_VIRTUAL_NODES,
+                 secret: str = CLUSTER_SECRET):
+        self.self_url = self_url
+        self.peers = sorted(set(peers) | ({self_url} if self_url else set()))
+        self.secret = secret
+        # peer -> time until which it is skipped
+        self.down_until: Dict[str, float] = {}
+        self.forwarded = 0
+        self.forward_failures = 0
+        self.served_for_peers = 0
+        if self_url and len(self.peers) > 1 and not secret:
+            logger.error("CLUSTER_PEERS is set but CLUSTER_SECRET is empty; cluster mode disabled")
+
+        points: List[Tuple[int, str]] = sorted(
+            (_ring_hash(f"{peer}#{replica}"), peer)
+            for peer in self.peers
+            for replica in range(virtual_nodes)
+        )
+        self.ring_hashes = [point for point, _ in points]
+        self.ring_peers = [peer for _, peer in points]
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.self_url) and len(self.peers) > 1 and bool(self.secret)
+
+    def _is_up(self, peer: str, now: float) -> bool:
+        return peer == self.self_url or self.down_until.get(peer, 0.0) <= now
+
+    def owner_for(self, receive_country: str, receive_currency: str) -> Optional[str]:
+        """Base URL of the route's owner, or None if this node should fetch it."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        start = bisect(self.ring_hashes, _ring_hash(route_key(receive_country, receive_currency)))
+        for offset in range(len(self.ring_peers)):
+            peer = self.ring_peers[(start + offset) % len(self.ring_peers)]
+            if self._is_up(peer, now):
+                return None if peer == self.self_url else peer
+        return None
+
+    def mark_down(self, peer: str):
+        self.down_until[peer] = time.time() + CLUSTER_PEER_RETRY_SECONDS
+        logger.warning(f"Cluster peer {peer} unavailable, skipping it for {int(CLUSTER_PEER_RETRY_SECONDS)}s")
+
+    def check_secret(self, provided: Optional[str]) -> bool:
+        if not self.secret or provided is None:
+            return False
+        return hmac.compare_digest(provided.encode(), self.secret.encode())
+
+    async def fetch_entry(self, session: aiohttp.ClientSession, owner: str,
+                          receive_country: str, receive_currency: str, send_amount: int,
+                          timeout: float) -> Optional[Dict]:
+        """
+        Ask the owner for the route's cache entry. Returns None if the owner
+        has no providers for the route; raises PeerUnavailableError (and
+        marks the owner down) on transport errors or any other status.
+        """
+        self.forwarded += 1
+        params = {
+            "receive_country": receive_country,
+            "receive_currency": receive_currency,
+            "send_amount": str(send_amount),
+        }
+        headers = {CLUSTER_SECRET_HEADER: self.secret} if self.secret else {}
+
+        try:
+            async with session.get(owner + CLUSTER_QUOTE_PATH, params=params, headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status == CLUSTER_NO_PROVIDERS_STATUS:
+                    return None
+                if response.status == 200:
+                    return await response.json()
+                error = f"HTTP {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = f"{type(e).__name__} - {e}"
+
+        self.forward_failures += 1
+        self.mark_down(owner)
+        raise PeerUnavailableError(f"{owner}: {error}")
+
+    @staticmethod
+    def host_of(peer: str) -> str:
+        return urlsplit(peer).netloc
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        return {
+            "enabled": self.enabled,
+            "self": self.self_url or None,
+            "peers": {
+                peer: {"up": self._is_up(peer, now), "ring_share": f"{self._ring_share(peer) * 100:.1f}%"}
+                for peer in self.peers
+            },
+            "forwarded": self.forwarded,
+            "forward_failures": self.forward_failures,
+            "served_for_peers": self.served_for_peers,
+        }
+
+    def _ring_share(self, peer: str) -> float:
+        """Fraction of the hash space owned by a peer."""
+        if not self.ring_hashes:
+            return 0.0
+        space = 2 ** 64
+        owned = 0
+        for index, point in enumerate(self.ring_hashes):
+            previous = self.ring_hashes[index - 1] if index else self.ring_hashes[-1] - space
+            if self.ring_peers[index] == peer:
+                owned += point - previous
+        return owned / space
+
+
+# Global cluster router (disabled unless CLUSTER_SELF_URL and CLUSTER_PEERS are set)
+cluster = ClusterRouter()
@@ -0,0 +1,171 @@
+"""
+Deadline-aware retries and hedged requests.
+
+A provider call that is still running after the provider's observed p90
+latency (upstream round trips only, see latency.py) gets a hedged
+duplicate (optionally through a proxy) and whichever attempt returns a
+quote first wins. A call that fails quickly is retried
+once if the remaining deadline leaves room for a typical response.
+
+Extra attempts are paid from a per-provider token budget: every primary
+call that reached the provider earns HEDGE_MAX_EXTRA_PERCENT / 100 tokens
+(reported by the caller through earn()) and every hedge or retry spends
+one, so hedging never adds more than that share of upstream load.
+Extra attempts refused for lack of tokens are counted as budget_denied,
+those skipped because too little deadline was left as deadline_skipped.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+from latency import ProviderLatency
+
+logger = logging.getLogger(__name__)
+
+HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'true').lower() == 'true'
+HEDGE_MAX_EXTRA_PERCENT = float(os.getenv('HEDGE_MAX_EXTRA_PERCENT', '10'))
+# Unused tokens a provider may bank for bursts
+HEDGE_BUDGET_BURST = float(os.getenv('HEDGE_BUDGET_BURST', '5'))
+HEDGE_PERCENTILE = 0.9
+# Don't start an extra attempt with less than this much deadline left
+HEDGE_MIN_REMAINING = 0.2
+
+
+class HedgeBudget:
+    """Token budget for extra attempts of one provider."""
+
+    def __init__(self, extra_percent: float = HEDGE_MAX_EXTRA_PERCENT, burst: float = HEDGE_BUDGET_BURST):
+        self.earn_rate = extra_percent / 100
+        self.burst = burst
+        self.tokens = 0.0
+
+    def earn(self):
+        self.tokens = min(self.burst, self.tokens + self.earn_rate)
+
+    def take(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class HedgePolicy:
+    def __init__(self, latency: ProviderLatency, enabled: bool = HEDGE_ENABLED):
+        self.latency = latency
+        self.enabled = enabled
+        self.budgets: Dict[str, HedgeBudget] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _budget(self, provider: str) -> HedgeBudget:
+        budget = self.budgets.get(provider)
+        if budget is None:
+            budget = self.budgets[provider] = HedgeBudget()
+        return budget
+
+    def earn(self, provider: str):
+        """Credit the budget for a primary attempt that made an upstream call."""
+        self._budget(provider).earn()
+
+    def _count(self, provider: str, name: str):
+        provider_stats = self.stats.setdefault(provider, {"calls": 0, "hedges": 0, "hedge_wins": 0, "retries": 0,
+                                                          "budget_denied": 0, "deadline_skipped": 0})
+        provider_stats[name] += 1
+
+    async def run(self,
+                  provider: str,
+                  attempt: Callable[[bool], Awaitable[Optional[Dict]]],
+                  deadline: float,
+                  retryable: bool = True) -> Optional[Dict]:
+        """
+        Call attempt(False) and, if policy allows, attempt(True) as a hedge or
+        retry. Returns the first quote, or None once every attempt failed or
+        the deadline (time.monotonic()) passed. If every attempt raised, the
+        last exception is re-raised.
+        """
+        budget = self._budget(provider)
+        self._count(provider, "calls")
+
+        started = time.monotonic()
+        hedge_after = self.latency.percentile(provider, HEDGE_PERCENTILE) if self.enabled else None
+        if hedge_after == float('inf'):
+            hedge_after = None
+        typical = self.latency.percentile(provider, 0.5) or 0.0
+
+        primary = asyncio.ensure_future(attempt(False))
+        attempts = {primary}
+        extra_started = False
+        finished = 0
+        errors = 0
+        last_error = None
+
+        try:
+            while attempts:
+                now = time.monotonic()
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+
+                wait_for = remaining
+                if hedge_after is not None and not extra_started:
+                    wait_for = min(remaining, max(0.0, started + hedge_after - now))
+
+                done, _ = await asyncio.wait(attempts, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    attempts.discard(task)
+                    finished += 1
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        errors += 1
+                        last_error = task.exception()
+                        continue
+                    if task.result():
+                        if task is not primary:
+                            self._count(provider, "hedge_wins")
+                        return task.result()
+
+                if not self.enabled or extra_started:
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if not attempts:
+                    # Fast failure: retry if a typical response still fits
+                    if retryable and remaining > max(typical, HEDGE_MIN_REMAINING):
+                        extra_started = True
+                        if budget.take():
+                            self._count(provider, "retries")
+                            attempts.add(asyncio.ensure_future(attempt(True)))
+                        else:
+                            self._count(provider, "budget_denied")
+                    elif retryable:
+                        self._count(provider, "deadline_skipped")
+                elif not done and hedge_after is not None:
+                    # Primary is slower than p90: hedge
+                    extra_started = True
+                    if remaining <= HEDGE_MIN_REMAINING:
+                        self._count(provider, "deadline_skipped")
+                    elif budget.take():
+                        self._count(provider, "hedges")
+                        attempts.add(asyncio.ensure_future(attempt(True)))
+                    else:
+                        self._count(provider, "budget_denied")
+            if last_error is not None and errors == finished:
+                raise last_error
+            return None
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "max_extra_percent": HEDGE_MAX_EXTRA_PERCENT,
+            "providers": {
+                provider: dict(provider_stats, budget_tokens=round(self._budget(provider).tokens, 2))
+                for provider, provider_stats in self.stats.items()
+            },
+        }
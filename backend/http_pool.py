@@ -0,0 +1,139 @@
+"""
+Upstream HTTP connection pool.
+
+Keeps one long-lived aiohttp session (and connector) per provider host so
+scrapers reuse keep-alive TCP/TLS connections instead of paying a new
+handshake on every quote request. Sessions are opened on startup and closed
+on shutdown from main.py. ProxyManager keeps its own pool, keyed by proxy,
+whose idle sessions are reaped and failing ones discarded. Requests made
+through pooled sessions are traced (see tracing.py).
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Iterable
+
+import aiohttp
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Pool defaults (override with environment variables)
+POOL_LIMIT_PER_HOST = int(os.getenv('UPSTREAM_POOL_LIMIT_PER_HOST', '20'))
+POOL_KEEPALIVE_TIMEOUT = float(os.getenv('UPSTREAM_POOL_KEEPALIVE_TIMEOUT', '60'))
+POOL_DNS_CACHE_TTL = int(os.getenv('UPSTREAM_POOL_DNS_CACHE_TTL', '300'))
+POOL_REQUEST_TIMEOUT = float(os.getenv('UPSTREAM_POOL_REQUEST_TIMEOUT', '10'))
+
+
+class SessionPool:
+    """Application-lifetime aiohttp sessions, one per upstream host."""
+
+    def __init__(self,
+                 limit_per_host: int = POOL_LIMIT_PER_HOST,
+                 keepalive_timeout: float = POOL_KEEPALIVE_TIMEOUT,
+                 dns_cache_ttl: int = POOL_DNS_CACHE_TTL,
+                 request_timeout: float = POOL_REQUEST_TIMEOUT):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.request_timeout = request_timeout
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self.last_used: Dict[str, float] = {}
+        # Discarded sessions waiting for in-flight requests before closing
+        self.closing: Dict[asyncio.Task, aiohttp.ClientSession] = {}
+
+    def _create_session(self, host: str) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit_per_host,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+        )
+        # Cookies are not shared between users' quote requests
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trace_configs=[tracer.trace_config()],
+        )
+
+    def get_session(self, host: str) -> aiohttp.ClientSession:
+        """Return the pooled session for a host, (re)creating it if needed."""
+        session = self.sessions.get(host)
+        if session is None or session.closed:
+            session = self._create_session(host)
+            self.sessions[host] = session
+        self.last_used[host] = time.time()
+        return session
+
+    def discard(self, host: str, grace: float = 0.0):
+        """
+        Drop a host's session so the next get_session opens fresh connections.
+        The old session is closed after grace seconds, letting requests
+        already using it finish.
+        """
+        session = self.sessions.pop(host, None)
+        self.last_used.pop(host, None)
+        if session is None or session.closed:
+            return
+        task = asyncio.get_running_loop().create_task(self._close_later(session, grace))
+        self.closing[task] = session
+        task.add_done_callback(lambda done: self.closing.pop(done, None))
+
+    @staticmethod
+    async def _close_later(session: aiohttp.ClientSession, grace: float):
+        try:
+            await asyncio.sleep(grace)
+        finally:
+            await session.close()
+
+    def reap_idle(self, max_idle: float) -> int:
+        """Close sessions unused for max_idle seconds; returns how many."""
+        cutoff = time.time() - max_idle
+        idle = [host for host, last_used in self.last_used.items() if last_used < cutoff]
+        for host in idle:
+            self.discard(host)
+        return len(idle)
+
+    async def start(self, hosts: Iterable[str]):
+        """Open sessions for the known provider hosts."""
+        for host in hosts:
+            self.get_session(host)
+        logger.info(f"Upstream session pool started for {len(self.sessions)} hosts")
+
+    async def close(self):
+        """Close every pooled session and its connector."""
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        self.last_used.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+        # Close discarded sessions now instead of after their grace period
+        closing = list(self.closing.items())
+        self.closing.clear()
+        for task, session in closing:
+            task.cancel()
+            await session.close()
+        logger.info(f"Upstream session pool closed ({len(sessions)} sessions)")
+
+    def get_stats(self) -> Dict:
+        """Open connection counts per host."""
+        stats = {}
+        for host, session in self.sessions.items():
+            connector = session.connector
+            stats[host] = {
+                "closed": session.closed,
+                "acquired": len(getattr(connector, '_acquired', ())) if connector else 0,
+                "limit_per_host": self.limit_per_host,
+                "idle_seconds": round(time.time() - self.last_used.get(host, time.time()), 1),
+            }
+        return stats
+
+
+# Global session pool instance
+session_pool = SessionPool()
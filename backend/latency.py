@@ -0,0 +1,150 @@
+"""
+Rolling per-provider latency histograms and adaptive timeouts.
+
+Each provider gets a fixed-bucket histogram over a rolling window (the
+current and previous window are combined), so percentiles follow recent
+behaviour at constant memory. A provider's timeout is derived from its
+recent tail latency and capped by the time left in the request.
+
+Only calls that reached the provider are sampled: a scraper that answers
+from local state (a rate model, a cached rate table) calls
+mark_local_answer() so its near-zero duration stays out of the histogram.
+"""
+
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Bucket upper bounds in seconds (last bucket catches everything slower)
+LATENCY_BUCKETS = [0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75,
+                   1.0, 1.25, 1.5, 2.0, 2.5, 3.0, 5.0, float('inf')]
+LATENCY_WINDOW = float(os.getenv('LATENCY_WINDOW', '120'))
+# Percentiles are not trusted below this many samples
+LATENCY_MIN_SAMPLES = int(os.getenv('LATENCY_MIN_SAMPLES', '20'))
+
+# Adaptive timeout = percentile * multiplier, never below the floor
+ADAPTIVE_TIMEOUT_PERCENTILE = float(os.getenv('ADAPTIVE_TIMEOUT_PERCENTILE', '0.99'))
+ADAPTIVE_TIMEOUT_MULTIPLIER = float(os.getenv('ADAPTIVE_TIMEOUT_MULTIPLIER', '1.5'))
+ADAPTIVE_TIMEOUT_MIN = float(os.getenv('ADAPTIVE_TIMEOUT_MIN', '0.5'))
+
+
+
+class AttemptOutcome:
+    """What a scraper reported about one provider attempt while it ran."""
+    __slots__ = ("local",)
+
+    def __init__(self):
+        # Answered without an upstream call
+        self.local = False
+
+
+_attempt_outcome: ContextVar[Optional[AttemptOutcome]] = ContextVar("attempt_outcome", default=None)
+
+
+def start_attempt() -> AttemptOutcome:
+    """Begin a provider attempt in the current task; the caller keeps the outcome."""
+    outcome = AttemptOutcome()
+    _attempt_outcome.set(outcome)
+    return outcome
+
+
+def mark_local_answer():
+    """Called by a scraper that answered without calling its provider."""
+    outcome = _attempt_outcome.get()
+    if outcome is not None:
+        outcome.local = True
+
+
+class LatencyHistogram:
+    def __init__(self, window: float = LATENCY_WINDOW):
+        self.window = window
+        self.current: List[int] = [0] * len(LATENCY_BUCKETS)
+        self.previous: List[int] = [0] * len(LATENCY_BUCKETS)
+        self.window_start = time.time()
+
+    def _rotate(self):
+        now = time.time()
+        elapsed = now - self.window_start
+        if elapsed < self.window:
+            return
+        # After two idle windows nothing recent is left
+        self.previous = self.current if elapsed < 2 * self.window else [0] * len(LATENCY_BUCKETS)
+        self.current = [0] * len(LATENCY_BUCKETS)
+        self.window_start = now
+
+    def record(self, seconds: float):
+        self._rotate()
+        self.current[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def counts(self) -> List[int]:
+        self._rotate()
+        return [c + p for c, p in zip(self.current, self.previous)]
+
+    def count(self) -> int:
+        return sum(self.counts())
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bucket bound below which a fraction q of recent samples fall."""
+        counts = self.counts()
+        total = sum(counts)
+        if total < LATENCY_MIN_SAMPLES:
+            return None
+        target = q * total
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+
+class ProviderLatency:
+    """Latency histograms keyed by provider name."""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, provider: str, seconds: float):
+        histogram = self.histograms.get(provider)
+        if histogram is None:
+            histogram = self.histograms[provider] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def percentile(self, provider: str, q: float) -> Optional[float]:
+        histogram = self.histograms.get(provider)
+        return histogram.percentile(q) if histogram else None
+
+    def timeout_for(self, provider: str, default: float, ceiling: float) -> float:
+        """
+        Timeout for the next call: tail percentile * multiplier once enough
+        samples exist, otherwise the default; never more than ceiling.
+        Timed-out calls are recorded at their cutoff (see record), so the
+        tail does not shrink just because slow calls were cut off.
+        """
+        tail = self.percentile(provider, ADAPTIVE_TIMEOUT_PERCENTILE)
+        if tail is None:
+            timeout = default
+        else:
+            timeout = max(ADAPTIVE_TIMEOUT_MIN, tail * ADAPTIVE_TIMEOUT_MULTIPLIER)
+        return max(0.0, min(timeout, ceiling))
+
+    def get_stats(self) -> Dict:
+        def bound(value):
+            # The overflow bucket has no finite upper bound
+            return None if value is None or value == float('inf') else value
+
+        return {
+            provider: {
+                "samples": histogram.count(),
+                "p50": bound(histogram.percentile(0.5)),
+                "p90": bound(histogram.percentile(0.9)),
+                "p99": bound(histogram.percentile(0.99)),
+            }
+            for provider, histogram in self.histograms.items()
+        }
+
+
+# Global provider latency tracker
+provider_latency = ProviderLatency()
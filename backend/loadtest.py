@@ -0,0 +1,231 @@
+"""
+End-to-end load driver for /api/getRemittanceQuote.
+
+Runs concurrent clients against the API for a fixed duration (or request
+count) over a mix of routes and amounts, then reports throughput, status
+codes, latency percentiles, the per-provider Server-Timing breakdown and,
+with --farm-url, the mock farm's per-provider counters.
+
+Against a running stack:
+    python mock_providers.py --port 8900 &
+    PROVIDER_BASE_URLS='{"*": "http://127.0.0.1:8900"}' RATE_LIMIT=1000000 uvicorn main:app --port 8000 &
+    python loadtest.py --url http://127.0.0.1:8000 --farm-url http://127.0.0.1:8900
+
+Or let the driver start the mock farm and the API itself:
+    python loadtest.py --spawn --duration 30 --concurrency 50 --farm-config farm.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Dict, List, Optional
+
+import aiohttp
+
+QUOTE_PATH = "/api/getRemittanceQuote"
+DEFAULT_ROUTES = "vietnam:VND,philippines:PHP,indonesia:IDR,thailand:THB,nepal:NPR,japan:JPY"
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    timings = {}
+    for entry in header.split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                timings[name] = float(value)
+    return timings
+
+
+class LoadResult:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.quotes = 0
+        self.server_timings: Dict[str, List[float]] = {}
+
+    def record(self, status: str, latency: float, quotes: int = 0, server_timing: str = ""):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.quotes += quotes
+        for name, duration in parse_server_timing(server_timing).items():
+            self.server_timings.setdefault(name, []).append(duration)
+
+    def summary(self, elapsed: float, concurrency: int) -> Dict:
+        latencies = sorted(self.latencies)
+        ok = self.statuses.get("200", 0)
+
+        def distribution(values: List[float]) -> Dict:
+            values = sorted(values)
+            return {
+                "mean": round(sum(values) / len(values), 1) if values else 0.0,
+                "p50": round(percentile(values, 0.50), 1),
+                "p95": round(percentile(values, 0.95), 1),
+                "p99": round(percentile(values, 0.99), 1),
+                "max": round(values[-1], 1) if values else 0.0,
+            }
+
+        return {
+            "requests": len(latencies),
+            "elapsed_seconds": round(elapsed, 2),
+            "concurrency": concurrency,
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+            "avg_quotes_per_response": round(self.quotes / ok, 2) if ok else 0.0,
+            "latency_ms": distribution(latencies),
+            "server_timing_ms": {name: distribution(values) for name, values in sorted(self.server_timings.items())},
+        }
+
+
+async def worker(session: aiohttp.ClientSession, url: str, routes: List[tuple], amounts: range,
+                 result: LoadResult, stop_at: float, remaining: List[Optional[int]]):
+    while time.monotonic() < stop_at:
+        if remaining[0] is not None:
+            if remaining[0] <= 0:
+                return
+            remaining[0] -= 1
+
+        country, currency = random.choice(routes)
+        params = {"receive_country": country, "receive_currency": currency, "send_amount": random.choice(amounts)}
+        start = time.perf_counter()
+        try:
+            async with session.get(url, params=params) as response:
+                body = await response.read()
+                latency = (time.perf_counter() - start) * 1000
+                quotes = len(json.loads(body).get("results", [])) if response.status == 200 else 0
+                result.record(str(response.status), latency, quotes, response.headers.get("Server-Timing", ""))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            result.record(type(e).__name__, (time.perf_counter() - start) * 1000)
+
+
+async def run_load(url: str, routes: List[tuple], amounts: range, concurrency: int,
+                   duration: float, requests: Optional[int], timeout: float) -> Dict:
+    result = LoadResult()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        started = time.monotonic()
+        remaining = [requests]
+        await asyncio.gather(*(
+            worker(session, url.rstrip("/") + QUOTE_PATH, routes, amounts, result, started + duration, remaining)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.monotonic() - started
+    return result.summary(elapsed, concurrency)
+
+
+async def fetch_json(url: str) -> Optional[Dict]:
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+            async with session.get(url) as response:
+                return await response.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+
+async def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if await fetch_json(url) is not None:
+            return
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+async def spawn_stack(api_port: int, farm_port: int, farm_config: Optional[str]):
+    """Start the mock farm and an API worker pointed at it."""
+    farm_args = [sys.executable, "mock_providers.py", "--port", str(farm_port)]
+    if farm_config:
+        farm_args += ["--config", os.path.abspath(farm_config)]
+    farm = await asyncio.create_subprocess_exec(*farm_args, cwd=BACKEND_DIR, stdout=asyncio.subprocess.DEVNULL)
+
+    env = dict(
+        os.environ,
+        PROVIDER_BASE_URLS=json.dumps({"*": f"http://127.0.0.1:{farm_port}"}),
+        RATE_LIMIT=os.getenv("RATE_LIMIT", "1000000"),
+        LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"),
+    )
+    api = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port), "--log-level", "warning",
+        cwd=BACKEND_DIR, env=env, stdout=asyncio.subprocess.DEVNULL,
+    )
+    await wait_until_up(f"http://127.0.0.1:{farm_port}/_mock/stats")
+    await wait_until_up(f"http://127.0.0.1:{api_port}/health")
+    return [farm, api]
+
+
+def print_report(summary: Dict):
+    latency = summary["latency_ms"]
+    print(f"Requests:    {summary['requests']} in {summary['elapsed_seconds']}s "
+          f"({summary['throughput_rps']} req/s, concurrency {summary['concurrency']})")
+    print(f"Statuses:    {', '.join(f'{status}={count}' for status, count in summary['statuses'].items())}")
+    print(f"Quotes/resp: {summary['avg_quotes_per_response']}")
+    print(f"Latency ms:  mean={latency['mean']} p50={latency['p50']} p95={latency['p95']} "
+          f"p99={latency['p99']} max={latency['max']}")
+    if summary["server_timing_ms"]:
+        print("Server-Timing ms (p50 / p95 / p99):")
+        for name, timing in summary["server_timing_ms"].items():
+            print(f"  {name:<20} {timing['p50']:>8} {timing['p95']:>8} {timing['p99']:>8}")
+    farm = summary.get("farm")
+    if farm:
+        print("Mock farm (requests / errors / blocked):")
+        for provider, stats in farm["providers"].items():
+            print(f"  {provider:<20} {stats['requests']:>8} {stats['errors']:>8} {stats['blocked']:>8}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test the quote API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--farm-url", help="Mock provider farm base URL (for its stats)")
+    parser.add_argument("--spawn", action="store_true", help="Start the mock farm and the API as subprocesses")
+    parser.add_argument("--api-port", type=int, default=8000)
+    parser.add_argument("--farm-port", type=int, default=8900)
+    parser.add_argument("--farm-config", help="Per-provider behaviour overrides for the spawned farm")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Client timeout per request")
+    parser.add_argument("--routes", default=DEFAULT_ROUTES, help="Comma-separated country:CURRENCY list")
+    parser.add_argument("--amounts", default="100000:3000000:10000", help="min:max:step send amounts (KRW)")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    routes = [tuple(route.split(":")) for route in args.routes.split(",")]
+    amount_min, amount_max, amount_step = (int(value) for value in args.amounts.split(":"))
+    amounts = range(amount_min, amount_max + 1, amount_step)
+
+    processes = []
+    url, farm_url = args.url, args.farm_url
+    if args.spawn:
+        processes = await spawn_stack(args.api_port, args.farm_port, args.farm_config)
+        url, farm_url = f"http://127.0.0.1:{args.api_port}", f"http://127.0.0.1:{args.farm_port}"
+
+    try:
+        summary = await run_load(url, routes, amounts, args.concurrency, args.duration, args.requests, args.timeout)
+        if farm_url:
+            summary["farm"] = await fetch_json(farm_url.rstrip("/") + "/_mock/stats")
+    finally:
+        for process in processes:
+            process.terminate()
+            await process.wait()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,18 +1,45 @@
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
+import os
 import asyncio
 import aiohttp
 import time
 import random
 import json
-import re
 import logging
-from typing import Optional, Dict, List
-from cachetools import TTLCache
+from typing import Optional, Dict, List, AsyncIterator
+from pydantic import BaseModel
+from structured_logging import logging_pipeline
+# JSON lines written by a background thread; hot-path events are sampled.
+# Configured before the proxy modules load, since they log on import.
+logging_pipeline.setup()
 from proxy_manager import proxy_manager, ProxySession
+from proxy_health import ProxyHealthScheduler, PROXY_HEALTH_ENABLED
 from proxy_config import proxy_config_manager
+from http_pool import session_pool
+from wirebarley_rates import wirebarley_rate_table
+from rate_models import rate_models
+from quote_cache import (
+    make_cache_key, make_cache_entry, response_for_amount, build_response, is_stale, entry_age,
+    CACHE_SOFT_TTL, CACHE_HARD_TTL, ProviderQuoteCache
+)
+from singleflight import SingleFlight
+from prefetch import PrefetchScheduler, PREFETCH_ENABLED
+from latency import provider_latency, LATENCY_BUCKETS, start_attempt, mark_local_answer
+from metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from hedging import HedgePolicy
+from circuit_breaker import circuit_breakers
+from providers import QuoteProvider, ProviderRegistry, upstream_url, check_status, UPSTREAM_ERRORS
+from cache_backend import create_cache_backend
+from cluster import cluster, PeerUnavailableError, CLUSTER_QUOTE_PATH, CLUSTER_SECRET_HEADER, CLUSTER_NO_PROVIDERS_STATUS
+from rate_limiter import create_rate_limiter
+from tracing import tracer
+from parsers import (
+    parse_hanpass, parse_cross, parse_gmoneytrans, parse_gmeremit, parse_jpremit,
+    parse_themoin, parse_sbicosmoney, parse_e9pay, parse_coinshot
+)
 
 app = FastAPI(
     title="RemitBuddy API",
@@ -21,10 +48,6 @@ app = FastAPI(
 )
 
 # --- Logging Configuration ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # --- CORS 설정 ---
@@ -46,11 +69,51 @@ app.add_middleware(
 
 
 # --- Configuration ---
-RATE_LIMIT = 15
+# Requests per client per window (raise it for load tests against the mock provider farm)
+RATE_LIMIT = int(os.getenv('RATE_LIMIT', '15'))
 RATE_LIMIT_WINDOW = 60
-request_timestamps = {}
-# Reduced TTL to 60 seconds for fresher data with more cache slots
-cache = TTLCache(maxsize=2048, ttl=60)
+# Global budget for one quote request; provider timeouts adapt within it
+QUOTE_REQUEST_DEADLINE = 3.0
+# Time kept back from the fan-out for ranking and caching
+QUOTE_ASSEMBLY_MARGIN = 0.2
+# Provider timeout until enough latency samples exist
+PROVIDER_DEFAULT_TIMEOUT = 2.0
+# Batch API: items per call and concurrent upstream fan-outs across all batches
+BATCH_MAX_ITEMS = 50
+BATCH_CONCURRENCY = 4
+# Wall-clock bound for a whole batch; keys still pending then get a 408
+BATCH_REQUEST_DEADLINE = 2 * QUOTE_REQUEST_DEADLINE
+# Per-client sliding-window limiter (shared across workers if RATE_LIMIT_REDIS_URL is set)
+rate_limiter = create_rate_limiter(RATE_LIMIT, RATE_LIMIT_WINDOW)
+# Entries are fresh for CACHE_SOFT_TTL and served stale (with a background
+# refresh) until CACHE_HARD_TTL, when the backend evicts them. In-process by
+# default; shared by all workers if QUOTE_CACHE_REDIS_URL is set
+cache = create_cache_backend()
+# Concurrent cache misses for the same key share one upstream fan-out
+quote_flights = SingleFlight()
+# Per-provider quotes with independent TTLs and last-known-good fallback
+provider_cache = ProviderQuoteCache()
+# Hedged duplicates / retries for slow or failing providers
+hedge_policy = HedgePolicy(provider_latency)
+# Hedge through a proxy when one is available
+HEDGE_VIA_PROXY = True
+# Hanpass already falls back to a proxy itself and is prone to IP blocking
+NO_HEDGE_PROVIDERS = {"Hanpass"}
+# Batch requests get their own fan-out budget so they can't starve single quotes
+batch_semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+# Strong references to fire-and-forget refresh tasks
+background_tasks = set()
+
+# --- Metrics (hot-path counters; the rest is collected at scrape time) ---
+provider_calls = metrics.counter(
+    "remitbuddy_provider_calls_total", "Provider calls by outcome (success, empty, timeout, error)", ["provider", "outcome"])
+provider_call_seconds = metrics.histogram(
+    "remitbuddy_provider_call_seconds", "Provider call duration including hedges and retries", LATENCY_BUCKETS, ["provider"])
+provider_results = metrics.counter(
+    "remitbuddy_provider_results_total", "Quotes served per provider by source (fresh, cache, last_known_good)", ["provider", "source"])
+fan_outs = metrics.counter("remitbuddy_fan_outs_total", "Upstream fan-outs started")
+response_results = metrics.histogram(
+    "remitbuddy_quote_response_results", "Provider quotes per ranked response", [0, 1, 2, 3, 4, 5, 6, 8, 10])
 PROXIES = []
 
 # --- Hanpass IP Blocking Detection ---
@@ -75,7 +138,8 @@ class HanpassConnectionTracker:
 
         # If we're in forced proxy mode due to recent failures
         if current_time < self.force_proxy_until:
-            logger.info(f"Using proxy for Hanpass (forced mode, {int((self.force_proxy_until - current_time) / 60)} min remaining)")
+            logger.info(f"Using proxy for Hanpass (forced mode, {int((self.force_proxy_until - current_time) / 60)} min remaining)",
+                        extra={"event": "proxy_used", "provider": "Hanpass"})
             return True
 
         # Otherwise try direct connection first
@@ -87,7 +151,8 @@ class HanpassConnectionTracker:
         self.successful_requests += 1
         self.consecutive_failures = 0
 
-        logger.info(f"Hanpass success (proxy={used_proxy}). Success rate: {self.successful_requests}/{self.total_requests}")
+        logger.info(f"Hanpass success (proxy={used_proxy}). Success rate: {self.successful_requests}/{self.total_requests}",
+                    extra={"event": "provider_debug", "provider": "Hanpass"})
 
     def record_failure(self, used_proxy: bool):
         """
@@ -211,19 +276,17 @@ SBICOSMONEY_CURRENCIES = {
 
 # E9Pay uses existing E9PAY_RECV_CODES mapping
 
+# Cross Platform IDs
+CROSS_PLATFORM_IDS = { "vietnam": 144, "philippines": 20, "indonesia": 68, "thailand": 60, "nepal": 85, "cambodia": 150, "myanmar": 235, "uzbekistan": 233, "bangladesh": 76, "mongolia": 250, "srilanka": 75 }
+
 
 # --- Helper Functions ---
 def get_random_proxy():
     return random.choice(PROXIES) if PROXIES else None
 
-def check_rate_limit(client_ip: str):
-    current_time = time.time()
-    timestamps = request_timestamps.get(client_ip, [])
-    valid_timestamps = [ts for ts in timestamps if current_time - ts < RATE_LIMIT_WINDOW]
-    if len(valid_timestamps) >= RATE_LIMIT:
+async def check_rate_limit(client_ip: str):
+    if not await rate_limiter.hit(client_ip):
         raise HTTPException(status_code=429, detail="Too many requests.")
-    valid_timestamps.append(current_time)
-    request_timestamps[client_ip] = valid_timestamps
 
 @app.exception_handler(HTTPException)
 async def custom_http_exception_handler(request: Request, exc: HTTPException):
@@ -245,7 +308,7 @@ async def get_hanpass_quote(session: aiohttp.ClientSession, send_amount: int, re
     4. After 1 hour, retry direct connection to check if unblocked
     """
 
-    url = 'https://app.hanpass.com/app/v1/remittance/get-cost'
+    url = upstream_url('https://app.hanpass.com/app/v1/remittance/get-cost')
     country_code = COUNTRY_CODES.get(receive_country)
     if not country_code:
         return None
@@ -272,7 +335,7 @@ async def get_hanpass_quote(session: aiohttp.ClientSession, send_amount: int, re
     async def make_request(use_proxy: bool) -> Optional[Dict]:
         """Make a Hanpass API request, optionally using proxy."""
         try:
-            proxy_url = None
+            request_session = session
             proxy_obj = None
 
             if use_proxy:
@@ -281,52 +344,37 @@ async def get_hanpass_quote(session: aiohttp.ClientSession, send_amount: int, re
                     logger.warning("Proxy requested but none available")
                     return None
 
-                proxy_url = proxy_obj.url
+                # The proxy's warm session keeps its tunnel to Hanpass open
+                request_session = proxy_manager.get_proxied_session(proxy_obj)
                 proxy_manager.mark_proxy_used(proxy_obj)
-                logger.info(f"Making Hanpass request with proxy {proxy_obj.ip}")
+                logger.info(f"Making Hanpass request with proxy {proxy_obj.ip}",
+                            extra={"event": "proxy_used", "provider": "Hanpass"})
             else:
-                logger.info("Making Hanpass request with direct connection")
+                logger.info("Making Hanpass request with direct connection",
+                            extra={"event": "provider_debug", "provider": "Hanpass"})
 
-            async with session.post(url, json=json_data, headers=headers, proxy=proxy_url) as response:
+            async with request_session.post(url, json=json_data, headers=headers) as response:
                 if response.status != 200:
                     if proxy_obj:
                         proxy_manager.mark_proxy_completed(proxy_obj, success=False)
                     logger.warning(f"Hanpass request failed: status {response.status} (proxy={use_proxy})")
                     return None
 
-                data = await response.json()
-
-                # Check API result code
-                if data.get('resultCode') != '0':
-                    if proxy_obj:
-                        proxy_manager.mark_proxy_completed(proxy_obj, success=False)
-                    logger.warning(f"Hanpass API error: {data.get('resultMessage')} (proxy={use_proxy})")
-                    return None
-
-                exchange_rate = data.get('exchangeRate')
-                to_amount = data.get('toAmount')
-
-                if not exchange_rate or not to_amount:
-                    if proxy_obj:
-                        proxy_manager.mark_proxy_completed(proxy_obj, success=False)
-                    return None
-
-                fee = float(data.get('transferFee', 0))
-                exchange_rate = float(exchange_rate)
-                recipient_gets = float(to_amount)
+                text = await response.text()
 
+            quote = parse_hanpass(text)
+            if not quote:
                 if proxy_obj:
-                    proxy_manager.mark_proxy_completed(proxy_obj, success=True)
+                    proxy_manager.mark_proxy_completed(proxy_obj, success=False)
+                logger.warning(f"Hanpass API error: {text[:100]} (proxy={use_proxy})")
+                return None
 
-                logger.info(f"Hanpass request successful (proxy={use_proxy})")
+            if proxy_obj:
+                proxy_manager.mark_proxy_completed(proxy_obj, success=True)
 
-                return {
-                    "provider": "Hanpass",
-                    "exchange_rate": exchange_rate,
-                    "fee": fee,
-                    "recipient_gets": recipient_gets,
-                    "link": "https://www.hanpass.com/"
-                }
+            logger.info(f"Hanpass request successful (proxy={use_proxy})",
+                        extra={"event": "provider_debug", "provider": "Hanpass"})
+            return quote
 
         except (asyncio.TimeoutError, aiohttp.ClientError) as e:
             if proxy_obj:
@@ -384,44 +432,32 @@ async def get_hanpass_quote(session: aiohttp.ClientSession, send_amount: int, re
 
 async def get_cross_quote(session: aiohttp.ClientSession, send_amount: int, receive_currency: str, receive_country: str) -> Optional[Dict]:
     try:
-        url = 'https://crossenf.com/api/v4/remit/quote/'
-        platform_mapping = { "vietnam": 144, "philippines": 20, "indonesia": 68, "thailand": 60, "nepal": 85, "cambodia": 150, "myanmar": 235, "uzbekistan": 233, "bangladesh": 76, "mongolia": 250, "srilanka": 75 }
-        platform_id = platform_mapping.get(receive_country.lower())
+        url = upstream_url('https://crossenf.com/api/v4/remit/quote/')
+        platform_id = CROSS_PLATFORM_IDS.get(receive_country.lower())
         if not platform_id: return None
         
         params = {"apply_user_limit": 0, "deposit_type": "Manual", "platform_id": platform_id, "quote_type": "send", "sending_amount": send_amount}
         
         async with session.get(url, params=params) as response:
-            if response.status != 200: return None
-            
-            data = await response.json()
-            quote_data = data.get('data', {})
-            
-            # Use receiving_amount directly from API response
-            receiving_amount = quote_data.get('receiving_amount', 0)
-            if not receiving_amount or receiving_amount <= 0:
-                return None
-            
-            fee = quote_data.get('fee', 0)
-            pay_amount = quote_data.get('pay_amount', send_amount)
-            
-            # Calculate exchange rate from the actual amounts
-            if pay_amount > 0:
-                exchange_rate = receiving_amount / pay_amount
-            else:
-                exchange_rate = 0
-            
-            print(f"Cross Debug - receiving_amount: {receiving_amount}, pay_amount: {pay_amount}, exchange_rate: {exchange_rate}")
-            
-            return {"provider": "Cross", "exchange_rate": exchange_rate, "fee": fee, "recipient_gets": receiving_amount, "link": "https://crossenf.com/"}
+            check_status(response)
+            text = await response.text()
+
+        quote = parse_cross(text, send_amount)
+        if quote:
+            logger.debug(f"Cross Debug - receiving_amount: {quote['recipient_gets']}, exchange_rate: {quote['exchange_rate']}",
+                         extra={"event": "provider_debug", "provider": "Cross"})
+        return quote
+    except UPSTREAM_ERRORS:
+        # Transport and HTTP errors are provider failures (logged by the caller)
+        raise
     except Exception as e:
-        print(f"Cross Error: {type(e).__name__} - {e}")
+        logger.error(f"Cross Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": "Cross"})
         return None
         
 async def get_gmoneytrans_quote(session: aiohttp.ClientSession, send_amount: int, receive_currency: str, receive_country: str) -> Optional[Dict]:
     """Fetches remittance quote from GmoneyTrans using the correct API endpoint and parser."""
     try:
-        url = "https://mapi.gmoneytrans.net/exratenew1/ajx_calcRate.asp"
+        url = upstream_url("https://mapi.gmoneytrans.net/exratenew1/ajx_calcRate.asp")
         payout_country = GMONEY_COUNTRY_NAMES.get(receive_country)
         
         # 우즈베키스탄은 'Humocard', 나머지는 'Bank Account'를 기본값으로 사용
@@ -429,6 +465,12 @@ async def get_gmoneytrans_quote(session: aiohttp.ClientSession, send_amount: int
 
         if not payout_country: return None
 
+        # Rate is amount-independent: price locally while the model is fresh
+        local_quote = rate_models.quote("GmoneyTrans", receive_country, receive_currency, send_amount)
+        if local_quote:
+            mark_local_answer()
+            return local_quote
+
         # POST 요청이지만, 데이터를 URL 파라미터(params)로 전달합니다.
         params = {
             'total_collected': str(send_amount),
@@ -439,37 +481,23 @@ async def get_gmoneytrans_quote(session: aiohttp.ClientSession, send_amount: int
         }
         async with session.post(url, params=params) as response:
             response.raise_for_status()
-            text_data = await response.text()
-            
-            fee_match = re.search(r"serviceCharge--td_clm--([\d.,]+)", text_data)
-            rate_match = re.search(r"exchangeRate--td_clm--([\d.,]+)", text_data)
-            
-            if not fee_match or not rate_match:
-                print(f"GmoneyTrans Error: Could not parse data from response: {text_data[:100]}...")
-                return None
-
-            fee = float(fee_match.group(1).replace(',', ''))
-            foreign_per_krw = float(rate_match.group(1).replace(',', ''))
-
-            if foreign_per_krw == 0: return None
-            
-            exchange_rate = foreign_per_krw
-            recipient_gets = (send_amount - fee) * exchange_rate
-
-            return {
-                "provider": "GmoneyTrans",
-                "exchange_rate": exchange_rate,
-                "fee": fee,
-                "recipient_gets": recipient_gets,
-                "link": "https://www.gmoneytrans.com/"
-            }
+            text = await response.text()
+
+        quote = parse_gmoneytrans(text, send_amount)
+        if quote:
+            rate_models.update("GmoneyTrans", receive_country, receive_currency, send_amount,
+                               quote["exchange_rate"], quote["fee"], quote["link"])
+        return quote
+    except UPSTREAM_ERRORS:
+        # Transport and HTTP errors are provider failures (logged by the caller)
+        raise
     except Exception as e:
-        print(f"GmoneyTrans Error: {type(e).__name__} - {e}")
+        logger.error(f"GmoneyTrans Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": "GmoneyTrans"})
         return None
 
 async def get_gmeremit_quote(session: aiohttp.ClientSession, send_amount: int, receive_currency: str, receive_country: str) -> Optional[Dict]:
     try:
-        url = "https://online.gmeremit.com/ExchangeRate.aspx"
+        url = upstream_url("https://online.gmeremit.com/ExchangeRate.aspx")
         
         country_name = GMEREMIT_COUNTRY_NAMES.get(receive_country)
         delivery_method = GMEREMIT_DELIVERY_METHODS.get(receive_country, "2")
@@ -499,53 +527,31 @@ async def get_gmeremit_quote(session: aiohttp.ClientSession, send_amount: int, r
         }
         
         async with session.post(url, data=data, headers=headers) as response:
-            if response.status != 200:
-                return None
-            
-            result = await response.json()
-            
-            if result.get('errorCode') != '0':
-                return None
-            
-            sc_charge = result.get('scCharge')
-            ex_rate = result.get('exRate')
-            p_amt = result.get('pAmt')
-            
-            if (not sc_charge or sc_charge == 'null' or 
-                not ex_rate or ex_rate == 'null' or 
-                not p_amt or p_amt == 'null'):
-                return None
-            
-            try:
-                fee = float(sc_charge.replace(',', ''))
-                exchange_rate = float(ex_rate)
-                recipient_gets = float(p_amt.replace(',', ''))
-            except (ValueError, TypeError):
-                return None
-            
-            if exchange_rate <= 0 or recipient_gets <= 0:
-                return None
-            
-            return {
-                "provider": "GME Remit",
-                "exchange_rate": exchange_rate,
-                "fee": fee,
-                "recipient_gets": recipient_gets,
-                "link": "https://www.gmeremit.com/"
-            }
-            
+            check_status(response)
+            text = await response.text()
+
+        return parse_gmeremit(text)
+
+    except UPSTREAM_ERRORS:
+        # Transport and HTTP errors are provider failures (logged by the caller)
+        raise
     except Exception as e:
-        print(f"GME Remit Error: {type(e).__name__} - {e}")
+        logger.error(f"GME Remit Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": "GME Remit"})
         return None
 
 async def get_jpremit_quote(session: aiohttp.ClientSession, send_amount: int, receive_currency: str, receive_country: str) -> Optional[Dict]:
     try:
-        url = "https://www.jpremit.co.kr/default.aspx/calcfee"
+        url = upstream_url("https://www.jpremit.co.kr/default.aspx/calcfee")
         
         # Check if currency is supported by JP Remit
         jpremit_currency = JPREMIT_CURRENCIES.get(receive_country)
         if not jpremit_currency or jpremit_currency != receive_currency:
             return None
+
+        local_quote = rate_models.quote("JP Remit", receive_country, receive_currency, send_amount)
+        if local_quote:
+            mark_local_answer()
+            return local_quote
         
         headers = {
             'Content-Type': 'application/json;',
@@ -565,44 +571,25 @@ async def get_jpremit_quote(session: aiohttp.ClientSession, send_amount: int, re
         }
         
         async with session.post(url, json=data, headers=headers) as response:
-            if response.status != 200:
-                return None
-            
-            result = await response.json()
-            d_data = result.get('d', {})
-            
-            service_fee = d_data.get('ServiceFee')
-            customer_rate = d_data.get('customer_rate')
-            
-            if not service_fee or not customer_rate:
-                return None
-            
-            try:
-                fee = float(service_fee)
-                exchange_rate = float(customer_rate)
-            except (ValueError, TypeError):
-                return None
-            
-            if exchange_rate <= 0:
-                return None
-            
-            recipient_gets = (send_amount - fee) * exchange_rate
-            
-            return {
-                "provider": "JP Remit",
-                "exchange_rate": exchange_rate,
-                "fee": fee,
-                "recipient_gets": recipient_gets,
-                "link": "https://www.jpremit.co.kr/"
-            }
-            
+            check_status(response)
+            text = await response.text()
+
+        quote = parse_jpremit(text, send_amount)
+        if quote:
+            rate_models.update("JP Remit", receive_country, receive_currency, send_amount,
+                               quote["exchange_rate"], quote["fee"], quote["link"])
+        return quote
+
+    except UPSTREAM_ERRORS:
+        # Transport and HTTP errors are provider failures (logged by the caller)
+        raise
     except Exception as e:
-        print(f"JP Remit Error: {type(e).__name__} - {e}")
+        logger.error(f"JP Remit Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": "JP Remit"})
         return None
 
 async def get_themoin_quote(session: aiohttp.ClientSession, send_amount: int, receive_currency: str, receive_country: str) -> Optional[Dict]:
     try:
-        url = "https://web-api.ma.prd.themoin.com/v0/quote/ma"
+        url = upstream_url("https://web-api.ma.prd.themoin.com/v0/quote/ma")
         
         # Check if country/currency is supported by The Moin
         themoin_country = THEMOIN_COUNTRY_CODES.get(receive_country)
@@ -631,145 +618,43 @@ async def get_themoin_quote(session: aiohttp.ClientSession, send_amount: int, re
         }
         
         async with session.post(url, json=data, headers=headers) as response:
-            if response.status != 200:
-                return None
-            
-            result = await response.json()
-            
-            if result.get('ret') != 'success':
-                return None
-            
-            quote_v2 = result.get('quoteV2', {})
-            
-            fee_amount = quote_v2.get('feeAmount', {})
-            destination_amount = quote_v2.get('destinationAmount', {})
-            
-            if not fee_amount or not destination_amount:
-                return None
-            
-            fee = fee_amount.get('amount', 0)
-            recipient_gets = destination_amount.get('amount', 0)
-            
-            if fee is None or recipient_gets is None or recipient_gets <= 0:
-                return None
-            
-            # Calculate exchange rate: recipient_gets / (send_amount - fee)
-            exchange_rate = recipient_gets / (send_amount - fee)
-            
-            return {
-                "provider": "The Moin",
-                "exchange_rate": exchange_rate,
-                "fee": fee,
-                "recipient_gets": recipient_gets,
-                "link": "https://www.themoin.com/"
-            }
-            
+            check_status(response)
+            text = await response.text()
+
+        return parse_themoin(text, send_amount)
+
+    except UPSTREAM_ERRORS:
+        # Transport and HTTP errors are provider failures (logged by the caller)
+        raise
     except Exception as e:
-        print(f"The Moin Error: {type(e).__name__} - {e}")
+        logger.error(f"The Moin Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": "The Moin"})
         return None
 
 async def get_wirebarley_quote(session: aiohttp.ClientSession, send_amount: int, receive_currency: str, receive_country: str) -> Optional[Dict]:
+    """Prices Wirebarley locally from the cached, indexed rate table."""
     try:
         # Get country code for Wirebarley
         country_code = WIREBARLEY_COUNTRIES.get(receive_country)
         if not country_code:
             return None
-            
-        url = f"https://www.wirebarley.com/my/remittance/api/v1/exrate/KR/KRW"
-        
-        headers = {
-            'Accept': '*/*',
-            'Content-Type': 'application/json',
-            'Referer': 'https://www.wirebarley.com/',
-            'device-type': 'WEB',
-            'device-model': 'Safari',
-            'device-version': '604.1',
-            'lang': 'ko'
-        }
-        
-        async with session.get(url, headers=headers) as response:
-            if response.status != 200:
-                return None
-                
-            result = await response.json()
-        
-        if result.get('status') != 0:
-            return None
-            
-        data = result.get('data', {})
-        ex_rates = data.get('exRates', [])
-        
-        # Find matching country and currency
-        matching_rate = None
-        for rate in ex_rates:
-            if (rate.get('country') == country_code and 
-                rate.get('currency') == receive_currency):
-                matching_rate = rate
-                break
-        
-        if not matching_rate:
+
+        # Priced from the cached table: the download is not this call's latency
+        mark_local_answer()
+        route = await wirebarley_rate_table.get_route(session, country_code, receive_currency)
+        if not route:
             return None
-            
-        wb_rate_data = matching_rate.get('wbRateData', {})
-        transfer_fees = matching_rate.get('transferFees', [])
-        
-        # Get appropriate exchange rate based on send amount
-        exchange_rate = wb_rate_data.get('wbRate', 0)
-        
-        # Apply amount-based rate tiers
-        threshold1 = wb_rate_data.get('threshold1')
-        if threshold1 and send_amount >= threshold1:
-            exchange_rate = wb_rate_data.get('wbRate1', exchange_rate)
-        
-        threshold2 = wb_rate_data.get('threshold2')  
-        if threshold2 and send_amount >= threshold2:
-            exchange_rate = wb_rate_data.get('wbRate2', exchange_rate)
-            
-        threshold3 = wb_rate_data.get('threshold3')
-        if threshold3 and send_amount >= threshold3:
-            exchange_rate = wb_rate_data.get('wbRate3', exchange_rate)
-            
-        threshold4 = wb_rate_data.get('threshold4')
-        if threshold4 and send_amount >= threshold4:
-            exchange_rate = wb_rate_data.get('wbRate4', exchange_rate)
-            
-        threshold5 = wb_rate_data.get('threshold5')
-        if threshold5 and send_amount >= threshold5:
-            exchange_rate = wb_rate_data.get('wbRate5', exchange_rate)
-            
-        threshold6 = wb_rate_data.get('threshold6')
-        if threshold6 and send_amount >= threshold6:
-            exchange_rate = wb_rate_data.get('wbRate6', exchange_rate)
-            
-        threshold7 = wb_rate_data.get('threshold7')
-        if threshold7 and send_amount >= threshold7:
-            exchange_rate = wb_rate_data.get('wbRate7', exchange_rate)
-            
-        threshold8 = wb_rate_data.get('threshold8')
-        if threshold8 and send_amount >= threshold8:
-            exchange_rate = wb_rate_data.get('wbRate8', exchange_rate)
-            
-        # wbRate9 is usually the highest tier rate
-        if wb_rate_data.get('wbRate9'):
-            exchange_rate = wb_rate_data.get('wbRate9', exchange_rate)
-        
+
+        # Amount-based rate tiers (threshold1..8, wbRate9 override)
+        exchange_rate = route.rate_for(send_amount)
         if not exchange_rate or exchange_rate <= 0:
             return None
-            
+
         # Get fee for send amount - use transferFees to match website behavior
         # Analysis shows ALL supported currencies (VND, PHP, THB, UZS, IDR, BDT, NPR) follow same pattern:
         # - paymentFees.fee1 = 0 (always)
         # - transferFees.fee1 = 5000 (matches website)
-        fee = 0
-        for fee_info in transfer_fees:
-            if (fee_info.get('min', 0) <= send_amount <= fee_info.get('max', float('inf'))):
-                threshold1 = fee_info.get('threshold1')
-                if threshold1 and send_amount >= threshold1:
-                    fee = fee_info.get('fee2', 0) or 0  # Usually 0 for amounts >= 500,000₩
-                else:
-                    fee = fee_info.get('fee1', 0) or 0  # Usually 5,000₩ for smaller amounts
-                break
-        
+        fee = route.fee_for(send_amount)
+
         recipient_gets = (send_amount - fee) * exchange_rate
         
         return {
@@ -781,7 +666,7 @@ async def get_wirebarley_quote(session: aiohttp.ClientSession, send_amount: int,
         }
         
     except Exception as e:
-        print(f"Wirebarley Error: {type(e).__name__} - {e}")
+        logger.error(f"Wirebarley Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": "Wirebarley"})
         return None
 
 async def get_sbicosmoney_quote(session: aiohttp.ClientSession, send_amount: int, receive_currency: str, receive_country: str) -> Optional[Dict]:
@@ -793,8 +678,14 @@ async def get_sbicosmoney_quote(session: aiohttp.ClientSession, send_amount: int
         if (not country_id or not sbi_currency or 
             sbi_currency != receive_currency):
             return None
+
+        # The request carries no amount, so one rate prices every amount
+        local_quote = rate_models.quote("SBI Cosmoney", receive_country, receive_currency, send_amount)
+        if local_quote:
+            mark_local_answer()
+            return local_quote
         
-        url = "https://www.sbicosmoney.com/calc/amount"
+        url = upstream_url("https://www.sbicosmoney.com/calc/amount")
         
         headers = {
             'Content-Type': 'application/json',
@@ -817,40 +708,29 @@ async def get_sbicosmoney_quote(session: aiohttp.ClientSession, send_amount: int
         }
         
         async with session.post(url, json=data, headers=headers) as response:
+            check_status(response)
             # Check content type to see if we got JSON
             content_type = response.headers.get('content-type', '')
             if 'application/json' not in content_type:
                 return None
-                
-            if response.status != 200:
-                return None
-                
-            result = await response.json()
-            
-            exchange_rate = result.get('exchangeRate')
-            
-            if not exchange_rate or exchange_rate <= 0:
-                return None
-            
-            # No fee for now - just exchange rate calculation
-            fee = 0.0
-            recipient_gets = send_amount * exchange_rate
-            
-            return {
-                "provider": "SBI Cosmoney",
-                "exchange_rate": exchange_rate,
-                "fee": fee,
-                "recipient_gets": recipient_gets,
-                "link": "https://www.sbicosmoney.com/"
-            }
-            
+            text = await response.text()
+
+        quote = parse_sbicosmoney(text, send_amount)
+        if quote:
+            rate_models.update("SBI Cosmoney", receive_country, receive_currency, send_amount,
+                               quote["exchange_rate"], quote["fee"], quote["link"], flat_fee=True)
+        return quote
+
+    except UPSTREAM_ERRORS:
+        # Transport and HTTP errors are provider failures (logged by the caller)
+        raise
     except Exception as e:
-        print(f"SBI Cosmoney Error: {type(e).__name__} - {e}")
+        logger.error(f"SBI Cosmoney Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": "SBI Cosmoney"})
         return None
 
 async def get_e9pay_quote(session: aiohttp.ClientSession, send_amount: int, receive_currency: str, receive_country: str) -> Optional[Dict]:
     try:
-        url = "https://www.e9pay.co.kr/cmm/calcExchangeRate.do"
+        url = upstream_url("https://www.e9pay.co.kr/cmm/calcExchangeRate.do")
         
         # Get country code for E9Pay
         recv_code = E9PAY_RECV_CODES.get(receive_country)
@@ -878,92 +758,22 @@ async def get_e9pay_quote(session: aiohttp.ClientSession, send_amount: int, rece
         }
         
         async with session.post(url, data=data, headers=headers) as response:
-            if response.status != 200:
-                return None
-            
-            result = await response.json()
-            
-            if result.get('responseCode') != 'S':
-                return None
-            
-            # Parse the nested JSON data
-            data_str = result.get('data', '{}')
-            try:
-                parsed_data = json.loads(data_str)
-            except json.JSONDecodeError:
-                return None
-            
-            if parsed_data.get('RESULT_COD') != 'S':
-                return None
-            
-            # Get recipient amount
-            recipient_amount_str = parsed_data.get('RCVER_EXPECT_RECPT_AMOUNT', '0')
-            
-            try:
-                recipient_gets = float(recipient_amount_str)
-                
-                # E9Pay uses fixed fees based on remittance method from their frontend
-                # These are predefined fees, not calculated by API
-                fee_mapping = {
-                    "PH15": 3000,  # Gcash
-                    "PH13": 5000,  # BDO 계좌송금
-                    "PH03": 5000,  # 캐시픽업 PHP
-                    "PH11": 5000,  # 계좌송금 PHP
-                    "PH09": 5000,  # PAYMAYA
-                    "PH07": 5000,  # COINS.PH
-                    "VN15": 5000,  # 베트남 계좌송금
-                    "VN14": 5000,  # 베트남 모바일월렛
-                    "VN06": 7000,  # 베트남 캐시픽업
-                    "VN07": 10000, # 베트남 홈딜리버리
-                    "VN05": 7000,  # 베트남 캐시픽업 USD
-                    "VN08": 10000, # 베트남 홈딜리버리 USD
-                    "LK03": 5000,  # 스리랑카 계좌송금
-                    "LK09": 5000,  # 스리랑카 FINANCE AND LEASING
-                    "LK08": 5000,  # 스리랑카 계좌송금 USD
-                    "ID01": 5000,  # 인도네시아 계좌송금
-                    "TH03": 5000,  # 태국 카시콘 계좌송금
-                    "TH02": 5000,  # 태국 계좌송금
-                    "MM01": 8000,  # 미얀마 계좌송금 CB
-                    "MM05": 8000,  # 미얀마 계좌송금 KBZ
-                    "MM04": 5000,  # 미얀마 KBZ 월렛송금
-                    "NP": 5000,    # 네팔 계좌송금
-                    "NP01": 5000,  # 네팔 캐시픽업
-                    "NP04": 5000,  # 네팔 E-WALLET
-                    "BD01": 5000,  # 방글라데시 캐시픽업
-                    "BD02": 3000   # 방글라데시 BKASH
-                }
-                
-                fee = fee_mapping.get(recv_code, 5000)  # Default to 5000 if not found
-                    
-            except (ValueError, TypeError):
-                return None
-            
-            if recipient_gets <= 0:
-                return None
-            
-            # Calculate exchange rate: recipient_gets / (send_amount - fee)
-            effective_send_amount = send_amount - fee
-            if effective_send_amount <= 0:
-                return None
-                
-            exchange_rate = recipient_gets / effective_send_amount
-            
-            return {
-                "provider": "E9Pay",
-                "exchange_rate": exchange_rate,
-                "fee": fee,
-                "recipient_gets": recipient_gets,
-                "link": "https://www.e9pay.co.kr/"
-            }
-            
+            check_status(response)
+            text = await response.text()
+
+        return parse_e9pay(text, send_amount, recv_code)
+
+    except UPSTREAM_ERRORS:
+        # Transport and HTTP errors are provider failures (logged by the caller)
+        raise
     except Exception as e:
-        print(f"E9Pay Error: {type(e).__name__} - {e}")
+        logger.error(f"E9Pay Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": "E9Pay"})
         return None
     
 async def get_coinshot_quote(session: aiohttp.ClientSession, send_amount: int, receive_currency: str, receive_country: str) -> Optional[Dict]:
     """Fetches remittance quote from Coinshot using their API endpoint."""
     try:
-        url = "https://coinshot.org/calculate/receiving/i"
+        url = upstream_url("https://coinshot.org/calculate/receiving/i")
         
         # Check if the country is supported by Coinshot
         coinshot_currency = COINSHOT_CURRENCIES.get(receive_country)
@@ -987,182 +797,612 @@ async def get_coinshot_quote(session: aiohttp.ClientSession, send_amount: int, r
         }
         
         async with session.post(url, data=data, headers=headers) as response:
-            if response.status != 200:
-                return None
-            
-            data = await response.json()
-            
-            # Extract data from response
-            recipient_gets = float(data.get('toAmount', 0))
-            fee = float(data.get('fromFee', 0))
-            
-            if not recipient_gets or recipient_gets <= 0:
-                return None
-            
-            # Calculate exchange rate: receiving_amount / sending_amount
-            exchange_rate = recipient_gets / send_amount
-            
-            return {
-                "provider": "Coinshot",
-                "exchange_rate": exchange_rate,
-                "fee": fee,
-                "recipient_gets": recipient_gets,
-                "link": "https://coinshot.org/"
-            }
-            
+            check_status(response)
+            text = await response.text()
+
+        return parse_coinshot(text, send_amount)
+
+    except UPSTREAM_ERRORS:
+        # Transport and HTTP errors are provider failures (logged by the caller)
+        raise
     except Exception as e:
-        print(f"Coinshot Error: {type(e).__name__} - {e}")
+        logger.error(f"Coinshot Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": "Coinshot"})
         return None
 
+# --- Provider Registry ---
+# Each provider's routes come from its mapping dicts; providers with a
+# currency mapping only serve that currency, the rest accept any currency
+provider_registry = ProviderRegistry([
+    QuoteProvider("Hanpass", get_hanpass_quote, "app.hanpass.com", frozenset(COUNTRY_CODES)),
+    QuoteProvider("Wirebarley", get_wirebarley_quote, "www.wirebarley.com", frozenset(WIREBARLEY_COUNTRIES)),
+    QuoteProvider("Cross", get_cross_quote, "crossenf.com", frozenset(CROSS_PLATFORM_IDS)),
+    QuoteProvider("GmoneyTrans", get_gmoneytrans_quote, "mapi.gmoneytrans.net", frozenset(GMONEY_COUNTRY_NAMES)),
+    QuoteProvider("GME Remit", get_gmeremit_quote, "online.gmeremit.com", frozenset(GMEREMIT_COUNTRY_NAMES)),
+    QuoteProvider("JP Remit", get_jpremit_quote, "www.jpremit.co.kr", frozenset(JPREMIT_CURRENCIES), JPREMIT_CURRENCIES),
+    QuoteProvider("The Moin", get_themoin_quote, "web-api.ma.prd.themoin.com",
+                  frozenset(THEMOIN_COUNTRY_CODES) & frozenset(THEMOIN_CURRENCIES), THEMOIN_CURRENCIES),
+    QuoteProvider("SBI Cosmoney", get_sbicosmoney_quote, "www.sbicosmoney.com",
+                  frozenset(SBICOSMONEY_COUNTRIES) & frozenset(SBICOSMONEY_CURRENCIES), SBICOSMONEY_CURRENCIES),
+    QuoteProvider("E9Pay", get_e9pay_quote, "www.e9pay.co.kr", frozenset(E9PAY_RECV_CODES)),
+    QuoteProvider("Coinshot", get_coinshot_quote, "coinshot.org", frozenset(COINSHOT_CURRENCIES), COINSHOT_CURRENCIES),
+])
+
 # --- Performance Optimized API Logic with Proxy Rotation ---
-async def fetch_all_quotes(send_amount: int, receive_currency: str, receive_country: str) -> List[Dict]:
+async def fetch_provider_quote(provider: str, func, host: str, send_amount: int, receive_currency: str,
+                               receive_country: str, deadline: float, retryable: bool = False):
+    """Run one scraper under the hedging policy until deadline; returns (provider, quote or None)."""
+    # One per attempt, including hedges that are still running when the call ends
+    outcomes = []
+
+    async def attempt(extra: bool) -> Optional[Dict]:
+        # Each provider reuses the pooled keep-alive session for its host
+        session = session_pool.get_session(host)
+        proxy = None
+        if extra and HEDGE_VIA_PROXY:
+            proxy = proxy_manager.get_best_proxy()
+            if proxy:
+                proxy_manager.mark_proxy_used(proxy)
+                session = proxy_manager.get_proxied_session(proxy)
+
+        start_time = time.monotonic()
+        result = None
+        outcome = start_attempt()
+        outcomes.append(outcome)
+        try:
+            with tracer.span(provider, timing=True, attempt="hedge" if extra else "primary", proxy=proxy is not None):
+                result = await func(session, send_amount, receive_currency, receive_country)
+        except UPSTREAM_ERRORS as e:
+            logger.error(f"{provider} Error: {type(e).__name__} - {e}", extra={"event": "provider_error", "provider": provider})
+            raise
+        finally:
+            if proxy:
+                proxy_manager.mark_proxy_completed(proxy, success=bool(result))
+            # Locally answered calls add no upstream load to hedge against
+            if not extra and not outcome.local:
+                hedge_policy.earn(provider)
+        # Only upstream round trips feed the adaptive timeouts and hedge delays
+        if result and not outcome.local:
+            provider_latency.record(provider, time.monotonic() - start_time)
+        return result
+
+    def went_upstream() -> bool:
+        # Only attempts that reached the provider tell the circuit breaker anything
+        return any(not outcome.local for outcome in outcomes)
+
+    call_start = time.monotonic()
+    try:
+        if provider in NO_HEDGE_PROVIDERS:
+            result = await asyncio.wait_for(attempt(False), timeout=max(0.0, deadline - call_start))
+        else:
+            result = await hedge_policy.run(provider, attempt, deadline, retryable=retryable)
+    except asyncio.TimeoutError:
+        result = None
+    except asyncio.CancelledError:
+        # Fan-out abandoned: release a half-open probe slot
+        circuit_breakers.get(provider).record_neutral()
+        raise
+    except Exception as e:
+        if not isinstance(e, UPSTREAM_ERRORS):
+            logger.warning(f"Task failed: {provider} {type(e).__name__}: {e}")
+        circuit_breakers.record_result(provider, success=False, upstream=went_upstream())
+        provider_calls.inc(provider, "error")
+        provider_call_seconds.observe(time.monotonic() - call_start, provider)
+        return provider, None
+
+    result = result if result and isinstance(result, dict) else None
+    timed_out = not result and time.monotonic() >= deadline
+    if timed_out:
+        if went_upstream():
+            # Censored sample: the call took at least this long
+            provider_latency.record(provider, time.monotonic() - call_start)
+        logger.warning(f"Task failed: {provider} timed out after {time.monotonic() - call_start:.2f}s")
+    circuit_breakers.record_result(provider, success=bool(result), upstream=went_upstream())
+    provider_calls.inc(provider, "success" if result else "timeout" if timed_out else "empty")
+    provider_call_seconds.observe(time.monotonic() - call_start, provider)
+    return provider, result
+
+def provider_timeout(provider: str, ceiling: float) -> float:
+    """
+    Adaptive timeout for the provider's next call. Providers that fall back
+    to a proxy themselves (NO_HEDGE_PROVIDERS) may need two round trips.
+    """
+    timeout = provider_latency.timeout_for(provider, PROVIDER_DEFAULT_TIMEOUT, ceiling)
+    if provider in NO_HEDGE_PROVIDERS:
+        timeout = min(2 * timeout, ceiling)
+    return timeout
+
+async def iter_quotes(send_amount: int, receive_currency: str, receive_country: str,
+                      timeout: float = QUOTE_REQUEST_DEADLINE - QUOTE_ASSEMBLY_MARGIN,
+                      use_provider_cache: bool = True,
+                      cached_fetched_at: Optional[List[float]] = None) -> AsyncIterator[Dict]:
+    """
+    Yield each provider's quote as soon as it is available: cached providers
+    first, then the fetched ones as they complete. A failed provider, or one
+    whose circuit is open, falls back to its last known good quote (marked stale).
+
+    With use_provider_cache=False every available provider is fetched. The
+    fetch time of each reused per-provider quote is appended to
+    cached_fetched_at, if given.
+
+    Only providers that serve the route are dispatched. Each provider's
+    deadline comes from its own latency histogram, capped by the fan-out's
+    overall timeout.
+    """
+    cache_key = make_cache_key(receive_country, receive_currency, send_amount)
+    started = time.monotonic()
+    fan_outs.inc()
+
+    tasks = []
+    for quote_provider in provider_registry.providers_for(receive_country, receive_currency):
+        provider, func, host = quote_provider.name, quote_provider.fetch, quote_provider.host
+        cached_quote = provider_cache.get(provider, cache_key, send_amount) if use_provider_cache else None
+        if cached_quote:
+            if cached_fetched_at is not None:
+                cached_fetched_at.append(provider_cache.fetched_at(provider, cache_key))
+            provider_results.inc(provider, "cache")
+            yield cached_quote
+            continue
+        # Open circuit: skip the provider without spending a socket or timeout
+        if not circuit_breakers.allow_request(provider):
+            last_known_good = provider_cache.get_last_known_good(provider, cache_key, send_amount)
+            if last_known_good:
+                provider_results.inc(provider, "last_known_good")
+                yield last_known_good
+            continue
+        # Retrying only makes sense for routes the provider has served before
+        retryable = provider_cache.has_last_known_good(provider, cache_key)
+        deadline = started + provider_timeout(provider, timeout)
+        tasks.append(asyncio.ensure_future(fetch_provider_quote(
+            provider, func, host, send_amount, receive_currency, receive_country, deadline, retryable
+        )))
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            provider, result = await next_done
+            if result:
+                provider_cache.store(provider, cache_key, send_amount, result)
+                provider_results.inc(provider, "fresh")
+                yield result
+                continue
+            last_known_good = provider_cache.get_last_known_good(provider, cache_key, send_amount)
+            if last_known_good:
+                provider_results.inc(provider, "last_known_good")
+                yield last_known_good
+    finally:
+        # Consumer stopped early (e.g. client disconnected)
+        for task in tasks:
+            task.cancel()
+
+async def fetch_all_quotes(send_amount: int, receive_currency: str, receive_country: str,
+                           use_provider_cache: bool = True,
+                           cached_fetched_at: Optional[List[float]] = None) -> List[Dict]:
     """
     Performance optimized quote fetching with:
+    - Pooled keep-alive sessions per provider host
     - IP rotation through proxy manager
-    - Individual timeouts per request (2s max)
+    - Adaptive per-provider timeouts within the request deadline
+    - Hedged duplicates / retries within each provider's deadline
     - Load balancing across providers
     - Rate limiting per proxy
     """
-    
-    # Create session-based wrapper functions for all providers
-    async def create_session_wrapper(func, *args):
-        timeout = aiohttp.ClientTimeout(total=2.0)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            return await func(session, *args)
-    
-    # Create tasks with individual timeouts
-    tasks = [
-        # Session-based providers (updated Hanpass and Wirebarley)
-        asyncio.wait_for(
-            create_session_wrapper(get_hanpass_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-        asyncio.wait_for(
-            create_session_wrapper(get_wirebarley_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-        # Session-based providers
-        asyncio.wait_for(
-            create_session_wrapper(get_cross_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-        asyncio.wait_for(
-            create_session_wrapper(get_gmoneytrans_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-        asyncio.wait_for(
-            create_session_wrapper(get_gmeremit_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-        asyncio.wait_for(
-            create_session_wrapper(get_jpremit_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-        asyncio.wait_for(
-            create_session_wrapper(get_themoin_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-        asyncio.wait_for(
-            create_session_wrapper(get_sbicosmoney_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-        asyncio.wait_for(
-            create_session_wrapper(get_e9pay_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-        asyncio.wait_for(
-            create_session_wrapper(get_coinshot_quote, send_amount, receive_currency, receive_country),
-            timeout=2.0
-        ),
-    ]
-    
-    # Execute with as_completed for fastest response
     results = []
     start_time = time.time()
     
     try:
-        # Use asyncio.gather with return_exceptions=True for parallel execution
-        completed_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Filter successful results
-        for result in completed_results:
-            if result and isinstance(result, dict):
+        with tracer.span("fetch_all_quotes", timing=True):
+            async for result in iter_quotes(send_amount, receive_currency, receive_country,
+                                            use_provider_cache=use_provider_cache,
+                                            cached_fetched_at=cached_fetched_at):
                 results.append(result)
-            elif isinstance(result, Exception):
-                logger.warning(f"Task failed: {type(result).__name__}: {result}")
-                
     except Exception as e:
         logger.error(f"Error in fetch_all_quotes: {e}")
     
     execution_time = time.time() - start_time
-    logger.info(f"🚀 Total execution time: {execution_time:.2f}s, Results: {len(results)}")
-    
-    # Log proxy statistics
-    proxy_stats = proxy_manager.get_proxy_stats()
-    if proxy_stats:
-        logger.info(f"📊 Proxy usage stats: {proxy_stats}")
+    logger.info(f"🚀 Total execution time: {execution_time:.2f}s, Results: {len(results)}",
+                extra={"event": "fan_out_completed", "duration": round(execution_time, 3), "results": len(results)})
     
+    # Proxy statistics are on /admin/proxy/stats and /metrics
     return results
 
+async def store_quote_cache(cache_key: str, send_amount: int, quotes: List[Dict], source: str = "request",
+                            cached_fetched_at: Optional[List[float]] = None) -> Dict:
+    """
+    Rank quotes and store them as the bucket's cache entry. The entry is as
+    old as the oldest reused per-provider quote (cached_fetched_at), if any.
+    """
+    if not quotes:
+        raise HTTPException(status_code=404, detail="No providers available for this route.")
+
+    # Sort by recipient_gets (highest first)
+    response_data = build_response(quotes)
+    response_results.observe(len(quotes))
+
+    # Cache the response for the whole amount bucket
+    cache_entry = make_cache_entry(send_amount, response_data, source=source,
+                                   fetched_at=min(cached_fetched_at or [], default=None))
+    await cache.set(cache_key, cache_entry)
+    return cache_entry
+
+async def refresh_quote_cache(cache_key: str, send_amount: int, receive_currency: str, receive_country: str,
+                              source: str = "request", forward: bool = True) -> Dict:
+    """
+    Fetch all quotes for a route and store them as the bucket's cache entry.
+    In cluster mode a route owned by another node is fetched from that node
+    (falling back to a local fetch if it is unavailable).
+    """
+    owner = cluster.owner_for(receive_country, receive_currency) if forward else None
+    if owner is not None:
+        try:
+            with tracer.span("cluster_forward", timing=True, owner=owner):
+                cache_entry = await cluster.fetch_entry(
+                    session_pool.get_session(cluster.host_of(owner)), owner,
+                    receive_country, receive_currency, send_amount, timeout=QUOTE_REQUEST_DEADLINE
+                )
+        except PeerUnavailableError as e:
+            logger.warning(f"Cluster forward failed, fetching {cache_key} locally: {e}")
+        else:
+            if cache_entry is None:
+                raise HTTPException(status_code=404, detail="No providers available for this route.")
+            await cache.set(cache_key, cache_entry)
+            return cache_entry
+
+    # Refreshes and prefetches replace an aging entry, so they skip the per-provider cache
+    cached_fetched_at: List[float] = []
+    quotes = await fetch_all_quotes(send_amount, receive_currency, receive_country,
+                                    use_provider_cache=source == "request", cached_fetched_at=cached_fetched_at)
+    return await store_quote_cache(cache_key, send_amount, quotes, source, cached_fetched_at)
+
+def schedule_background_refresh(cache_key: str, send_amount: int, receive_currency: str, receive_country: str):
+    """Refresh a stale cache entry without blocking the caller (once per key)."""
+    if cache_key in quote_flights.in_flight:
+        return
+
+    async def refresh():
+        try:
+            await asyncio.wait_for(
+                quote_flights.do(
+                    cache_key,
+                    lambda: refresh_quote_cache(cache_key, send_amount, receive_currency, receive_country,
+                                                source="refresh")
+                ),
+                timeout=QUOTE_REQUEST_DEADLINE
+            )
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {cache_key}: {type(e).__name__} - {e}")
+
+    task = asyncio.create_task(refresh())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+async def prefetch_quote(cache_key: str, send_amount: int, receive_currency: str, receive_country: str) -> Dict:
+    """Warm a popular cache key (shares the fetch with any concurrent user miss)."""
+    return await asyncio.wait_for(
+        quote_flights.do(
+            cache_key,
+            lambda: refresh_quote_cache(cache_key, send_amount, receive_currency, receive_country, source="prefetch")
+        ),
+        timeout=QUOTE_REQUEST_DEADLINE
+    )
+
+async def cached_entry_age(cache_key: str) -> Optional[float]:
+    cached_entry = await cache.get(cache_key)
+    return round(entry_age(cached_entry), 1) if cached_entry else None
+
+# Keeps the most requested routes refreshed ahead of expiry
+prefetcher = PrefetchScheduler(prefetch_quote, cached_entry_age, soft_ttl=CACHE_SOFT_TTL)
+
+# Checks proxies in the background and rotates failing ones out of get_best_proxy
+proxy_health = ProxyHealthScheduler(proxy_manager)
+
 # --- API Endpoints ---
 @app.get("/")
 def read_root():
     return {"status": "ok"}
 
 @app.get("/api/getRemittanceQuote")
-async def get_remittance_quote(request: Request, receive_country: str = Query(...), receive_currency: str = Query(...), send_amount: int = Query(...)):
+@tracer.traced("get_remittance_quote")
+async def get_remittance_quote(request: Request, response: Response, receive_country: str = Query(...), receive_currency: str = Query(...), send_amount: int = Query(...)):
     client_ip = request.client.host
-    check_rate_limit(client_ip)
+    await check_rate_limit(client_ip)
     
     country_lower = receive_country.lower()
     currency_upper = receive_currency.upper()
-    cache_key = f"{country_lower}:{currency_upper}:{send_amount}"
+    # Nearby amounts share a bucketed cache key
+    cache_key = make_cache_key(country_lower, currency_upper, send_amount)
     
     # Check cache first
-    if cache_key in cache:
-        cached_data = cache[cache_key]
-        print(f"📋 Cache hit for {cache_key}")
-        return cached_data
+    with tracer.span("cache_get", timing=True):
+        cached_entry = await cache.get(cache_key)
+    prefetcher.record_request(cache_key, country_lower, currency_upper, send_amount, cached_entry)
+    if cached_entry:
+        if is_stale(cached_entry):
+            # Serve the stale quote now and revalidate in the background
+            logger.info(f"📋 Stale cache hit for {cache_key}, refreshing in background", extra={"event": "cache_hit", "cache_key": cache_key, "stale": True})
+            schedule_background_refresh(cache_key, send_amount, currency_upper, country_lower)
+        else:
+            logger.info(f"📋 Cache hit for {cache_key}", extra={"event": "cache_hit", "cache_key": cache_key, "stale": False})
+        return response_for_amount(cached_entry, send_amount)
 
     start_time = time.time()
-    print(f"🔄 Processing request: {country_lower} -> {currency_upper}, Amount: {send_amount}")
+    logger.info(f"🔄 Processing request: {country_lower} -> {currency_upper}, Amount: {send_amount}", extra={"event": "request_started", "cache_key": cache_key})
     
     try:
-        # Reduced timeout to 3 seconds total
-        quotes = await asyncio.wait_for(
-            fetch_all_quotes(send_amount, currency_upper, country_lower), 
-            timeout=3.0
+        # Bounded by the global request deadline; concurrent misses await the same fetch
+        cache_entry = await asyncio.wait_for(
+            quote_flights.do(
+                cache_key,
+                lambda: refresh_quote_cache(cache_key, send_amount, currency_upper, country_lower)
+            ),
+            timeout=QUOTE_REQUEST_DEADLINE
         )
-        
-        if not quotes:
-            raise HTTPException(status_code=404, detail="No providers available for this route.")
-
-        # Sort by recipient_gets (highest first)
-        sorted_quotes = sorted(quotes, key=lambda x: x.get('recipient_gets', 0), reverse=True)
-        
-        response_data = {
-            "results": sorted_quotes,
-            "best_rate_provider": sorted_quotes[0] if sorted_quotes else None,
-        }
-        
-        # Cache the response
-        cache[cache_key] = response_data
+        response_data = response_for_amount(cache_entry, send_amount)
         
         total_time = time.time() - start_time
-        print(f"✅ Request completed in {total_time:.2f}s, Found {len(quotes)} quotes")
+        logger.info(f"✅ Request completed in {total_time:.2f}s, Found {len(response_data['results'])} quotes",
+                    extra={"event": "request_completed", "cache_key": cache_key,
+                           "duration": round(total_time, 3), "results": len(response_data['results'])})
         
         return response_data
         
     except asyncio.TimeoutError:
-        print(f"⏰ Request timed out after 3s")
+        logger.warning(f"⏰ Request timed out after {QUOTE_REQUEST_DEADLINE}s", extra={"event": "request_timeout", "cache_key": cache_key})
         raise HTTPException(status_code=408, detail="Request timed out.")
     except Exception as e:
-        print(f"❌ Unhandled API error: {e}")
+        logger.exception(f"❌ Unhandled API error: {e}", extra={"event": "api_error"})
         raise HTTPException(status_code=500, detail="Internal Server Error.")
 
+async def stream_quotes(cache_key: str, send_amount: int, receive_currency: str, receive_country: str) -> AsyncIterator[str]:
+    """
+    NDJSON stream for one quote request:
+    {"type": "quote", "quote": {...}} per provider as it arrives, then
+    {"type": "summary", ...ranked response...} or {"type": "error", ...}.
+    """
+    def line(payload: Dict) -> str:
+        return json.dumps(payload, ensure_ascii=False) + "\n"
+
+    cached_entry = await cache.get(cache_key)
+    prefetcher.record_request(cache_key, receive_country, receive_currency, send_amount, cached_entry)
+    if cached_entry:
+        if is_stale(cached_entry):
+            schedule_background_refresh(cache_key, send_amount, receive_currency, receive_country)
+        response_data = response_for_amount(cached_entry, send_amount)
+        for quote in response_data["results"]:
+            yield line({"type": "quote", "quote": quote})
+        yield line(dict(response_data, type="summary"))
+        return
+
+    # Leading the fetch: providers are pushed to the queue as they complete.
+    # Joining another request's fetch: the queue stays empty and the quotes
+    # come from the shared cache entry once it is ready.
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def fetch_streaming() -> Dict:
+        quotes, cached_fetched_at = [], []
+        async for quote in iter_quotes(send_amount, receive_currency, receive_country,
+                                       cached_fetched_at=cached_fetched_at):
+            quotes.append(quote)
+            queue.put_nowait(quote)
+        return await store_quote_cache(cache_key, send_amount, quotes, cached_fetched_at=cached_fetched_at)
+
+    if cluster.owner_for(receive_country, receive_currency) is None:
+        fetch = fetch_streaming
+    else:
+        # Another node owns the route: its quotes arrive with the entry
+        def fetch():
+            return refresh_quote_cache(cache_key, send_amount, receive_currency, receive_country)
+
+    flight = asyncio.ensure_future(quote_flights.do(cache_key, fetch))
+    deadline = time.time() + QUOTE_REQUEST_DEADLINE
+    streamed = set()
+
+    try:
+        while True:
+            get_next = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {get_next, flight},
+                timeout=max(0.0, deadline - time.time()),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if get_next in done:
+                quote = get_next.result()
+                streamed.add(quote["provider"])
+                yield line({"type": "quote", "quote": quote})
+                continue
+            get_next.cancel()
+            if not done:
+                yield line({"type": "error", "status": 408, "error": "Request timed out."})
+                return
+            break
+
+        while not queue.empty():
+            quote = queue.get_nowait()
+            streamed.add(quote["provider"])
+            yield line({"type": "quote", "quote": quote})
+
+        try:
+            cache_entry = flight.result()
+        except HTTPException as e:
+            yield line({"type": "error", "status": e.status_code, "error": e.detail})
+            return
+        except Exception as e:
+            logger.exception(f"❌ Unhandled streaming API error: {e}", extra={"event": "api_error"})
+            yield line({"type": "error", "status": 500, "error": "Internal Server Error."})
+            return
+
+        response_data = response_for_amount(cache_entry, send_amount)
+        for quote in response_data["results"]:
+            if quote["provider"] not in streamed:
+                yield line({"type": "quote", "quote": quote})
+        yield line(dict(response_data, type="summary"))
+    finally:
+        # The shared fetch keeps running (and fills the cache) if the client leaves
+        flight.cancel()
+
+@app.get("/api/getRemittanceQuote/stream")
+async def get_remittance_quote_stream(request: Request, receive_country: str = Query(...), receive_currency: str = Query(...), send_amount: int = Query(...)):
+    """Streaming variant of /api/getRemittanceQuote (NDJSON, one line per provider)."""
+    client_ip = request.client.host
+    await check_rate_limit(client_ip)
+
+    country_lower = receive_country.lower()
+    currency_upper = receive_currency.upper()
+    cache_key = make_cache_key(country_lower, currency_upper, send_amount)
+
+    return StreamingResponse(
+        stream_quotes(cache_key, send_amount, currency_upper, country_lower),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class QuoteRequestItem(BaseModel):
+    receive_country: str
+    receive_currency: str
+    send_amount: int
+
+class BatchQuoteRequest(BaseModel):
+    requests: List[QuoteRequestItem]
+
+async def fetch_batch_entry(client_ip: str, cache_key: str, send_amount: int, receive_currency: str,
+                            receive_country: str) -> Dict:
+    """
+    Cache entry for one distinct batch key (cached, joined in-flight, or
+    fetched). Only a key this batch starts fetching takes a batch slot and
+    counts against the client's rate limit; joining another fetch is free.
+    """
+    def join_or_fetch():
+        return asyncio.wait_for(
+            quote_flights.do(
+                cache_key,
+                lambda: refresh_quote_cache(cache_key, send_amount, receive_currency, receive_country)
+            ),
+            timeout=QUOTE_REQUEST_DEADLINE
+        )
+
+    cached_entry = await cache.get(cache_key)
+    if cached_entry:
+        if is_stale(cached_entry):
+            schedule_background_refresh(cache_key, send_amount, receive_currency, receive_country)
+        return cached_entry
+
+    if cache_key not in quote_flights.in_flight:
+        async with batch_semaphore:
+            # Another request may have fetched or started the key while this one waited
+            cached_entry = cache.peek(cache_key)
+            if cached_entry:
+                return cached_entry
+            if cache_key not in quote_flights.in_flight:
+                await check_rate_limit(client_ip)
+                return await join_or_fetch()
+    return await join_or_fetch()
+
+@app.post("/api/getRemittanceQuotes")
+@tracer.traced("get_remittance_quotes_batch")
+async def get_remittance_quotes_batch(request: Request, response: Response, batch: BatchQuoteRequest):
+    """
+    Batch quotes for many (country, currency, amount) items in one call.
+    Items sharing a cache key (route + amount bucket) share one upstream
+    fan-out; results are returned in request order. Besides the call itself,
+    every key whose fetch the batch starts is charged to the client's rate
+    limit; keys over the limit get a 429 item error. Keys still pending after
+    BATCH_REQUEST_DEADLINE get a 408 item error.
+    """
+    client_ip = request.client.host
+    await check_rate_limit(client_ip)
+
+    if not batch.requests:
+        raise HTTPException(status_code=400, detail="No quote requests given.")
+    if len(batch.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many quote requests (max {BATCH_MAX_ITEMS}).")
+
+    # Deduplicate upstream work by cache key
+    items = []
+    distinct: Dict[str, tuple] = {}
+    for item in batch.requests:
+        country_lower = item.receive_country.lower()
+        currency_upper = item.receive_currency.upper()
+        cache_key = make_cache_key(country_lower, currency_upper, item.send_amount)
+        prefetcher.record_request(cache_key, country_lower, currency_upper, item.send_amount, cache.peek(cache_key))
+        items.append((item, cache_key))
+        distinct.setdefault(cache_key, (item.send_amount, currency_upper, country_lower))
+
+    start_time = time.time()
+    keys = list(distinct)
+    entries = await asyncio.gather(
+        *(asyncio.wait_for(fetch_batch_entry(client_ip, key, *distinct[key]), timeout=BATCH_REQUEST_DEADLINE)
+          for key in keys),
+        return_exceptions=True
+    )
+    entries_by_key = dict(zip(keys, entries))
+
+    results = []
+    for item, cache_key in items:
+        item_result = {
+            "receive_country": item.receive_country,
+            "receive_currency": item.receive_currency,
+            "send_amount": item.send_amount,
+        }
+        entry = entries_by_key[cache_key]
+        if isinstance(entry, HTTPException):
+            item_result["error"] = {"status": entry.status_code, "detail": entry.detail}
+        elif isinstance(entry, asyncio.TimeoutError):
+            item_result["error"] = {"status": 408, "detail": "Request timed out."}
+        elif isinstance(entry, BaseException):
+            logger.error(f"❌ Unhandled batch API error: {entry}", extra={"event": "api_error"})
+            item_result["error"] = {"status": 500, "detail": "Internal Server Error."}
+        else:
+            item_result.update(response_for_amount(entry, item.send_amount))
+        results.append(item_result)
+
+    logger.info(f"✅ Batch of {len(items)} quotes ({len(keys)} distinct) completed in {time.time() - start_time:.2f}s",
+                extra={"event": "request_completed", "items": len(items), "distinct": len(keys)})
+    return {"results": results}
+
+@app.get(CLUSTER_QUOTE_PATH)
+async def get_cluster_quote(request: Request, receive_country: str = Query(...), receive_currency: str = Query(...), send_amount: int = Query(...)):
+    """클러스터 피어 전용: 이 노드가 담당하는 경로의 캐시 엔트리 조회 (없거나 오래되었으면 직접 조회)"""
+    # Not part of the public API unless cluster mode is on
+    if not cluster.enabled:
+        raise HTTPException(status_code=404, detail="Not Found.")
+    if not cluster.check_secret(request.headers.get(CLUSTER_SECRET_HEADER)):
+        raise HTTPException(status_code=403, detail="Forbidden.")
+    cluster.served_for_peers += 1
+
+    country_lower = receive_country.lower()
+    currency_upper = receive_currency.upper()
+    cache_key = make_cache_key(country_lower, currency_upper, send_amount)
+
+    # Peers' misses count towards this node's popular routes
+    cached_entry = await cache.get(cache_key)
+    prefetcher.record_request(cache_key, country_lower, currency_upper, send_amount, cached_entry)
+    if cached_entry and not is_stale(cached_entry):
+        return cached_entry
+
+    try:
+        return await asyncio.wait_for(
+            quote_flights.do(
+                cache_key,
+                lambda: refresh_quote_cache(cache_key, send_amount, currency_upper, country_lower, forward=False)
+            ),
+            timeout=QUOTE_REQUEST_DEADLINE
+        )
+    except HTTPException as e:
+        if e.status_code != 404:
+            raise
+        # Distinct from a 404 of a node without cluster mode, which the caller treats as unavailable
+        return Response(status_code=CLUSTER_NO_PROVIDERS_STATUS)
+    except asyncio.TimeoutError:
+        if cached_entry:
+            return cached_entry
+        raise HTTPException(status_code=408, detail="Request timed out.")
+
 @app.on_event("startup")
 async def startup_event():
-    """애플리케이션 시작 시 프록시 초기화"""
+    """애플리케이션 시작 시 업스트림 세션 풀 및 프록시 초기화"""
+    await session_pool.start(provider_registry.hosts())
+
+    if PREFETCH_ENABLED:
+        prefetcher.start()
+
     try:
         # 프록시 설정 로드
         proxy_configs = proxy_config_manager.get_proxy_configs()
@@ -1171,13 +1411,23 @@ async def startup_event():
         
         logger.info(f"초기화된 프록시 수: {len(proxy_configs)}")
         
-        # 프록시 헬스 체크
-        if proxy_configs:
-            await proxy_manager.health_check_all_proxies()
+        # 프록시 헬스 체크 (백그라운드, 동시 실행 수 제한)
+        if PROXY_HEALTH_ENABLED:
+            proxy_health.start()
         
     except Exception as e:
         logger.error(f"프록시 초기화 오류: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """애플리케이션 종료 시 프리페치·프록시 헬스 체크 중지, 업스트림·프록시 세션 풀 정리 및 로그 플러시"""
+    await prefetcher.stop()
+    await proxy_health.stop()
+    await session_pool.close()
+    await proxy_manager.close()
+    # Flush queued log records
+    logging_pipeline.shutdown()
+
 # --- Proxy Management Endpoints ---
 @app.get("/admin/proxy/stats")
 async def get_proxy_stats():
@@ -1191,9 +1441,14 @@ async def get_proxy_stats():
 @app.post("/admin/proxy/health-check")
 async def health_check_proxies():
     """프록시 헬스 체크 실행"""
-    await proxy_manager.health_check_all_proxies()
+    await proxy_health.check_all()
     return {"message": "헬스 체크 완료", "stats": proxy_manager.get_proxy_stats()}
 
+@app.get("/admin/proxy/health")
+async def get_proxy_health():
+    """백그라운드 프록시 헬스 체크 상태 조회 (로테이션 포함 여부, 다음 체크 시각)"""
+    return proxy_health.get_stats()
+
 @app.get("/admin/proxy/test/{proxy_ip}")
 async def test_single_proxy(proxy_ip: str):
     """특정 프록시 테스트"""
@@ -1208,7 +1463,154 @@ async def test_single_proxy(proxy_ip: str):
         "stats": proxy_manager.proxy_stats.get(proxy_ip, {})
     }
 
+@app.get("/admin/upstream/stats")
+async def get_upstream_pool_stats():
+    """업스트림 세션 풀 및 로컬 환율 모델 상태 조회"""
+    return {
+        "host_count": len(session_pool.sessions),
+        "hosts": session_pool.get_stats(),
+        "proxy_sessions": proxy_manager.session_pool.get_stats(),
+        "rate_models": rate_models.get_stats()
+    }
+
+# --- Metrics Endpoint ---
+def collect_cache_metrics():
+    """Response/provider cache counters and the in-flight fan-outs."""
+    events: Dict[str, list] = {}
+    for layer, counters in cache.counters().items():
+        for event, value in counters.items():
+            events.setdefault(event, []).append(({"cache": "response", "layer": layer}, value))
+    provider_cache_stats = provider_cache.get_stats()
+    events.setdefault("hits", []).append(({"cache": "provider", "layer": "memory"}, provider_cache_stats["hits"]))
+    events.setdefault("misses", []).append(({"cache": "provider", "layer": "memory"}, provider_cache_stats["misses"]))
+    for event, samples in events.items():
+        yield f"remitbuddy_cache_{event}_total", "counter", f"Cache {event} by cache and layer", samples
+
+    yield "remitbuddy_last_known_good_served_total", "counter", "Failed provider calls answered with the last known good quote", \
+        [({}, provider_cache_stats["last_known_good_served"])]
+    yield "remitbuddy_in_flight_fan_outs", "gauge", "Upstream fan-outs currently running (single-flight leaders)", \
+        [({}, len(quote_flights.in_flight))]
+    yield "remitbuddy_coalesced_requests_total", "counter", "Requests that joined an in-flight fan-out", \
+        [({}, quote_flights.coalesced_calls)]
+    yield "remitbuddy_circuit_open", "gauge", "1 if the provider's circuit is not closed", \
+        [({"provider": provider}, int(breaker.state != "closed")) for provider, breaker in circuit_breakers.breakers.items()]
+
+def collect_proxy_metrics():
+    """Proxy utilisation from ProxyManager.proxy_stats."""
+    gauges = {
+        "concurrent_requests": ("Requests in flight through the proxy", []),
+        "max_concurrent": ("Concurrent request limit of the proxy", []),
+        "requests_last_minute": ("Requests through the proxy in the last minute", []),
+        "rate_limit_per_minute": ("Per-minute request limit of the proxy", []),
+        "healthy": ("1 if the proxy is in rotation per health checks", []),
+        "blocked": ("1 if the proxy is blocked for its failure rate", []),
+    }
+    requests_total, failures_total = [], []
+    now = time.time()
+    for proxy in proxy_manager.proxies:
+        stats = proxy_manager.proxy_stats[proxy.ip]
+        labels = {"proxy": f"{proxy.ip}:{proxy.port}"}
+        gauges["concurrent_requests"][1].append((labels, stats['concurrent_requests']))
+        gauges["max_concurrent"][1].append((labels, proxy.max_concurrent))
+        gauges["requests_last_minute"][1].append((labels, proxy_manager.requests_last_minute(proxy)))
+        gauges["rate_limit_per_minute"][1].append((labels, proxy.rate_limit_per_minute))
+        gauges["healthy"][1].append((labels, int(stats['healthy'])))
+        gauges["blocked"][1].append((labels, int(stats['blocked_until'] > now)))
+        requests_total.append((labels, stats['requests']))
+        failures_total.append((labels, stats['failures']))
+
+    for name, (help, samples) in gauges.items():
+        yield f"remitbuddy_proxy_{name}", "gauge", help, samples
+    yield "remitbuddy_proxy_requests_total", "counter", "Requests sent through the proxy", requests_total
+    yield "remitbuddy_proxy_failures_total", "counter", "Failed requests through the proxy", failures_total
+
+metrics.register_collector(collect_cache_metrics)
+metrics.register_collector(collect_proxy_metrics)
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 형식 메트릭 (프로바이더 지연/결과, 캐시, 진행 중 팬아웃, 프록시 사용률)"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+# --- Cache Endpoints ---
+@app.get("/admin/cache/stats")
+async def get_cache_stats():
+    """견적 캐시 및 요청 병합(single-flight) 통계 조회"""
+    return {
+        **cache.get_stats(),
+        "soft_ttl": CACHE_SOFT_TTL,
+        "hard_ttl": CACHE_HARD_TTL,
+        "background_refreshes": len(background_tasks),
+        "single_flight": quote_flights.get_stats(),
+        "provider_cache": provider_cache.get_stats()
+    }
+
+@app.get("/admin/cluster")
+async def get_cluster_stats():
+    """클러스터 모드 상태 조회 (피어, 경로 소유 비율, 포워딩 통계)"""
+    return cluster.get_stats()
+
+@app.get("/admin/logging/stats")
+async def get_logging_stats():
+    """로그 파이프라인 상태 조회 (대기 중인 레코드, 샘플링/레이트 리밋으로 버려진 수)"""
+    return logging_pipeline.get_stats()
+
+@app.get("/admin/rate-limit/stats")
+async def get_rate_limit_stats():
+    """클라이언트별 레이트 리밋 상태 조회"""
+    return {
+        "limit": RATE_LIMIT,
+        "window_seconds": RATE_LIMIT_WINDOW,
+        **rate_limiter.get_stats()
+    }
+
+@app.get("/admin/upstream/latency")
+async def get_upstream_latency_stats():
+    """프로바이더별 지연시간 분포, 적응형 타임아웃 및 헤징/재시도 통계 조회"""
+    return {
+        "latency": provider_latency.get_stats(),
+        "timeouts": {
+            provider: round(provider_timeout(provider, QUOTE_REQUEST_DEADLINE - QUOTE_ASSEMBLY_MARGIN), 2)
+            for provider in (quote_provider.name for quote_provider in provider_registry.providers)
+        },
+        "hedging": hedge_policy.get_stats()
+    }
+
+@app.get("/admin/providers/routes")
+async def get_provider_routes():
+    """경로(국가:통화)별 지원 프로바이더 인덱스 조회"""
+    return {
+        "provider_count": len(provider_registry.providers),
+        "routes": provider_registry.get_routes()
+    }
+
+@app.get("/admin/circuit-breakers")
+async def get_circuit_breaker_stats():
+    """프로바이더별 서킷 브레이커 상태 조회"""
+    return {"providers": circuit_breakers.get_stats()}
+
+@app.post("/admin/circuit-breakers/{provider}/reset")
+async def reset_circuit_breaker(provider: str):
+    """특정 프로바이더의 서킷 브레이커 초기화"""
+    if provider not in circuit_breakers.breakers:
+        raise HTTPException(status_code=404, detail="프로바이더를 찾을 수 없습니다")
+    circuit_breakers.get(provider).reset()
+    return {"provider": provider, "stats": circuit_breakers.get(provider).get_stats()}
+
+@app.get("/admin/prefetch/stats")
+async def get_prefetch_stats():
+    """인기 경로 프리페치 현황 및 캐시 적중 기여도 조회"""
+    return prefetcher.get_stats()
+
 # --- Debug Endpoints ---
+@app.get("/debug/traces")
+async def debug_traces(limit: int = Query(20, ge=1, le=100)):
+    """느린 요청의 최근 트레이스 (TRACE_SLOW_THRESHOLD 초과)"""
+    return {
+        "stats": tracer.get_stats(),
+        "slow_traces": tracer.recent_slow(limit),
+    }
+
 @app.get("/debug/hanpass-stats")
 async def debug_hanpass_stats():
     """Get Hanpass connection statistics and current mode."""
@@ -0,0 +1,121 @@
+"""
+Prometheus text-format metrics.
+
+Counters and histograms are plain dicts keyed by label values, updated
+only from the event loop thread, so the hot path needs no locks: an
+increment is a dict lookup and an add, and an observation also does a
+bisect over the bucket bounds. Values that other components already
+track (cache sizes, proxy stats, in-flight fan-outs) are read by
+collectors at scrape time instead of being mirrored on the hot path.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# (metric name, type, help, [(labels, value[, name suffix]), ...])
+MetricFamily = Tuple[str, str, str, List[tuple]]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def collect(self) -> Iterable[MetricFamily]:
+        yield self.name, "counter", self.help, [
+            (dict(zip(self.labelnames, labelvalues)), value)
+            for labelvalues, value in self.values.items()
+        ]
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = [bound for bound in buckets if bound != float('inf')] + [float('inf')]
+        # labels -> [per-bucket counts (non-cumulative), sum]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        series = self.values.get(labelvalues)
+        if series is None:
+            series = self.values[labelvalues] = [[0] * len(self.buckets), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def collect(self) -> Iterable[MetricFamily]:
+        samples = []
+        for labelvalues, (counts, total) in self.values.items():
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append((dict(labels, le=_format_value(bound)), cumulative, "_bucket"))
+            samples.append((labels, total, "_sum"))
+            samples.append((labels, cumulative, "_count"))
+        yield self.name, "histogram", self.help, samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: List = []
+        self.collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help, buckets, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        """collector() yields metric families computed at scrape time."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        families = [family for metric in self.metrics for family in metric.collect()]
+        for collector in self.collectors:
+            families.extend(collector())
+
+        for name, metric_type, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample in samples:
+                labels, value = sample[0], sample[1]
+                suffix = sample[2] if len(sample) > 2 else ""
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
@@ -0,0 +1,375 @@
+"""
+Local mock provider farm for load testing.
+
+One aiohttp server answers every provider endpoint on its real path, with
+the request and response shapes the scrapers in main.py parse: Hanpass and
+Coinshot JSON, GmoneyTrans HTML fragments, GME Remit's stringly typed JSON,
+JP Remit's ASP.NET {"d": ...} wrapper, E9Pay's nested JSON string, the
+Wirebarley rate table and so on. Point the API at it with
+    PROVIDER_BASE_URLS='{"*": "http://127.0.0.1:8900"}' RATE_LIMIT=1000000 uvicorn main:app
+and drive load with loadtest.py.
+
+Each provider's behaviour is configurable (defaults from the command line,
+per-provider overrides from --config or POST /_mock/config):
+- latency_ms / jitter_ms: response delay
+- error_rate: fraction of failed responses (HTTP 503 or the provider's own
+  in-band error payload)
+- block_after / block_window / block_seconds / block_mode: block a client
+  that sends more than block_after requests per block_window seconds, like
+  a provider's WAF. Blocked requests get a 403 HTML page ("status"), a
+  dropped connection ("reset") or no answer at all ("hang").
+GET /_mock/stats reports requests, errors and blocks per provider.
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import deque
+from dataclasses import dataclass, asdict, replace
+from typing import Awaitable, Callable, Dict, Optional
+
+from aiohttp import web
+
+# Mid-market rates: foreign currency per KRW
+MOCK_RATES = {
+    "VND": 18.62, "PHP": 0.0412, "IDR": 11.63, "THB": 0.0252, "NPR": 0.0975,
+    "MMK": 1.52, "UZS": 9.14, "LKR": 0.219, "BDT": 0.0871, "KHR": 2.95,
+    "MNT": 2.47, "JPY": 0.108, "USD": 0.00072, "CNY": 0.0052, "AUD": 0.00111,
+    "NZD": 0.00121, "SGD": 0.00095, "MYR": 0.00331, "GBP": 0.00056, "EUR": 0.00066,
+    "INR": 0.0612, "HKD": 0.0056, "CAD": 0.00099,
+}
+
+# Wirebarley table rows: country code -> currency
+WIREBARLEY_ROUTES = {
+    "AU": "AUD", "NZ": "NZD", "PH": "PHP", "VN": "VND", "NP": "NPR", "ID": "IDR",
+    "CN": "CNY", "SG": "SGD", "MY": "MYR", "TH": "THB", "GB": "GBP", "FR": "EUR",
+    "DE": "EUR", "US": "USD", "JP": "JPY", "IN": "INR", "KH": "KHR", "BD": "BDT",
+    "HK": "HKD", "CA": "CAD", "UZ": "UZS",
+}
+
+# Cross quotes by platform id only (mirrors CROSS_PLATFORM_IDS in main.py)
+CROSS_PLATFORM_CURRENCIES = {
+    144: "VND", 20: "PHP", 68: "IDR", 60: "THB", 85: "NPR", 150: "KHR",
+    235: "MMK", 233: "UZS", 76: "BDT", 250: "MNT", 75: "LKR",
+}
+
+# Rate margin and flat fee per provider, so rankings differ between providers
+PROVIDER_PRICING = {
+    "hanpass": (0.986, 5000), "cross": (0.984, 4000), "gmoneytrans": (0.981, 5000),
+    "gmeremit": (0.983, 5000), "jpremit": (0.979, 3000), "themoin": (0.985, 4500),
+    "wirebarley": (0.982, 5000), "sbicosmoney": (0.980, 0), "e9pay": (0.987, 5000),
+    "coinshot": (0.978, 3000),
+}
+
+BLOCKED_PAGE = "<html><head><title>Access Denied</title></head><body><h1>Access Denied</h1></body></html>"
+
+
+@dataclass
+class MockBehaviour:
+    latency_ms: float = 150.0
+    jitter_ms: float = 100.0
+    error_rate: float = 0.0
+    # 0 disables blocking
+    block_after: int = 0
+    block_window: float = 60.0
+    block_seconds: float = 300.0
+    # "status" (403 page), "reset" (drop the connection) or "hang" (never answer)
+    block_mode: str = "status"
+
+
+@dataclass
+class Quote:
+    rate: float
+    fee: float
+    receive_amount: float
+
+
+def price(provider: str, currency: str, send_amount: float) -> Optional[Quote]:
+    """Deterministic quote for a provider, jittered by a few basis points."""
+    mid_rate = MOCK_RATES.get(currency)
+    if mid_rate is None:
+        return None
+    margin, fee = PROVIDER_PRICING[provider]
+    rate = mid_rate * margin * random.uniform(0.9995, 1.0005)
+    return Quote(rate=rate, fee=fee, receive_amount=max(0.0, (send_amount - fee) * rate))
+
+
+def _amount(value) -> float:
+    return float(str(value).replace(",", "") or 0)
+
+
+# --- Provider handlers: (request) -> response, plus an in-band error payload ---
+async def hanpass(request: web.Request) -> web.Response:
+    body = await request.json()
+    quote = price("hanpass", body.get("toCurrencyCode"), _amount(body.get("inputAmount")))
+    if quote is None:
+        return web.json_response({"resultCode": "9001", "resultMessage": "Unsupported currency"})
+    return web.json_response({
+        "resultCode": "0",
+        "resultMessage": "success",
+        "exchangeRate": f"{quote.rate:.6f}",
+        "toAmount": f"{quote.receive_amount:.2f}",
+        "transferFee": str(int(quote.fee)),
+        "inputAmount": body.get("inputAmount"),
+    })
+
+
+async def cross(request: web.Request) -> web.Response:
+    currency = CROSS_PLATFORM_CURRENCIES.get(int(request.query.get("platform_id", 0)))
+    send_amount = _amount(request.query.get("sending_amount", 0))
+    quote = price("cross", currency, send_amount)
+    if quote is None:
+        return web.json_response({"data": {}}, status=400)
+    return web.json_response({"data": {
+        "sending_amount": send_amount,
+        "pay_amount": send_amount - quote.fee,
+        "fee": quote.fee,
+        "receiving_amount": round(quote.receive_amount, 2),
+        "receiving_currency": currency,
+    }})
+
+
+async def gmoneytrans(request: web.Request) -> web.Response:
+    quote = price("gmoneytrans", request.query.get("currencyType"), _amount(request.query.get("total_collected", 0)))
+    if quote is None:
+        return web.Response(text="<tr><td>Invalid request</td></tr>", content_type="text/html")
+    # The calculator returns table cells whose ids carry the values
+    return web.Response(text=(
+        f'<tr><td class="serviceCharge--td_clm--{quote.fee:,.0f}">Service charge</td>'
+        f'<td class="exchangeRate--td_clm--{quote.rate:.4f}">Exchange rate</td>'
+        f'<td class="payoutAmount--td_clm--{quote.receive_amount:,.2f}">Payout</td></tr>'
+    ), content_type="text/html")
+
+
+async def gmeremit(request: web.Request) -> web.Response:
+    form = await request.post()
+    quote = price("gmeremit", form.get("pCurr"), _amount(form.get("cAmt", 0)))
+    if quote is None:
+        return web.json_response({"errorCode": "1", "msg": "Invalid currency", "scCharge": "null", "exRate": "null", "pAmt": "null"})
+    return web.json_response({
+        "errorCode": "0",
+        "msg": "Success",
+        "scCharge": f"{quote.fee:,.0f}",
+        "exRate": f"{quote.rate:.6f}",
+        "pAmt": f"{quote.receive_amount:,.2f}",
+        "collAmt": form.get("cAmt"),
+    })
+
+
+async def jpremit(request: web.Request) -> web.Response:
+    body = await request.json()
+    quote = price("jpremit", body.get("country"), _amount(body.get("sendmoney", 0)))
+    if quote is None:
+        return web.json_response({"d": {"ServiceFee": None, "customer_rate": None}})
+    return web.json_response({"d": {
+        "__type": "calcfeeResult",
+        "ServiceFee": str(int(quote.fee)),
+        "customer_rate": f"{quote.rate:.6f}",
+        "receiveMoney": f"{quote.receive_amount:,.2f}",
+    }})
+
+
+async def themoin(request: web.Request) -> web.Response:
+    body = await request.json()
+    currency = body.get("targetCurrency")
+    quote = price("themoin", currency, _amount(body.get("transferAmount", 0)))
+    if quote is None:
+        return web.json_response({"ret": "fail", "message": "unsupported corridor"})
+    return web.json_response({"ret": "success", "quoteV2": {
+        "sourceAmount": {"amount": body.get("transferAmount"), "currency": "KRW"},
+        "feeAmount": {"amount": quote.fee, "currency": "KRW"},
+        "destinationAmount": {"amount": round(quote.receive_amount, 2), "currency": currency},
+    }})
+
+
+async def wirebarley(request: web.Request) -> web.Response:
+    margin, fee = PROVIDER_PRICING["wirebarley"]
+    ex_rates = []
+    for country, currency in WIREBARLEY_ROUTES.items():
+        rate = MOCK_RATES[currency] * margin
+        ex_rates.append({
+            "country": country,
+            "currency": currency,
+            "wbRateData": {
+                "wbRate": round(rate, 6),
+                "threshold1": 500000, "wbRate1": round(rate * 1.001, 6),
+                "threshold2": 1000000, "wbRate2": round(rate * 1.002, 6),
+                "threshold3": 3000000, "wbRate3": round(rate * 1.003, 6),
+            },
+            "transferFees": [
+                {"min": 10000, "max": 5000000, "threshold1": 500000, "fee1": fee, "fee2": 0},
+            ],
+        })
+    return web.json_response({"status": 0, "data": {"exRates": ex_rates}})
+
+
+async def sbicosmoney(request: web.Request) -> web.Response:
+    body = await request.json()
+    mid_rate = MOCK_RATES.get(body.get("currency"))
+    if mid_rate is None:
+        return web.json_response({"exchangeRate": 0})
+    return web.json_response({"exchangeRate": round(mid_rate * PROVIDER_PRICING["sbicosmoney"][0], 6)})
+
+
+async def e9pay(request: web.Request) -> web.Response:
+    form = await request.post()
+    quote = price("e9pay", form.get("RCVER_EXPECT_CRNCY_COD"), _amount(form.get("DEFRAY_AMOUNT", 0)))
+    if quote is None:
+        return web.json_response({"responseCode": "S", "data": json.dumps({"RESULT_COD": "F", "RESULT_MSG": "unsupported"})})
+    # The quote itself is a JSON document encoded as a string
+    return web.json_response({"responseCode": "S", "data": json.dumps({
+        "RESULT_COD": "S",
+        "DEFRAY_AMOUNT": form.get("DEFRAY_AMOUNT"),
+        "EXCHG_RATE": f"{quote.rate:.6f}",
+        "RCVER_EXPECT_RECPT_AMOUNT": f"{quote.receive_amount:.2f}",
+    })})
+
+
+async def coinshot(request: web.Request) -> web.Response:
+    form = await request.post()
+    quote = price("coinshot", form.get("receivingCurrency"), _amount(form.get("sendingAmount", 0)))
+    if quote is None:
+        return web.json_response({"toAmount": 0, "fromFee": 0})
+    return web.json_response({
+        "fromAmount": form.get("sendingAmount"),
+        "fromFee": quote.fee,
+        "toAmount": round(quote.receive_amount, 2),
+        "rate": quote.rate,
+    })
+
+
+Handler = Callable[[web.Request], Awaitable[web.Response]]
+
+# provider -> (method, path, handler, in-band error response or None)
+PROVIDER_ENDPOINTS: Dict[str, tuple] = {
+    "hanpass": ("POST", "/app/v1/remittance/get-cost", hanpass,
+                lambda: web.json_response({"resultCode": "9999", "resultMessage": "System error"})),
+    "cross": ("GET", "/api/v4/remit/quote/", cross, None),
+    "gmoneytrans": ("POST", "/exratenew1/ajx_calcRate.asp", gmoneytrans,
+                    lambda: web.Response(text="<tr><td>Service temporarily unavailable</td></tr>", content_type="text/html")),
+    "gmeremit": ("POST", "/ExchangeRate.aspx", gmeremit,
+                 lambda: web.json_response({"errorCode": "1", "msg": "Internal error", "scCharge": "null", "exRate": "null", "pAmt": "null"})),
+    "jpremit": ("POST", "/default.aspx/calcfee", jpremit,
+                lambda: web.json_response({"Message": "There was an error processing the request.", "ExceptionType": ""}, status=500)),
+    "themoin": ("POST", "/v0/quote/ma", themoin, lambda: web.json_response({"ret": "fail", "message": "quote error"})),
+    "wirebarley": ("GET", "/my/remittance/api/v1/exrate/KR/KRW", wirebarley,
+                   lambda: web.json_response({"status": 500, "data": None})),
+    "sbicosmoney": ("POST", "/calc/amount", sbicosmoney, None),
+    "e9pay": ("POST", "/cmm/calcExchangeRate.do", e9pay, lambda: web.json_response({"responseCode": "E", "data": "{}"})),
+    "coinshot": ("POST", "/calculate/receiving/i", coinshot, None),
+}
+
+
+class ProviderFarm:
+    def __init__(self, default: MockBehaviour = None, overrides: Dict[str, Dict] = None):
+        self.default = default or MockBehaviour()
+        self.behaviours: Dict[str, MockBehaviour] = {}
+        # (provider, client ip) -> request times in the block window / blocked until
+        self.request_times: Dict[tuple, deque] = {}
+        self.blocked_until: Dict[tuple, float] = {}
+        self.stats = {provider: {"requests": 0, "errors": 0, "blocked": 0} for provider in PROVIDER_ENDPOINTS}
+        self.configure(overrides or {})
+
+    def configure(self, overrides: Dict[str, Dict]):
+        """Apply {"provider" or "*": {behaviour fields}} overrides on top of the current behaviour."""
+        common = overrides.get("*", {})
+        self.default = replace(self.default, **common)
+        for provider in PROVIDER_ENDPOINTS:
+            current = self.behaviours.get(provider, self.default)
+            self.behaviours[provider] = replace(current, **{**common, **overrides.get(provider, {})})
+
+    def _is_blocked(self, provider: str, behaviour: MockBehaviour, client: str) -> bool:
+        if not behaviour.block_after:
+            return False
+        now = time.monotonic()
+        key = (provider, client)
+        if self.blocked_until.get(key, 0) > now:
+            return True
+        window = self.request_times.setdefault(key, deque())
+        window.append(now)
+        while window and window[0] <= now - behaviour.block_window:
+            window.popleft()
+        if len(window) > behaviour.block_after:
+            self.blocked_until[key] = now + behaviour.block_seconds
+            window.clear()
+            return True
+        return False
+
+    def endpoint(self, provider: str, handler: Handler, error_response) -> Handler:
+        async def handle(request: web.Request) -> web.StreamResponse:
+            behaviour = self.behaviours[provider]
+            stats = self.stats[provider]
+            stats["requests"] += 1
+
+            if self._is_blocked(provider, behaviour, request.remote):
+                stats["blocked"] += 1
+                if behaviour.block_mode == "hang":
+                    await asyncio.sleep(3600)
+                if behaviour.block_mode == "reset" and request.transport is not None:
+                    # Drop the connection without answering
+                    request.transport.abort()
+                    raise asyncio.CancelledError()
+                return web.Response(text=BLOCKED_PAGE, status=403, content_type="text/html")
+
+            # Read the body up front, as a real server would before working on it
+            await request.read()
+            delay = behaviour.latency_ms + random.uniform(-behaviour.jitter_ms, behaviour.jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+
+            if random.random() < behaviour.error_rate:
+                stats["errors"] += 1
+                if error_response is not None and random.random() < 0.5:
+                    return error_response()
+                return web.Response(text="Service Unavailable", status=503)
+            return await handler(request)
+        return handle
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "providers": self.stats,
+            "behaviours": {provider: asdict(behaviour) for provider, behaviour in self.behaviours.items()},
+        })
+
+    async def set_config(self, request: web.Request) -> web.Response:
+        self.configure(await request.json())
+        return await self.get_stats(request)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        for provider, (method, path, handler, error_response) in PROVIDER_ENDPOINTS.items():
+            app.router.add_route(method, path, self.endpoint(provider, handler, error_response))
+        app.router.add_get("/_mock/stats", self.get_stats)
+        app.router.add_post("/_mock/config", self.set_config)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock remittance provider endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=MockBehaviour.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=MockBehaviour.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=MockBehaviour.error_rate)
+    parser.add_argument("--block-after", type=int, default=MockBehaviour.block_after)
+    parser.add_argument("--block-mode", choices=["status", "reset", "hang"], default=MockBehaviour.block_mode)
+    parser.add_argument("--config", help='JSON file of per-provider overrides, e.g. {"hanpass": {"error_rate": 0.2}}')
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.config:
+        with open(args.config) as f:
+            overrides = json.load(f)
+    farm = ProviderFarm(MockBehaviour(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        block_after=args.block_after,
+        block_mode=args.block_mode,
+    ), overrides)
+    web.run_app(farm.app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Parser microbenchmarks and regression checks.
+
+Runs every case in fixtures/providers/manifest.json through its parser
+(parsers.py, plus the Wirebarley table pipeline) with no network:
+- checks the result against the recorded expectation (a quote, null for
+  "no quote", or {"raises": "ValueError"}), exiting non-zero on mismatch
+- times the parser (calibrated loop, median of --repeat runs)
+- measures peak traced memory and allocated blocks per call with tracemalloc
+
+    python parser_bench.py                 # check + benchmark every case
+    python parser_bench.py --check         # regression check only
+    python parser_bench.py -k e9pay --json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import statistics
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import parsers
+from wirebarley_rates import compile_routes
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "providers")
+MANIFEST = os.path.join(FIXTURES_DIR, "manifest.json")
+# Target duration of one timed run when calibrating the loop count
+TARGET_RUN_SECONDS = 0.2
+
+
+def wirebarley_table_quote(text: str, country_code: str, currency: str, send_amount: int) -> Optional[Dict]:
+    """Cold Wirebarley path: decode and compile the table, then price one route."""
+    routes = compile_routes(parsers.parse_wirebarley_rates(text))
+    route = routes.get((country_code, currency))
+    if route is None:
+        return None
+    return {"routes": len(routes), "exchange_rate": route.rate_for(send_amount), "fee": route.fee_for(send_amount)}
+
+
+def resolve_parser(name: str) -> Callable:
+    if name == "wirebarley_table_quote":
+        return wirebarley_table_quote
+    return getattr(parsers, name)
+
+
+def load_cases(manifest: str = MANIFEST) -> List[Dict]:
+    with open(manifest) as f:
+        cases = json.load(f)
+    for case in cases:
+        with open(os.path.join(os.path.dirname(manifest), case["fixture"]), encoding="utf-8") as f:
+            case["body"] = f.read()
+    return cases
+
+
+def _matches(actual, expected) -> bool:
+    if isinstance(expected, float) or isinstance(actual, float):
+        return isinstance(actual, (int, float)) and math.isclose(actual, expected, rel_tol=1e-9)
+    if isinstance(expected, dict):
+        return isinstance(actual, dict) and actual.keys() == expected.keys() and all(
+            _matches(actual[key], value) for key, value in expected.items()
+        )
+    return actual == expected
+
+
+def check(case: Dict) -> Optional[str]:
+    """None if the parser output matches the expectation, else a description of the mismatch."""
+    parser = resolve_parser(case["parser"])
+    expected = case["expected"]
+    try:
+        actual = parser(case["body"], **case.get("args", {}))
+    except Exception as e:
+        if isinstance(expected, dict) and expected.get("raises") == type(e).__name__:
+            return None
+        return f"raised {type(e).__name__}: {e}"
+    if not _matches(actual, expected):
+        return f"expected {expected!r}, got {actual!r}"
+    return None
+
+
+def _call(parser: Callable, body: str, args: Dict):
+    try:
+        return parser(body, **args)
+    except Exception:
+        return None
+
+
+def time_parser(parser: Callable, body: str, args: Dict, repeat: int) -> Dict:
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            _call(parser, body, args)
+        elapsed = time.perf_counter() - start
+        if elapsed >= TARGET_RUN_SECONDS / 10 or loops >= 1_000_000:
+            break
+        loops *= 10
+    loops = max(1, int(loops * TARGET_RUN_SECONDS / max(elapsed, 1e-9)))
+
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            _call(parser, body, args)
+        per_call.append((time.perf_counter() - start) / loops)
+    median = statistics.median(per_call)
+    return {
+        "loops": loops,
+        "median_us": round(median * 1e6, 2),
+        "min_us": round(min(per_call) * 1e6, 2),
+        "calls_per_second": round(1 / median) if median else None,
+    }
+
+
+def profile_memory(parser: Callable, body: str, args: Dict) -> Dict:
+    # Warm up caches (regex compilation, interned strings) outside the measurement
+    _call(parser, body, args)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = _call(parser, body, args)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    allocations = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    del result
+    return {"peak_bytes": peak - baseline, "retained_blocks": allocations}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark provider response parsers")
+    parser.add_argument("-k", "--filter", help="Only run cases whose name contains this")
+    parser.add_argument("--check", action="store_true", help="Only run the regression checks")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    cases = [case for case in load_cases() if not args.filter or args.filter in case["name"]]
+    results, failures = [], 0
+    for case in cases:
+        error = check(case)
+        failures += error is not None
+        result = {"name": case["name"], "parser": case["parser"], "bytes": len(case["body"].encode()), "ok": error is None}
+        if error:
+            result["error"] = error
+        elif not args.check:
+            func = resolve_parser(case["parser"])
+            result.update(time_parser(func, case["body"], case.get("args", {}), args.repeat))
+            result.update(profile_memory(func, case["body"], case.get("args", {})))
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'case':<30} {'bytes':>7} {'median µs':>10} {'calls/s':>10} {'peak B':>8} {'blocks':>7}  status")
+        for result in results:
+            status = "ok" if result["ok"] else f"FAIL: {result['error']}"
+            if "median_us" in result:
+                print(f"{result['name']:<30} {result['bytes']:>7} {result['median_us']:>10} "
+                      f"{result['calls_per_second']:>10} {result['peak_bytes']:>8} {result['retained_blocks']:>7}  {status}")
+            else:
+                print(f"{result['name']:<30} {result['bytes']:>7} {'':>10} {'':>10} {'':>8} {'':>7}  {status}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
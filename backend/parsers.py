@@ -0,0 +1,230 @@
+"""
+Provider response parsers.
+
+Each parser turns one provider's raw response body into a quote dict
+(provider, exchange_rate, fee, recipient_gets, link), or None when the
+response carries no usable quote. They do no I/O, so the scrapers in
+main.py only handle HTTP, and parser_bench.py can time, memory-profile and
+regression-check every parser against the recorded bodies in
+fixtures/providers without the network. A malformed body may raise; the
+scrapers treat that like any other provider error.
+"""
+
+import re
+import json
+from typing import Dict, List, Optional
+
+# GmoneyTrans returns an HTML fragment whose cells carry the values
+GMONEY_FEE_PATTERN = re.compile(r"serviceCharge--td_clm--([\d.,]+)")
+GMONEY_RATE_PATTERN = re.compile(r"exchangeRate--td_clm--([\d.,]+)")
+
+# E9Pay uses fixed fees based on remittance method from their frontend
+# These are predefined fees, not calculated by API
+E9PAY_FEES = {
+    "PH15": 3000,  # Gcash
+    "PH13": 5000,  # BDO 계좌송금
+    "PH03": 5000,  # 캐시픽업 PHP
+    "PH11": 5000,  # 계좌송금 PHP
+    "PH09": 5000,  # PAYMAYA
+    "PH07": 5000,  # COINS.PH
+    "VN15": 5000,  # 베트남 계좌송금
+    "VN14": 5000,  # 베트남 모바일월렛
+    "VN06": 7000,  # 베트남 캐시픽업
+    "VN07": 10000, # 베트남 홈딜리버리
+    "VN05": 7000,  # 베트남 캐시픽업 USD
+    "VN08": 10000, # 베트남 홈딜리버리 USD
+    "LK03": 5000,  # 스리랑카 계좌송금
+    "LK09": 5000,  # 스리랑카 FINANCE AND LEASING
+    "LK08": 5000,  # 스리랑카 계좌송금 USD
+    "ID01": 5000,  # 인도네시아 계좌송금
+    "TH03": 5000,  # 태국 카시콘 계좌송금
+    "TH02": 5000,  # 태국 계좌송금
+    "MM01": 8000,  # 미얀마 계좌송금 CB
+    "MM05": 8000,  # 미얀마 계좌송금 KBZ
+    "MM04": 5000,  # 미얀마 KBZ 월렛송금
+    "NP": 5000,    # 네팔 계좌송금
+    "NP01": 5000,  # 네팔 캐시픽업
+    "NP04": 5000,  # 네팔 E-WALLET
+    "BD01": 5000,  # 방글라데시 캐시픽업
+    "BD02": 3000   # 방글라데시 BKASH
+}
+E9PAY_DEFAULT_FEE = 5000
+
+
+def _quote(provider: str, exchange_rate: float, fee: float, recipient_gets: float, link: str) -> Dict:
+    return {
+        "provider": provider,
+        "exchange_rate": exchange_rate,
+        "fee": fee,
+        "recipient_gets": recipient_gets,
+        "link": link,
+    }
+
+
+def parse_hanpass(text: str) -> Optional[Dict]:
+    data = json.loads(text)
+    # Check API result code
+    if data.get('resultCode') != '0':
+        return None
+
+    exchange_rate = data.get('exchangeRate')
+    to_amount = data.get('toAmount')
+    if not exchange_rate or not to_amount:
+        return None
+
+    return _quote("Hanpass", float(exchange_rate), float(data.get('transferFee', 0)), float(to_amount),
+                  "https://www.hanpass.com/")
+
+
+def parse_cross(text: str, send_amount: int) -> Optional[Dict]:
+    quote_data = json.loads(text).get('data', {})
+
+    # Use receiving_amount directly from API response
+    receiving_amount = quote_data.get('receiving_amount', 0)
+    if not receiving_amount or receiving_amount <= 0:
+        return None
+
+    fee = quote_data.get('fee', 0)
+    pay_amount = quote_data.get('pay_amount', send_amount)
+
+    # Calculate exchange rate from the actual amounts
+    exchange_rate = receiving_amount / pay_amount if pay_amount > 0 else 0
+    return _quote("Cross", exchange_rate, fee, receiving_amount, "https://crossenf.com/")
+
+
+def parse_gmoneytrans(text: str, send_amount: int) -> Optional[Dict]:
+    fee_match = GMONEY_FEE_PATTERN.search(text)
+    rate_match = GMONEY_RATE_PATTERN.search(text)
+    if not fee_match or not rate_match:
+        raise ValueError(f"Could not parse data from response: {text[:100]}...")
+
+    fee = float(fee_match.group(1).replace(',', ''))
+    exchange_rate = float(rate_match.group(1).replace(',', ''))
+    if exchange_rate == 0:
+        return None
+
+    return _quote("GmoneyTrans", exchange_rate, fee, (send_amount - fee) * exchange_rate,
+                  "https://www.gmoneytrans.com/")
+
+
+def parse_gmeremit(text: str) -> Optional[Dict]:
+    result = json.loads(text)
+    if result.get('errorCode') != '0':
+        return None
+
+    sc_charge = result.get('scCharge')
+    ex_rate = result.get('exRate')
+    p_amt = result.get('pAmt')
+    if (not sc_charge or sc_charge == 'null' or
+        not ex_rate or ex_rate == 'null' or
+        not p_amt or p_amt == 'null'):
+        return None
+
+    try:
+        fee = float(sc_charge.replace(',', ''))
+        exchange_rate = float(ex_rate)
+        recipient_gets = float(p_amt.replace(',', ''))
+    except (ValueError, TypeError):
+        return None
+
+    if exchange_rate <= 0 or recipient_gets <= 0:
+        return None
+    return _quote("GME Remit", exchange_rate, fee, recipient_gets, "https://www.gmeremit.com/")
+
+
+def parse_jpremit(text: str, send_amount: int) -> Optional[Dict]:
+    d_data = json.loads(text).get('d', {})
+    service_fee = d_data.get('ServiceFee')
+    customer_rate = d_data.get('customer_rate')
+    if not service_fee or not customer_rate:
+        return None
+
+    try:
+        fee = float(service_fee)
+        exchange_rate = float(customer_rate)
+    except (ValueError, TypeError):
+        return None
+
+    if exchange_rate <= 0:
+        return None
+    return _quote("JP Remit", exchange_rate, fee, (send_amount - fee) * exchange_rate,
+                  "https://www.jpremit.co.kr/")
+
+
+def parse_themoin(text: str, send_amount: int) -> Optional[Dict]:
+    result = json.loads(text)
+    if result.get('ret') != 'success':
+        return None
+
+    quote_v2 = result.get('quoteV2', {})
+    fee_amount = quote_v2.get('feeAmount', {})
+    destination_amount = quote_v2.get('destinationAmount', {})
+    if not fee_amount or not destination_amount:
+        return None
+
+    fee = fee_amount.get('amount', 0)
+    recipient_gets = destination_amount.get('amount', 0)
+    if fee is None or recipient_gets is None or recipient_gets <= 0:
+        return None
+
+    # Calculate exchange rate: recipient_gets / (send_amount - fee)
+    return _quote("The Moin", recipient_gets / (send_amount - fee), fee, recipient_gets,
+                  "https://www.themoin.com/")
+
+
+def parse_sbicosmoney(text: str, send_amount: int) -> Optional[Dict]:
+    exchange_rate = json.loads(text).get('exchangeRate')
+    if not exchange_rate or exchange_rate <= 0:
+        return None
+
+    # No fee for now - just exchange rate calculation
+    return _quote("SBI Cosmoney", exchange_rate, 0.0, send_amount * exchange_rate,
+                  "https://www.sbicosmoney.com/")
+
+
+def parse_e9pay(text: str, send_amount: int, recv_code: str) -> Optional[Dict]:
+    result = json.loads(text)
+    if result.get('responseCode') != 'S':
+        return None
+
+    # The quote itself is a JSON document encoded as a string
+    try:
+        parsed_data = json.loads(result.get('data', '{}'))
+    except json.JSONDecodeError:
+        return None
+    if parsed_data.get('RESULT_COD') != 'S':
+        return None
+
+    try:
+        recipient_gets = float(parsed_data.get('RCVER_EXPECT_RECPT_AMOUNT', '0'))
+    except (ValueError, TypeError):
+        return None
+    if recipient_gets <= 0:
+        return None
+
+    fee = E9PAY_FEES.get(recv_code, E9PAY_DEFAULT_FEE)
+    # Calculate exchange rate: recipient_gets / (send_amount - fee)
+    effective_send_amount = send_amount - fee
+    if effective_send_amount <= 0:
+        return None
+    return _quote("E9Pay", recipient_gets / effective_send_amount, fee, recipient_gets,
+                  "https://www.e9pay.co.kr/")
+
+
+def parse_coinshot(text: str, send_amount: int) -> Optional[Dict]:
+    data = json.loads(text)
+    recipient_gets = float(data.get('toAmount', 0))
+    fee = float(data.get('fromFee', 0))
+    if not recipient_gets or recipient_gets <= 0:
+        return None
+
+    # Calculate exchange rate: receiving_amount / sending_amount
+    return _quote("Coinshot", recipient_gets / send_amount, fee, recipient_gets, "https://coinshot.org/")
+
+
+def parse_wirebarley_rates(text: str) -> List[Dict]:
+    """The raw `exRates` list of the Wirebarley rate table (compiled by wirebarley_rates)."""
+    result = json.loads(text)
+    if result.get('status') != 0:
+        raise ValueError(f"api status {result.get('status')}")
+    return result.get('data', {}).get('exRates', [])
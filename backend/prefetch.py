@@ -0,0 +1,204 @@
+"""
+Popularity-driven cache prefetching.
+
+Requests are counted in a bounded Space-Saving sketch keyed by cache key
+(route + amount bucket). A background loop keeps the top-N keys refreshed
+before their cache entries leave the fresh window, spending at most a fixed
+number of upstream fan-outs per minute.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'true').lower() == 'true'
+PREFETCH_TOP_N = int(os.getenv('PREFETCH_TOP_N', '20'))
+PREFETCH_INTERVAL = float(os.getenv('PREFETCH_INTERVAL', '10'))
+PREFETCH_BUDGET_PER_MINUTE = int(os.getenv('PREFETCH_BUDGET_PER_MINUTE', '30'))
+# Refresh entries this many seconds before they turn stale
+PREFETCH_LEAD_TIME = float(os.getenv('PREFETCH_LEAD_TIME', '15'))
+# Keys requested fewer times than this are never prefetched
+PREFETCH_MIN_COUNT = float(os.getenv('PREFETCH_MIN_COUNT', '2'))
+PREFETCH_SKETCH_SIZE = int(os.getenv('PREFETCH_SKETCH_SIZE', '256'))
+# Counts are halved this often so popularity follows recent traffic
+PREFETCH_DECAY_INTERVAL = float(os.getenv('PREFETCH_DECAY_INTERVAL', '600'))
+
+
+@dataclass
+class RouteCounter:
+    cache_key: str
+    receive_country: str
+    receive_currency: str
+    send_amount: int
+    count: float = 0
+    error: float = 0
+
+
+class PopularitySketch:
+    """Space-Saving top-k counter with a fixed number of slots."""
+
+    def __init__(self, capacity: int = PREFETCH_SKETCH_SIZE):
+        self.capacity = capacity
+        self.counters: Dict[str, RouteCounter] = {}
+
+    def add(self, cache_key: str, receive_country: str, receive_currency: str, send_amount: int):
+        counter = self.counters.get(cache_key)
+        if counter is None:
+            if len(self.counters) < self.capacity:
+                counter = RouteCounter(cache_key, receive_country, receive_currency, send_amount)
+            else:
+                # Replace the least popular key; it inherits that count as error
+                evicted = min(self.counters.values(), key=lambda c: c.count)
+                del self.counters[evicted.cache_key]
+                counter = RouteCounter(cache_key, receive_country, receive_currency, send_amount,
+                                       count=evicted.count, error=evicted.count)
+            self.counters[cache_key] = counter
+        counter.count += 1
+        # Prefetch with the most recently requested amount in the bucket
+        counter.send_amount = send_amount
+
+    def top(self, n: int) -> List[RouteCounter]:
+        return sorted(self.counters.values(), key=lambda c: c.count, reverse=True)[:n]
+
+    def decay(self):
+        for cache_key, counter in list(self.counters.items()):
+            counter.count /= 2
+            counter.error /= 2
+            if counter.count < 0.5:
+                del self.counters[cache_key]
+
+
+class PrefetchScheduler:
+    """Keeps the most requested cache keys warm ahead of expiry."""
+
+    def __init__(self,
+                 refresh_func: Callable[[str, int, str, str], Awaitable],
+                 entry_age_func: Callable[[str], Awaitable[Optional[float]]],
+                 soft_ttl: float,
+                 top_n: int = PREFETCH_TOP_N,
+                 interval: float = PREFETCH_INTERVAL,
+                 budget_per_minute: int = PREFETCH_BUDGET_PER_MINUTE,
+                 lead_time: float = PREFETCH_LEAD_TIME):
+        self.refresh_func = refresh_func
+        self.entry_age_func = entry_age_func
+        self.soft_ttl = soft_ttl
+        self.top_n = top_n
+        self.interval = interval
+        self.budget_per_minute = budget_per_minute
+        self.lead_time = lead_time
+
+        self.sketch = PopularitySketch()
+        self.task: Optional[asyncio.Task] = None
+        self.budget_window_start = 0.0
+        self.budget_used = 0
+        self.last_decay = time.time()
+        # Entry ages seen by the last scan (reported by get_stats)
+        self.entry_ages: Dict[str, Optional[float]] = {}
+
+        self.prefetches = 0
+        self.prefetch_failures = 0
+        self.skipped_for_budget = 0
+        self.requests = 0
+        self.prefetch_hits = 0
+
+    def record_request(self, cache_key: str, receive_country: str, receive_currency: str,
+                       send_amount: int, cache_entry: Optional[Dict] = None):
+        """Count a quote request; cache_entry is the entry that served it, if any."""
+        self.requests += 1
+        self.sketch.add(cache_key, receive_country, receive_currency, send_amount)
+        if cache_entry and cache_entry.get("source") == "prefetch":
+            self.prefetch_hits += 1
+
+    def _take_budget(self) -> bool:
+        now = time.time()
+        if now - self.budget_window_start >= 60:
+            self.budget_window_start = now
+            self.budget_used = 0
+        if self.budget_used >= self.budget_per_minute:
+            return False
+        self.budget_used += 1
+        return True
+
+    async def run_once(self):
+        """Refresh the top-N keys whose entries are missing or about to go stale."""
+        if time.time() - self.last_decay >= PREFETCH_DECAY_INTERVAL:
+            self.sketch.decay()
+            self.last_decay = time.time()
+
+        top_routes = [route for route in self.sketch.top(self.top_n) if route.count >= PREFETCH_MIN_COUNT]
+
+        due = []
+        self.entry_ages = {}
+        for route in top_routes:
+            age = await self.entry_age_func(route.cache_key)
+            self.entry_ages[route.cache_key] = age
+            if age is None or age >= self.soft_ttl - self.lead_time:
+                due.append(route)
+
+        refreshes = []
+        for route in due:
+            if not self._take_budget():
+                self.skipped_for_budget += len(due) - len(refreshes)
+                break
+            refreshes.append(self.refresh_func(
+                route.cache_key, route.send_amount, route.receive_currency, route.receive_country
+            ))
+
+        results = await asyncio.gather(*refreshes, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.prefetch_failures += 1
+            else:
+                self.prefetches += 1
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Prefetch loop error: {type(e).__name__} - {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop())
+            logger.info(f"Prefetch scheduler started (top {self.top_n}, {self.budget_per_minute} fan-outs/min)")
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": self.task is not None,
+            "top_n": self.top_n,
+            "interval": self.interval,
+            "budget_per_minute": self.budget_per_minute,
+            "budget_used": self.budget_used,
+            "warming": [
+                {
+                    "cache_key": counter.cache_key,
+                    "count": round(counter.count, 1),
+                    "send_amount": counter.send_amount,
+                    "age_seconds": self.entry_ages.get(counter.cache_key),
+                }
+                for counter in self.sketch.top(self.top_n)
+            ],
+            "tracked_keys": len(self.sketch.counters),
+            "prefetches": self.prefetches,
+            "prefetch_failures": self.prefetch_failures,
+            "skipped_for_budget": self.skipped_for_budget,
+            "requests": self.requests,
+            "prefetch_hits": self.prefetch_hits,
+            "hit_contribution": f"{(self.prefetch_hits / max(self.requests, 1)) * 100:.1f}%",
+        }
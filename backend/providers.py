@@ -0,0 +1,117 @@
+"""
+Declarative provider registry.
+
+Each provider declares its scraper, upstream host and the routes it serves
+(taken from the provider's mapping dicts in main.py). The registry compiles
+them into one (country, currency) index so a quote request only dispatches
+the providers that actually serve its route.
+
+Upstream base URLs can be redirected (e.g. to the local mock provider farm
+in mock_providers.py) with PROVIDER_BASE_URLS, a JSON object mapping a
+provider host, or "*" for every host, to a base URL:
+    PROVIDER_BASE_URLS='{"*": "http://127.0.0.1:8900"}'
+
+Scrapers return None when a provider answers without a quote, and let
+UPSTREAM_ERRORS (transport errors, or a non-200 status via check_status)
+propagate so the caller can count them as provider failures.
+"""
+
+import os
+import json
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+PROVIDER_BASE_URLS: Dict[str, str] = json.loads(os.getenv('PROVIDER_BASE_URLS', '') or '{}')
+
+
+class UpstreamError(Exception):
+    """The provider answered with an HTTP error status."""
+
+
+# Failures of the provider itself, as opposed to "no quote for this request"
+UPSTREAM_ERRORS = (UpstreamError, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def check_status(response: aiohttp.ClientResponse):
+    """Raise UpstreamError unless the provider answered 200."""
+    if response.status != 200:
+        raise UpstreamError(f"HTTP {response.status}")
+
+
+@lru_cache(maxsize=None)
+def upstream_url(url: str) -> str:
+    """The provider URL, rebased if its host has a PROVIDER_BASE_URLS override."""
+    parts = urlsplit(url)
+    base_url = PROVIDER_BASE_URLS.get(parts.netloc) or PROVIDER_BASE_URLS.get("*")
+    if not base_url:
+        return url
+    return base_url.rstrip("/") + url[len(f"{parts.scheme}://{parts.netloc}"):]
+
+
+@dataclass(frozen=True)
+class QuoteProvider:
+    name: str
+    fetch: Callable
+    host: str
+    # Countries the provider has a mapping for
+    countries: FrozenSet[str]
+    # country -> the only currency served there; None means any currency
+    currencies: Optional[Mapping[str, str]] = None
+
+
+class ProviderRegistry:
+    def __init__(self, providers: Iterable[QuoteProvider]):
+        self.providers: List[QuoteProvider] = list(providers)
+        self.route_index: Dict[Tuple[str, str], Tuple[QuoteProvider, ...]] = {}
+        self.any_currency_index: Dict[str, Tuple[QuoteProvider, ...]] = {}
+        self.compile()
+
+    def compile(self):
+        """Build the (country, currency) -> providers index, in registry order."""
+        exact_routes: Dict[Tuple[str, str], List[QuoteProvider]] = {}
+        any_currency: Dict[str, List[QuoteProvider]] = {}
+
+        for provider in self.providers:
+            for country in provider.countries:
+                if provider.currencies is None:
+                    any_currency.setdefault(country, []).append(provider)
+                elif country in provider.currencies:
+                    exact_routes.setdefault((country, provider.currencies[country]), []).append(provider)
+
+        order = {provider.name: position for position, provider in enumerate(self.providers)}
+        self.any_currency_index = {country: tuple(providers) for country, providers in any_currency.items()}
+        self.route_index = {
+            (country, currency): tuple(sorted(
+                providers + any_currency.get(country, []),
+                key=lambda provider: order[provider.name]
+            ))
+            for (country, currency), providers in exact_routes.items()
+        }
+
+    def providers_for(self, receive_country: str, receive_currency: str) -> Tuple[QuoteProvider, ...]:
+        """Providers serving a route (unknown currencies fall back to any-currency providers)."""
+        providers = self.route_index.get((receive_country, receive_currency))
+        if providers is not None:
+            return providers
+        return self.any_currency_index.get(receive_country, ())
+
+    def get(self, name: str) -> Optional[QuoteProvider]:
+        return next((provider for provider in self.providers if provider.name == name), None)
+
+    def hosts(self) -> List[str]:
+        return list(dict.fromkeys(provider.host for provider in self.providers))
+
+    def get_routes(self) -> Dict[str, List[str]]:
+        """Route -> provider names, for the admin endpoint."""
+        routes = {
+            f"{country}:{currency}": [provider.name for provider in providers]
+            for (country, currency), providers in self.route_index.items()
+        }
+        for country, providers in self.any_currency_index.items():
+            routes[f"{country}:*"] = [provider.name for provider in providers]
+        return dict(sorted(routes.items()))
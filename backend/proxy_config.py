@@ -5,9 +5,12 @@
 
 import os
 import json
+import logging
 from typing import List, Dict
 from proxy_manager import ProxyConfig
 
+logger = logging.getLogger(__name__)
+
 class ProxyConfigManager:
     def __init__(self):
         self.config_file = "proxy_config.json"
@@ -19,7 +22,7 @@ class ProxyConfigManager:
         # 1. 환경 변수에서 먼저 로드 시도 (우선순위가 높음)
         env_proxies = load_proxies_from_env()
         if env_proxies:
-            print(f"✅ Loaded {len(env_proxies)} proxies from environment variables")
+            logger.info(f"✅ Loaded {len(env_proxies)} proxies from environment variables")
             self.proxies = env_proxies
             return
 
@@ -32,16 +35,16 @@ class ProxyConfigManager:
                     # 예시 프록시가 아닌 실제 프록시만 로드
                     real_proxies = [p for p in proxies_from_file if 'example.com' not in p.get('ip', '')]
                     if real_proxies:
-                        print(f"✅ Loaded {len(real_proxies)} proxies from config file")
+                        logger.info(f"✅ Loaded {len(real_proxies)} proxies from config file")
                         self.proxies = real_proxies
                     else:
-                        print("⚠️ No valid proxies found in config file (only examples)")
+                        logger.warning("⚠️ No valid proxies found in config file (only examples)")
                         self.proxies = []
             else:
-                print("ℹ️ No proxy config file found")
+                logger.info("ℹ️ No proxy config file found")
                 self.proxies = []
         except Exception as e:
-            print(f"❌ Error loading proxy config: {e}")
+            logger.error(f"❌ Error loading proxy config: {e}")
             self.proxies = []
     
     def create_default_config(self):
@@ -145,9 +148,9 @@ def load_proxies_from_env():
                     "rate_limit_per_minute": 30
                 }
                 proxies.append(proxy_config)
-                print(f"✅ Loaded proxy from HANPASS_PROXY_URL: {ip}:{port}")
+                logger.info(f"✅ Loaded proxy from HANPASS_PROXY_URL: {ip}:{port}")
         except Exception as e:
-            print(f"❌ Error parsing HANPASS_PROXY_URL: {e}")
+            logger.error(f"❌ Error parsing HANPASS_PROXY_URL: {e}")
 
     # 방법 2: HANPASS_PROXY_1, HANPASS_PROXY_2, ... (다중 프록시)
     i = 1
@@ -169,9 +172,9 @@ def load_proxies_from_env():
                     "rate_limit_per_minute": 30
                 }
                 proxies.append(proxy_config)
-                print(f"✅ Loaded proxy from HANPASS_PROXY_{i}: {parts[0]}:{parts[1]}")
+                logger.info(f"✅ Loaded proxy from HANPASS_PROXY_{i}: {parts[0]}:{parts[1]}")
         except Exception as e:
-            print(f"❌ Error parsing HANPASS_PROXY_{i}: {e}")
+            logger.error(f"❌ Error parsing HANPASS_PROXY_{i}: {e}")
 
         i += 1
 
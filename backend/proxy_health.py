@@ -0,0 +1,159 @@
+"""
+Background proxy health checking.
+
+Each proxy is checked on its own schedule instead of all at once: healthy
+proxies every PROXY_HEALTH_INTERVAL (with jitter), failing ones with an
+exponential backoff up to PROXY_HEALTH_MAX_BACKOFF. At most
+PROXY_HEALTH_CONCURRENCY checks run at a time.
+
+A proxy that fails PROXY_HEALTH_UNHEALTHY_AFTER checks in a row is taken
+out of get_best_proxy rotation, and put back as soon as a check passes.
+PROXY_HEALTH_TEST_URL can point at a local stand-in server.
+"""
+
+import os
+import time
+import heapq
+import random
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from proxy_manager import ProxyManager, ProxyConfig, PROXY_TEST_URL
+
+logger = logging.getLogger(__name__)
+
+PROXY_HEALTH_ENABLED = os.getenv('PROXY_HEALTH_ENABLED', 'true').lower() == 'true'
+PROXY_HEALTH_TIMEOUT = float(os.getenv('PROXY_HEALTH_TIMEOUT', '10'))
+PROXY_HEALTH_CONCURRENCY = int(os.getenv('PROXY_HEALTH_CONCURRENCY', '10'))
+# Check interval of a healthy proxy, and the backoff range of a failing one
+PROXY_HEALTH_INTERVAL = float(os.getenv('PROXY_HEALTH_INTERVAL', '60'))
+PROXY_HEALTH_MIN_BACKOFF = float(os.getenv('PROXY_HEALTH_MIN_BACKOFF', '15'))
+PROXY_HEALTH_MAX_BACKOFF = float(os.getenv('PROXY_HEALTH_MAX_BACKOFF', '1800'))
+PROXY_HEALTH_UNHEALTHY_AFTER = int(os.getenv('PROXY_HEALTH_UNHEALTHY_AFTER', '2'))
+# How often the scheduler looks for due checks
+PROXY_HEALTH_TICK = 1.0
+
+
+class ProxyHealthScheduler:
+    def __init__(self,
+                 manager: ProxyManager,
+                 test_url: str = PROXY_TEST_URL,
+                 concurrency: int = PROXY_HEALTH_CONCURRENCY,
+                 interval: float = PROXY_HEALTH_INTERVAL):
+        self.manager = manager
+        self.test_url = test_url
+        self.concurrency = concurrency
+        self.interval = interval
+
+        # (due time, ip) of the next check per proxy
+        self.schedule: List[Tuple[float, str]] = []
+        self.consecutive_failures: Dict[str, int] = {}
+        self.last_checked: Dict[str, float] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.checks = 0
+        self.check_failures = 0
+
+    def _sync_proxies(self):
+        """Schedule an immediate first check for proxies added since the last tick."""
+        for proxy in self.manager.proxies:
+            if proxy.ip not in self.consecutive_failures:
+                self.consecutive_failures[proxy.ip] = 0
+                heapq.heappush(self.schedule, (time.time(), proxy.ip))
+
+    def _next_delay(self, failures: int) -> float:
+        if failures == 0:
+            # Jitter keeps checks of proxies added together from staying in lockstep
+            return self.interval * random.uniform(0.9, 1.1)
+        return min(PROXY_HEALTH_MIN_BACKOFF * 2 ** (failures - 1), PROXY_HEALTH_MAX_BACKOFF)
+
+    async def check(self, proxy: ProxyConfig) -> bool:
+        """Test one proxy, update its rotation status and schedule its next check."""
+        healthy = await self.manager.test_proxy(proxy, self.test_url, timeout=PROXY_HEALTH_TIMEOUT)
+        self.checks += 1
+        self.last_checked[proxy.ip] = time.time()
+
+        if healthy:
+            if self.consecutive_failures.get(proxy.ip, 0) >= PROXY_HEALTH_UNHEALTHY_AFTER:
+                logger.info(f"Proxy {proxy.ip} passed its health check, back in rotation")
+            self.consecutive_failures[proxy.ip] = 0
+            self.manager.set_proxy_health(proxy, True)
+        else:
+            self.check_failures += 1
+            failures = self.consecutive_failures.get(proxy.ip, 0) + 1
+            self.consecutive_failures[proxy.ip] = failures
+            if failures == PROXY_HEALTH_UNHEALTHY_AFTER:
+                logger.warning(f"Proxy {proxy.ip} failed {failures} health checks, taken out of rotation")
+            if failures >= PROXY_HEALTH_UNHEALTHY_AFTER:
+                self.manager.set_proxy_health(proxy, False)
+
+        heapq.heappush(self.schedule, (time.time() + self._next_delay(self.consecutive_failures[proxy.ip]), proxy.ip))
+        return healthy
+
+    async def run_once(self):
+        """Run the checks that are due, at most `concurrency` at a time."""
+        self._sync_proxies()
+        proxies_by_ip = {proxy.ip: proxy for proxy in self.manager.proxies}
+
+        now = time.time()
+        due = []
+        while self.schedule and self.schedule[0][0] <= now:
+            _, ip = heapq.heappop(self.schedule)
+            if ip in proxies_by_ip:
+                due.append(proxies_by_ip[ip])
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded_check(proxy: ProxyConfig):
+            async with semaphore:
+                await self.check(proxy)
+
+        await asyncio.gather(*(bounded_check(proxy) for proxy in due), return_exceptions=True)
+
+    async def check_all(self):
+        """Check every proxy now (still bounded by the concurrency cap)."""
+        self._sync_proxies()
+        self.schedule = [(0.0, ip) for _, ip in self.schedule]
+        await self.run_once()
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Proxy health loop error: {type(e).__name__} - {e}")
+            await asyncio.sleep(PROXY_HEALTH_TICK)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop())
+            logger.info(f"Proxy health scheduler started ({self.concurrency} concurrent checks against {self.test_url})")
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        next_checks = {ip: due for due, ip in self.schedule}
+        return {
+            "running": self.task is not None,
+            "test_url": self.test_url,
+            "concurrency": self.concurrency,
+            "checks": self.checks,
+            "check_failures": self.check_failures,
+            "proxies": {
+                ip: {
+                    "in_rotation": failures < PROXY_HEALTH_UNHEALTHY_AFTER,
+                    "consecutive_failures": failures,
+                    "last_checked_ago": round(now - self.last_checked[ip], 1) if ip in self.last_checked else None,
+                    "next_check_in": round(max(0.0, next_checks[ip] - now), 1) if ip in next_checks else None,
+                }
+                for ip, failures in self.consecutive_failures.items()
+            },
+        }
@@ -1,11 +1,27 @@
-import asyncio
+import os
 import aiohttp
 import time
+import heapq
 import random
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import defaultdict, deque
 import logging
+from http_pool import SessionPool
+
+logger = logging.getLogger(__name__)
+
+# Length of the per-proxy rate limit window (seconds)
+PROXY_RATE_WINDOW = 60
+# Target of proxy health checks (point at a local server in tests)
+PROXY_TEST_URL = os.getenv('PROXY_HEALTH_TEST_URL', 'https://httpbin.org/ip')
+# Warm per-proxy sessions: closed after this long unused, and discarded
+# after this many consecutive failures through the proxy
+PROXY_POOL_IDLE_TIMEOUT = float(os.getenv('PROXY_POOL_IDLE_TIMEOUT', '300'))
+PROXY_POOL_REAP_INTERVAL = 60
+PROXY_POOL_EVICT_FAILURES = int(os.getenv('PROXY_POOL_EVICT_FAILURES', '3'))
+# Time a discarded session stays open for requests already using it
+PROXY_POOL_EVICT_GRACE = 10
 
 @dataclass
 class ProxyConfig:
@@ -31,8 +47,25 @@ class ProxyManager:
             'failures': 0,
             'last_used': 0,
             'blocked_until': 0,
-            'concurrent_requests': 0
+            'concurrent_requests': 0,
+            'consecutive_failures': 0,
+            'healthy': True
         })
+        # One long-lived session per proxy, so CONNECT tunnels and TLS
+        # connections to provider hosts are reused across requests
+        self.session_pool = SessionPool()
+        self.last_reap = time.time()
+        # Request times within the last PROXY_RATE_WINDOW, per proxy (at most
+        # rate_limit_per_minute entries each)
+        self.request_windows: Dict[str, deque] = {}
+        # Selection index. Usable proxies sit in a heap ordered by load score;
+        # blocked or rate-limited ones in a heap ordered by when they become
+        # usable again; proxies at max_concurrent in neither until a request
+        # completes. Entries are invalidated lazily via per-proxy versions.
+        self.proxy_by_ip: Dict[str, ProxyConfig] = {}
+        self.ready_heap: List[Tuple] = []
+        self.waiting_heap: List[Tuple] = []
+        self.index_versions: Dict[str, int] = {}
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -47,7 +80,9 @@ class ProxyManager:
     def add_proxy(self, proxy: ProxyConfig):
         """Add a proxy to the pool"""
         self.proxies.append(proxy)
-        logging.info(f"Added proxy: {proxy.ip}:{proxy.port}")
+        self.proxy_by_ip[proxy.ip] = proxy
+        self._reindex(proxy)
+        logger.info(f"Added proxy: {proxy.ip}:{proxy.port}")
     
     def add_proxy_list(self, proxy_list: List[Dict]):
         """Add multiple proxies from a list of dictionaries"""
@@ -59,96 +94,177 @@ class ProxyManager:
         """Get a random user agent"""
         return random.choice(self.user_agents)
     
+    def _request_window(self, proxy: ProxyConfig, current_time: float) -> deque:
+        """The proxy's request times within the last PROXY_RATE_WINDOW seconds"""
+        window = self.request_windows.get(proxy.ip)
+        if window is None or window.maxlen != max(proxy.rate_limit_per_minute, 1):
+            window = deque(window or (), maxlen=max(proxy.rate_limit_per_minute, 1))
+            self.request_windows[proxy.ip] = window
+        while window and window[0] <= current_time - PROXY_RATE_WINDOW:
+            window.popleft()
+        return window
+    
+    def requests_last_minute(self, proxy: ProxyConfig) -> int:
+        return len(self._request_window(proxy, time.time()))
+    
+    def _available_at(self, proxy: ProxyConfig, current_time: float) -> float:
+        """When the proxy's health, block and rate limit next allow a request"""
+        stats = self.proxy_stats[proxy.ip]
+        if not stats['healthy']:
+            # Out of rotation until a health check passes (set_proxy_health)
+            return float('inf')
+        available_at = stats['blocked_until']
+        window = self._request_window(proxy, current_time)
+        if len(window) >= proxy.rate_limit_per_minute and window:
+            # Full window: usable once its oldest request slides out
+            available_at = max(available_at, window[0] + PROXY_RATE_WINDOW)
+        return available_at
+    
     def is_proxy_available(self, proxy: ProxyConfig) -> bool:
         """Check if proxy is available for use"""
         current_time = time.time()
         stats = self.proxy_stats[proxy.ip]
         
-        # Check if proxy is temporarily blocked
-        if stats['blocked_until'] > current_time:
-            return False
-        
         # Check concurrent request limit
         if stats['concurrent_requests'] >= proxy.max_concurrent:
             return False
         
-        # Check rate limit (requests per minute)
-        if stats['last_used'] > current_time - 60:
-            requests_last_minute = stats['requests']
-            if requests_last_minute >= proxy.rate_limit_per_minute:
-                return False
+        # Check temporary block and rate limit (requests in the last minute)
+        return self._available_at(proxy, current_time) <= current_time
+    
+    def _proxy_score(self, proxy: ProxyConfig) -> Tuple:
+        """Least loaded, then lowest failure rate, then least used"""
+        stats = self.proxy_stats[proxy.ip]
+        failure_rate = stats['failures'] / max(stats['requests'], 1)
+        return (stats['concurrent_requests'], failure_rate, stats['requests'])
+    
+    def _reindex(self, proxy: ProxyConfig):
+        """Place the proxy in the selection index after its state changed"""
+        version = self.index_versions.get(proxy.ip, 0) + 1
+        self.index_versions[proxy.ip] = version
+        
+        current_time = time.time()
+        available_at = self._available_at(proxy, current_time)
+        if self.proxy_stats[proxy.ip]['concurrent_requests'] >= proxy.max_concurrent:
+            # Re-indexed when one of its requests completes
+            pass
+        elif available_at == float('inf'):
+            # Unhealthy: re-indexed by set_proxy_health
+            pass
+        elif available_at > current_time:
+            heapq.heappush(self.waiting_heap, (available_at, version, proxy.ip))
+        else:
+            heapq.heappush(self.ready_heap, (self._proxy_score(proxy), version, proxy.ip))
         
-        return True
+        # Drop invalidated entries once they dominate the heaps
+        if len(self.ready_heap) + len(self.waiting_heap) > 4 * len(self.proxies) + 64:
+            self._rebuild_index()
+    
+    def _rebuild_index(self):
+        self.ready_heap = []
+        self.waiting_heap = []
+        for proxy in self.proxies:
+            self._reindex(proxy)
     
     def get_best_proxy(self) -> Optional[ProxyConfig]:
-        """Get the best available proxy based on load balancing"""
-        available_proxies = [p for p in self.proxies if self.is_proxy_available(p)]
+        """Get the best available proxy based on load balancing (O(log n))"""
+        current_time = time.time()
         
-        if not available_proxies:
-            return None
+        # Proxies whose block or rate limit window has ended rejoin the ready heap
+        while self.waiting_heap and self.waiting_heap[0][0] <= current_time:
+            _, version, ip = heapq.heappop(self.waiting_heap)
+            if self.index_versions.get(ip) == version:
+                self._reindex(self.proxy_by_ip[ip])
         
-        # Sort by least used and lowest failure rate
-        def proxy_score(proxy):
-            stats = self.proxy_stats[proxy.ip]
-            failure_rate = stats['failures'] / max(stats['requests'], 1)
-            return (stats['concurrent_requests'], failure_rate, stats['requests'])
+        while self.ready_heap:
+            _, version, ip = self.ready_heap[0]
+            if self.index_versions.get(ip) != version:
+                heapq.heappop(self.ready_heap)
+                continue
+            proxy = self.proxy_by_ip[ip]
+            if self.is_proxy_available(proxy):
+                return proxy
+            # State changed outside mark_proxy_*: move it to where it belongs
+            self._reindex(proxy)
         
-        return min(available_proxies, key=proxy_score)
+        return None
     
     def mark_proxy_used(self, proxy: ProxyConfig):
         """Mark proxy as used"""
+        current_time = time.time()
         stats = self.proxy_stats[proxy.ip]
         stats['requests'] += 1
-        stats['last_used'] = time.time()
+        stats['last_used'] = current_time
         stats['concurrent_requests'] += 1
+        self._request_window(proxy, current_time).append(current_time)
+        self._reindex(proxy)
     
     def mark_proxy_completed(self, proxy: ProxyConfig, success: bool = True):
         """Mark proxy request as completed"""
         stats = self.proxy_stats[proxy.ip]
         stats['concurrent_requests'] = max(0, stats['concurrent_requests'] - 1)
         
-        if not success:
+        if success:
+            stats['consecutive_failures'] = 0
+        else:
             stats['failures'] += 1
+            stats['consecutive_failures'] += 1
+            evict_pool = stats['consecutive_failures'] % PROXY_POOL_EVICT_FAILURES == 0
             # Temporarily block proxy if too many failures
             failure_rate = stats['failures'] / max(stats['requests'], 1)
-            if failure_rate > 0.5 and stats['requests'] > 10:
+            if failure_rate > 0.5 and stats['requests'] > 10 and stats['blocked_until'] <= time.time():
                 stats['blocked_until'] = time.time() + 300  # Block for 5 minutes
-                logging.warning(f"Proxy {proxy.ip} temporarily blocked due to high failure rate")
+                logger.warning(f"Proxy {proxy.ip} temporarily blocked due to high failure rate")
+                evict_pool = True
+            if evict_pool:
+                # Its tunnels may be broken: start over with fresh connections
+                self.session_pool.discard(self._pool_key(proxy), grace=PROXY_POOL_EVICT_GRACE)
+        
+        self._reindex(proxy)
+    
+    def set_proxy_health(self, proxy: ProxyConfig, healthy: bool):
+        """Take the proxy out of (or put it back into) get_best_proxy rotation"""
+        stats = self.proxy_stats[proxy.ip]
+        if stats['healthy'] != healthy:
+            stats['healthy'] = healthy
+            self._reindex(proxy)
+    
+    @staticmethod
+    def _pool_key(proxy: ProxyConfig) -> str:
+        return f"{proxy.ip}:{proxy.port}"
+    
+    def get_proxied_session(self, proxy: ProxyConfig) -> 'ProxiedSession':
+        """The proxy's warm session, routing every request through the proxy"""
+        current_time = time.time()
+        if current_time - self.last_reap >= PROXY_POOL_REAP_INTERVAL:
+            self.last_reap = current_time
+            self.session_pool.reap_idle(PROXY_POOL_IDLE_TIMEOUT)
+        return ProxiedSession(self.session_pool.get_session(self._pool_key(proxy)), proxy.url)
+    
+    async def close(self):
+        """Close the per-proxy sessions"""
+        await self.session_pool.close()
     
     def get_proxy_stats(self) -> Dict:
         """Get statistics for all proxies"""
-        return dict(self.proxy_stats)
+        return {
+            ip: dict(stats, requests_last_minute=self.requests_last_minute(self.proxy_by_ip[ip]))
+            if ip in self.proxy_by_ip else dict(stats)
+            for ip, stats in self.proxy_stats.items()
+        }
     
-    async def test_proxy(self, proxy: ProxyConfig, test_url: str = "https://httpbin.org/ip") -> bool:
-        """Test if a proxy is working"""
+    async def test_proxy(self, proxy: ProxyConfig, test_url: str = PROXY_TEST_URL, timeout: float = 10) -> bool:
+        """Test if a proxy is working (through its warm session)"""
         try:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(
-                    test_url,
-                    proxy=proxy.url,
-                    headers={'User-Agent': self.get_random_user_agent()}
-                ) as response:
-                    return response.status == 200
+            async with self.get_proxied_session(proxy).get(
+                test_url,
+                headers={'User-Agent': self.get_random_user_agent()},
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                return response.status == 200
         except Exception as e:
-            logging.error(f"Proxy test failed for {proxy.ip}: {e}")
+            logger.error(f"Proxy test failed for {proxy.ip}: {type(e).__name__} - {e}")
             return False
-    
-    async def health_check_all_proxies(self):
-        """Health check all proxies"""
-        tasks = []
-        for proxy in self.proxies:
-            task = self.test_proxy(proxy)
-            tasks.append(task)
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for i, (proxy, result) in enumerate(zip(self.proxies, results)):
-            if isinstance(result, Exception) or not result:
-                self.mark_proxy_completed(proxy, success=False)
-                logging.warning(f"Health check failed for proxy {proxy.ip}")
-            else:
-                logging.info(f"Health check passed for proxy {proxy.ip}")
 
 class ProxySession:
     """Context manager for proxy-based HTTP sessions"""
@@ -164,31 +280,43 @@ class ProxySession:
         
         if not self.proxy:
             # Fallback to no proxy if none available
-            logging.warning(f"No proxy available for {self.provider_name}, using direct connection")
+            logger.warning(f"No proxy available for {self.provider_name}, using direct connection")
             self.session = aiohttp.ClientSession(
                 timeout=aiohttp.ClientTimeout(total=3),
                 headers={'User-Agent': self.proxy_manager.get_random_user_agent()}
             )
         else:
             self.proxy_manager.mark_proxy_used(self.proxy)
-            logging.info(f"Using proxy {self.proxy.ip} for {self.provider_name}")
+            logger.info(f"Using proxy {self.proxy.ip} for {self.provider_name}", extra={"event": "proxy_used"})
             
-            # Create session with proxy
-            self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=3),
-                headers={'User-Agent': self.proxy_manager.get_random_user_agent()}
-            )
+            # Reuse the proxy's warm session (kept open on exit)
+            self.session = self.proxy_manager.get_proxied_session(self.proxy)
         
         return self.session, self.proxy
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and not self.proxy:
             await self.session.close()
         
         if self.proxy:
             success = exc_type is None
             self.proxy_manager.mark_proxy_completed(self.proxy, success)
 
+class ProxiedSession:
+    """Routes a scraper's get/post calls on a shared session through a proxy"""
+    
+    def __init__(self, session: aiohttp.ClientSession, proxy_url: str):
+        self.session = session
+        self.proxy_url = proxy_url
+    
+    def get(self, url, **kwargs):
+        kwargs.setdefault('proxy', self.proxy_url)
+        return self.session.get(url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        kwargs.setdefault('proxy', self.proxy_url)
+        return self.session.post(url, **kwargs)
+
 
 import json
 
@@ -207,17 +335,17 @@ def initialize_proxy_manager():
 
             if actual_proxies:
                 proxy_manager.add_proxy_list(actual_proxies)
-                logging.info(f"Initialized proxy manager with {len(actual_proxies)} proxies from proxy_config.json")
+                logger.info(f"Initialized proxy manager with {len(actual_proxies)} proxies from proxy_config.json")
             else:
-                logging.warning("proxy_config.json contains only placeholder configurations. Running without proxies.")
+                logger.warning("proxy_config.json contains only placeholder configurations. Running without proxies.")
         else:
-            logging.warning("proxy_config.json is empty. Running without proxy rotation.")
+            logger.warning("proxy_config.json is empty. Running without proxy rotation.")
     except FileNotFoundError:
-        logging.warning("proxy_config.json not found. Running without proxy rotation.")
+        logger.warning("proxy_config.json not found. Running without proxy rotation.")
     except json.JSONDecodeError:
-        logging.error("Failed to decode proxy_config.json. Please check the file format.")
+        logger.error("Failed to decode proxy_config.json. Please check the file format.")
     except Exception as e:
-        logging.error(f"An unexpected error occurred while initializing proxy manager: {e}")
+        logger.error(f"An unexpected error occurred while initializing proxy manager: {e}")
 
 # Initialize on import
 initialize_proxy_manager()
\ No newline at end of file
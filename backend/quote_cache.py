@@ -0,0 +1,200 @@
+"""
+Quote cache helpers.
+
+Amount bucketing: nearby send amounts share one cache entry. A cached
+response is rescaled to the requested amount; fixed-fee providers are
+rescaled exactly, the rest are marked as estimated.
+
+Stale-while-revalidate: entries are fresh until CACHE_SOFT_TTL, then served
+stale (while one background refresh runs) until CACHE_HARD_TTL, after which
+they are evicted and the next request waits on upstream.
+
+Per-provider cache: each provider's quote is also cached per route and
+amount bucket with its own TTL, so a response can be assembled from cached
+providers plus fetches for only the missing ones. The last known good quote
+is kept longer and served (marked stale) when a provider fails.
+"""
+
+import os
+import json
+import math
+import time
+from typing import Dict, List, Optional
+
+from cachetools import TLRUCache, TTLCache
+
+# Fresh window and maximum age of a cached response (seconds)
+CACHE_SOFT_TTL = float(os.getenv('QUOTE_CACHE_SOFT_TTL', '60'))
+CACHE_HARD_TTL = float(os.getenv('QUOTE_CACHE_HARD_TTL', '300'))
+
+# Per-provider quote TTLs (seconds); override with PROVIDER_CACHE_TTLS='{"Hanpass": 180}'
+DEFAULT_PROVIDER_CACHE_TTLS = {
+    "default": 60,
+    # Proxy fallback makes Hanpass calls costly; GmoneyTrans is a slow HTML endpoint
+    "Hanpass": 120,
+    "GmoneyTrans": 120,
+}
+PROVIDER_CACHE_TTLS = dict(DEFAULT_PROVIDER_CACHE_TTLS, **json.loads(os.getenv('PROVIDER_CACHE_TTLS', '') or '{}'))
+# How long a provider's last successful quote may stand in for a failure
+PROVIDER_LKG_TTL = float(os.getenv('PROVIDER_LKG_TTL', '3600'))
+
+# Amount buckets per receive currency ("default" applies to the rest).
+#   {"step": 10000}       -> amounts rounded to the nearest 10,000 KRW
+#   {"tolerance": 0.005}  -> amounts within ~0.5% of each other share a bucket
+# Override with QUOTE_AMOUNT_BUCKETS='{"default": {"step": 10000}, "VND": {"tolerance": 0.01}}'
+DEFAULT_AMOUNT_BUCKETS = {
+    "default": {"tolerance": 0.005},
+}
+AMOUNT_BUCKETS = json.loads(os.getenv('QUOTE_AMOUNT_BUCKETS', '') or 'null') or DEFAULT_AMOUNT_BUCKETS
+
+# Providers whose fee does not depend on the amount and whose rate is
+# amount-independent, so `(amount - fee) * rate` rescales them exactly.
+# E9Pay is not one: its fee is assumed per remittance method and its rate
+# is back-computed from recipient_gets, so its rescaled quotes are estimates.
+FIXED_FEE_PROVIDERS = {"SBI Cosmoney"}
+
+
+def bucket_amount(send_amount: int, receive_currency: str) -> str:
+    """Canonical bucket label for a send amount."""
+    rule = AMOUNT_BUCKETS.get(receive_currency, AMOUNT_BUCKETS.get("default", {}))
+
+    step = rule.get("step")
+    if step:
+        return str(int(round(send_amount / step) * step))
+
+    tolerance = rule.get("tolerance")
+    if tolerance and send_amount > 0:
+        # Geometric buckets: each bucket is `tolerance` wider than the last
+        return f"~{int(round(math.log(send_amount) / math.log1p(tolerance)))}"
+
+    return str(send_amount)
+
+
+def make_cache_key(receive_country: str, receive_currency: str, send_amount: int) -> str:
+    return f"{receive_country}:{receive_currency}:{bucket_amount(send_amount, receive_currency)}"
+
+
+def rescale_quote(quote: Dict, from_amount: int, to_amount: int) -> Dict:
+    """Rescale one provider quote from the cached amount to the requested one."""
+    fee = quote.get("fee") or 0
+    net_amount = from_amount - fee
+    if net_amount <= 0:
+        return dict(quote, estimated=True)
+
+    effective_rate = quote.get("recipient_gets", 0) / net_amount
+    rescaled = dict(quote, recipient_gets=(to_amount - fee) * effective_rate)
+    if quote.get("provider") not in FIXED_FEE_PROVIDERS:
+        rescaled["estimated"] = True
+    return rescaled
+
+
+def build_response(quotes: List[Dict]) -> Dict:
+    """Rank quotes by recipient_gets (highest first)."""
+    sorted_quotes = sorted(quotes, key=lambda x: x.get('recipient_gets', 0), reverse=True)
+    return {
+        "results": sorted_quotes,
+        "best_rate_provider": sorted_quotes[0] if sorted_quotes else None,
+    }
+
+
+def make_cache_entry(send_amount: int, response_data: Dict, source: str = "request",
+                     fetched_at: Optional[float] = None) -> Dict:
+    """
+    source records who fetched the entry ("request", "refresh", "prefetch").
+    fetched_at defaults to now; an entry assembled from cached provider
+    quotes passes the oldest quote's fetch time so its age stays honest.
+    """
+    return {
+        "send_amount": send_amount,
+        "fetched_at": time.time() if fetched_at is None else fetched_at,
+        "source": source,
+        "response": response_data,
+    }
+
+
+def entry_age(entry: Dict) -> float:
+    return max(0.0, time.time() - entry["fetched_at"])
+
+
+def is_stale(entry: Dict) -> bool:
+    """True once an entry has left its fresh (soft TTL) window."""
+    return entry_age(entry) >= CACHE_SOFT_TTL
+
+
+def response_for_amount(entry: Dict, send_amount: int) -> Dict:
+    """Serve a cached bucket entry for the requested amount, with its age."""
+    cached_amount = entry["send_amount"]
+    if cached_amount == send_amount:
+        response_data = dict(entry["response"])
+    else:
+        quotes = [rescale_quote(quote, cached_amount, send_amount) for quote in entry["response"]["results"]]
+        response_data = build_response(quotes)
+
+    response_data["quote_age_seconds"] = round(entry_age(entry), 1)
+    response_data["stale"] = is_stale(entry)
+    return response_data
+
+
+class ProviderQuoteCache:
+    """Provider quotes keyed by (provider, cache_key) with per-provider TTLs."""
+
+    def __init__(self, maxsize: int = 8192):
+        self.quotes = TLRUCache(maxsize=maxsize, ttu=self._expires_at, timer=time.time)
+        self.last_known_good = TTLCache(maxsize=maxsize, ttl=PROVIDER_LKG_TTL, timer=time.time)
+        self.hits = 0
+        self.misses = 0
+        self.last_known_good_served = 0
+
+    @staticmethod
+    def _expires_at(key, value, now) -> float:
+        provider = key[0]
+        return now + PROVIDER_CACHE_TTLS.get(provider, PROVIDER_CACHE_TTLS["default"])
+
+    def get(self, provider: str, cache_key: str, send_amount: int) -> Optional[Dict]:
+        """Fresh cached quote for the requested amount, or None."""
+        entry = self.quotes.get((provider, cache_key))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._for_amount(entry, send_amount)
+
+    def store(self, provider: str, cache_key: str, send_amount: int, quote: Dict):
+        entry = {"send_amount": send_amount, "fetched_at": time.time(), "quote": quote}
+        self.quotes[(provider, cache_key)] = entry
+        self.last_known_good[(provider, cache_key)] = entry
+
+    def fetched_at(self, provider: str, cache_key: str) -> Optional[float]:
+        """When the provider's cached quote was fetched (no stats), or None."""
+        entry = self.quotes.get((provider, cache_key))
+        return entry["fetched_at"] if entry else None
+
+    def has_last_known_good(self, provider: str, cache_key: str) -> bool:
+        return (provider, cache_key) in self.last_known_good
+
+    def get_last_known_good(self, provider: str, cache_key: str, send_amount: int) -> Optional[Dict]:
+        """Last successful quote after a provider failure, marked stale."""
+        entry = self.last_known_good.get((provider, cache_key))
+        if entry is None:
+            return None
+        self.last_known_good_served += 1
+        quote = self._for_amount(entry, send_amount)
+        quote["stale"] = True
+        quote["quote_age_seconds"] = round(time.time() - entry["fetched_at"], 1)
+        return quote
+
+    @staticmethod
+    def _for_amount(entry: Dict, send_amount: int) -> Dict:
+        if entry["send_amount"] == send_amount:
+            return dict(entry["quote"])
+        return rescale_quote(entry["quote"], entry["send_amount"], send_amount)
+
+    def get_stats(self) -> Dict:
+        return {
+            "size": len(self.quotes),
+            "last_known_good_size": len(self.last_known_good),
+            "hits": self.hits,
+            "misses": self.misses,
+            "last_known_good_served": self.last_known_good_served,
+            "ttls": PROVIDER_CACHE_TTLS,
+        }
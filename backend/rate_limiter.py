@@ -0,0 +1,117 @@
+"""
+Per-client rate limiting.
+
+Sliding-window counter: each key keeps only the request counts of the
+current and previous fixed windows, and the previous count is weighted by
+how much of it still overlaps the sliding window. Memory per key is
+constant and each check is O(1).
+
+The in-memory limiter evicts idle keys and caps the number of tracked
+keys. Setting RATE_LIMIT_REDIS_URL shares counters across worker
+processes through any Redis-protocol server (tests can pass a stand-in
+client). If that backend fails, checks fall back to the local limiter.
+"""
+
+import os
+import time
+import logging
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL')
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000'))
+
+
+def sliding_window_estimate(previous: int, current: int, window_start: float, window: float, now: float) -> float:
+    """Requests in the sliding window ending now."""
+    overlap = max(0.0, 1.0 - (now - window_start) / window)
+    return previous * overlap + current
+
+
+class InMemoryRateLimiter:
+    def __init__(self, limit: int, window: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.limit = limit
+        self.window = window
+        # key -> (window index, previous count, current count); idle keys
+        # expire after two windows, when they no longer affect the estimate
+        self.counters: TTLCache = TTLCache(maxsize=max_keys, ttl=2 * window, timer=time.time)
+
+    async def hit(self, key: str) -> bool:
+        """Count a request for key; False if it exceeds the limit."""
+        now = time.time()
+        window_index = int(now // self.window)
+        stored: Optional[Tuple[int, int, int]] = self.counters.get(key)
+
+        if stored is None or stored[0] < window_index - 1:
+            previous, current = 0, 0
+        elif stored[0] == window_index - 1:
+            previous, current = stored[2], 0
+        else:
+            previous, current = stored[1], stored[2]
+
+        if sliding_window_estimate(previous, current, window_index * self.window, self.window, now) >= self.limit:
+            return False
+
+        self.counters[key] = (window_index, previous, current + 1)
+        return True
+
+    def get_stats(self) -> dict:
+        return {"backend": "memory", "tracked_keys": len(self.counters), "max_keys": self.counters.maxsize}
+
+
+class RedisRateLimiter:
+    """Sliding-window counter kept in a Redis-protocol server, shared by all workers."""
+
+    def __init__(self, client, limit: int, window: float, prefix: str = "remitbuddy:ratelimit:"):
+        self.client = client
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+        # Used while the shared backend is unreachable
+        self.fallback = InMemoryRateLimiter(limit, window)
+        self.backend_errors = 0
+
+    async def hit(self, key: str) -> bool:
+        now = time.time()
+        window_index = int(now // self.window)
+        current_key = f"{self.prefix}{key}:{window_index}"
+        previous_key = f"{self.prefix}{key}:{window_index - 1}"
+
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.incr(current_key)
+                pipe.expire(current_key, int(self.window * 2) + 1)
+                pipe.get(previous_key)
+                current, _, previous = await pipe.execute()
+
+            estimate = sliding_window_estimate(int(previous or 0), int(current) - 1, window_index * self.window, self.window, now)
+            if estimate >= self.limit:
+                # Rejected requests don't count against the window
+                await self.client.decr(current_key)
+                return False
+            return True
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f"Shared rate limiter unavailable, using local limiter: {type(e).__name__} - {e}")
+            return await self.fallback.hit(key)
+
+    def get_stats(self) -> dict:
+        return {"backend": "redis", "backend_errors": self.backend_errors, "fallback": self.fallback.get_stats()}
+
+
+def create_rate_limiter(limit: int, window: float, redis_url: Optional[str] = RATE_LIMIT_REDIS_URL):
+    """Shared limiter when a Redis URL is configured (and redis is installed), else in-memory."""
+    if redis_url:
+        if aioredis is None:
+            logger.warning("RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed; using in-memory rate limiting")
+        else:
+            return RedisRateLimiter(aioredis.from_url(redis_url), limit, window)
+    return InMemoryRateLimiter(limit, window)
@@ -0,0 +1,134 @@
+"""
+Local rate models for amount-independent providers.
+
+GmoneyTrans, JP Remit and SBI Cosmoney quote a single exchange rate plus a
+fee, and we compute `recipient_gets = (send_amount - fee) * rate` ourselves.
+One upstream response therefore prices every amount until the rate changes.
+This module keeps (rate, fee schedule, fetched_at) per provider and route and
+answers new send amounts locally until the model expires.
+
+Wirebarley is priced from its own cached rate table (see wirebarley_rates.py).
+"""
+
+import os
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Seconds a provider's rate model is trusted before going upstream again
+RATE_MODEL_TTL = float(os.getenv('RATE_MODEL_TTL', '60'))
+# Fee observations kept per model
+RATE_MODEL_MAX_OBSERVATIONS = 64
+
+
+class FeeSchedule:
+    """
+    Fee as a function of send amount.
+
+    A flat schedule charges the same fee for every amount. Otherwise the
+    schedule is learned from upstream responses and treated as a step
+    function: an amount that falls between two observed amounts with the
+    same fee gets that fee; anything else is unknown and must go upstream.
+    """
+
+    def __init__(self, flat_fee: Optional[float] = None):
+        self.flat_fee = flat_fee
+        self.amounts: List[float] = []
+        self.fees: List[float] = []
+
+    def observe(self, send_amount: float, fee: float):
+        if self.flat_fee is not None:
+            return
+        position = bisect_left(self.amounts, send_amount)
+        if position < len(self.amounts) and self.amounts[position] == send_amount:
+            self.fees[position] = fee
+            return
+        if len(self.amounts) >= RATE_MODEL_MAX_OBSERVATIONS:
+            return
+        insort(self.amounts, send_amount)
+        self.fees.insert(position, fee)
+
+    def fee_for(self, send_amount: float) -> Optional[float]:
+        if self.flat_fee is not None:
+            return self.flat_fee
+        position = bisect_left(self.amounts, send_amount)
+        if position < len(self.amounts) and self.amounts[position] == send_amount:
+            return self.fees[position]
+        if 0 < position < len(self.amounts) and self.fees[position - 1] == self.fees[position]:
+            return self.fees[position]
+        return None
+
+
+@dataclass
+class RateModel:
+    provider: str
+    exchange_rate: float
+    link: str
+    fee_schedule: FeeSchedule
+    fetched_at: float = field(default_factory=time.time)
+
+
+class RateModelStore:
+    """Rate models keyed by (provider, country, currency)."""
+
+    def __init__(self, ttl: float = RATE_MODEL_TTL):
+        self.ttl = ttl
+        self.models: Dict[Tuple[str, str, str], RateModel] = {}
+        self.local_quotes = 0
+        self.upstream_updates = 0
+
+    def get_model(self, provider: str, receive_country: str, receive_currency: str) -> Optional[RateModel]:
+        model = self.models.get((provider, receive_country, receive_currency))
+        if model and time.time() - model.fetched_at < self.ttl:
+            return model
+        return None
+
+    def quote(self, provider: str, receive_country: str, receive_currency: str, send_amount: int) -> Optional[Dict]:
+        """Price a send amount locally, or return None if upstream is needed."""
+        model = self.get_model(provider, receive_country, receive_currency)
+        if not model:
+            return None
+
+        fee = model.fee_schedule.fee_for(send_amount)
+        if fee is None:
+            return None
+
+        self.local_quotes += 1
+        return {
+            "provider": provider,
+            "exchange_rate": model.exchange_rate,
+            "fee": fee,
+            "recipient_gets": (send_amount - fee) * model.exchange_rate,
+            "link": model.link
+        }
+
+    def update(self, provider: str, receive_country: str, receive_currency: str, send_amount: int,
+               exchange_rate: float, fee: float, link: str, flat_fee: bool = False):
+        """Record an upstream response; starts a new model if the old one expired."""
+        self.upstream_updates += 1
+        model = self.get_model(provider, receive_country, receive_currency)
+        if model is None:
+            model = RateModel(
+                provider=provider,
+                exchange_rate=exchange_rate,
+                link=link,
+                fee_schedule=FeeSchedule(flat_fee=fee if flat_fee else None)
+            )
+            self.models[(provider, receive_country, receive_currency)] = model
+        else:
+            model.exchange_rate = exchange_rate
+        model.fee_schedule.observe(send_amount, fee)
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        return {
+            "models": len(self.models),
+            "live_models": sum(1 for m in self.models.values() if now - m.fetched_at < self.ttl),
+            "local_quotes": self.local_quotes,
+            "upstream_updates": self.upstream_updates,
+        }
+
+
+# Global rate model store
+rate_models = RateModelStore()
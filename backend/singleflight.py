@@ -0,0 +1,48 @@
+"""
+Single-flight request coalescing.
+
+The first caller for a key starts the work; concurrent callers for the same
+key await the same task instead of launching their own upstream fan-out.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.leader_calls = 0
+        self.coalesced_calls = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func() once per key at a time and share its result."""
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.coalesced_calls += 1
+        else:
+            self.leader_calls += 1
+            task = asyncio.ensure_future(func())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        # A cancelled caller (e.g. timeout) must not cancel the shared task
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        # Retrieve the exception so an abandoned task does not log a warning
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight task for {key} failed: {task.exception()!r}")
+
+    def get_stats(self) -> Dict:
+        return {
+            "in_flight": len(self.in_flight),
+            "leader_calls": self.leader_calls,
+            "coalesced_calls": self.coalesced_calls,
+            "fan_outs_saved": self.coalesced_calls,
+        }
@@ -0,0 +1,180 @@
+"""
+Non-blocking structured logging.
+
+Log calls on the event loop only filter and enqueue the record; a
+QueueListener thread formats it as one JSON object per line and writes it
+out, so slow stdout/file I/O never blocks request handling.
+
+Records can carry an event type (extra={"event": "cache_hit"}). Each
+event type can be sampled (keep a fraction) and rate limited (token bucket
+per second), so hot-path messages can't flood the logs:
+    LOG_SAMPLING='{"cache_hit": {"sample": 0.01}, "provider_error": {"per_second": 5}}'
+Dropped records are counted per event. When the queue is full, records
+are dropped (and counted) instead of blocking the caller.
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import queue
+import random
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# "json" (default) or "text" for local development
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+# Per-event sampling / rate limits (override or extend with LOG_SAMPLING)
+DEFAULT_LOG_SAMPLING = {
+    "cache_hit": {"sample": 0.05},
+    "request_started": {"sample": 0.1},
+    "request_completed": {"sample": 0.1},
+    "fan_out_completed": {"sample": 0.1},
+    "provider_error": {"per_second": 5},
+    "provider_debug": {"per_second": 1},
+    "proxy_used": {"per_second": 2},
+}
+LOG_SAMPLING = dict(DEFAULT_LOG_SAMPLING, **json.loads(os.getenv('LOG_SAMPLING', '') or '{}'))
+
+# LogRecord attributes that are not user-supplied extra fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                payload[key] = value
+        # Tracebacks arrive pre-rendered (see NonBlockingQueueHandler.prepare)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = record.stack_info
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class EventSampler(logging.Filter):
+    """Samples and rate limits records by their `event` attribute."""
+
+    def __init__(self, rules: Dict[str, Dict] = None):
+        super().__init__()
+        self.rules = LOG_SAMPLING if rules is None else rules
+        # event -> [tokens, last refill time]
+        self.buckets: Dict[str, list] = {}
+        self.dropped: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, 'event', None)
+        rule = self.rules.get(event) if event else None
+        if not rule:
+            return True
+
+        sample = rule.get("sample")
+        if sample is not None and random.random() >= sample:
+            return self._drop(event)
+
+        per_second = rule.get("per_second")
+        if per_second is not None:
+            now = time.monotonic()
+            bucket = self.buckets.get(event)
+            if bucket is None:
+                bucket = self.buckets[event] = [per_second, now]
+            bucket[0] = min(per_second, bucket[0] + (now - bucket[1]) * per_second)
+            bucket[1] = now
+            if bucket[0] < 1:
+                return self._drop(event)
+            bucket[0] -= 1
+        return True
+
+    def _drop(self, event: str) -> bool:
+        self.dropped[event] = self.dropped.get(event, 0) + 1
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge msg and args like the base class, but keep the traceback as
+        exc_text (rendered here, since exc_info can't cross the queue)
+        instead of folding it into msg, so it stays a separate field.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingPipeline:
+    def __init__(self):
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.sampler = EventSampler()
+
+    def setup(self, level: str = LOG_LEVEL, log_format: str = LOG_FORMAT):
+        """Route the root logger through the queue; idempotent."""
+        if self.handler is not None:
+            return
+        log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.handler = NonBlockingQueueHandler(log_queue)
+        self.handler.addFilter(self.sampler)
+
+        output = logging.StreamHandler(sys.stdout)
+        if log_format == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+        root = logging.getLogger()
+        root.handlers = [self.handler]
+        root.setLevel(level)
+        self.listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        self.listener.start()
+
+    def shutdown(self):
+        """Flush queued records and stop the writer thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "queued": self.handler.queue.qsize() if self.handler else 0,
+            "dropped_queue_full": self.handler.dropped if self.handler else 0,
+            "dropped_by_event": dict(self.sampler.dropped),
+            "sampling": self.sampler.rules,
+        }
+
+
+# Global logging pipeline
+logging_pipeline = LoggingPipeline()
@@ -0,0 +1,112 @@
+"""
+Shared test doubles: a controllable clock and an in-process stand-in for
+the subset of the redis.asyncio client the shared backends use.
+"""
+
+import pytest
+
+
+class FakeClock:
+    """Replaces a module's `time` import; advance() moves time forward."""
+
+    def __init__(self, now: float = 1_200_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def incr(self, key):
+        self.commands.append(("incr", key))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key, seconds))
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    async def execute(self):
+        self.client.check()
+        results = []
+        for name, *args in self.commands:
+            results.append(await getattr(self.client, name)(*args))
+        self.commands = []
+        return results
+
+
+class FakeRedis:
+    """Dict-backed stand-in for redis.asyncio.Redis; fail=True makes every call raise."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.data = {}
+        self.expiries = {}
+        self.calls = []
+
+    def check(self):
+        if self.fail:
+            raise ConnectionError("connection refused")
+
+    def pipeline(self, transaction: bool = True):
+        self.check()
+        return FakePipeline(self)
+
+    async def incr(self, key):
+        self.check()
+        self.calls.append(("incr", key))
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    async def decr(self, key):
+        self.check()
+        self.calls.append(("decr", key))
+        self.data[key] = int(self.data.get(key, 0)) - 1
+        return self.data[key]
+
+    async def expire(self, key, seconds):
+        self.check()
+        self.expiries[key] = seconds
+        return True
+
+    async def get(self, key):
+        self.check()
+        self.calls.append(("get", key))
+        value = self.data.get(key)
+        return None if value is None else str(value).encode()
+
+    async def set(self, key, value, ex=None):
+        self.check()
+        self.calls.append(("set", key))
+        self.data[key] = value
+        if ex is not None:
+            self.expiries[key] = ex
+        return True
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def redis_client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def broken_redis_client():
+    return FakeRedis(fail=True)
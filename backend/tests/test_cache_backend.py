@@ -0,0 +1,98 @@
+import json
+import math
+import asyncio
+
+import pytest
+
+import quote_cache
+from cache_backend import RedisCacheBackend
+from quote_cache import CACHE_HARD_TTL, CACHE_SOFT_TTL, build_response, is_stale, make_cache_entry
+
+KEY = "vietnam:VND:1000000"
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch, clock):
+    monkeypatch.setattr(quote_cache, "time", clock)
+
+
+def cache_entry(send_amount: int = 1_000_000) -> dict:
+    quote = {"provider": "Hanpass", "exchange_rate": 18.52, "fee": 5000.0,
+             "recipient_gets": 18427400.0, "link": "https://www.hanpass.com/"}
+    return make_cache_entry(send_amount, build_response([quote]))
+
+
+def l2_gets(client) -> int:
+    return sum(1 for call in client.calls if call[0] == "get")
+
+
+def test_set_writes_l1_and_l2(redis_client):
+    backend = RedisCacheBackend(redis_client)
+    entry = cache_entry()
+    asyncio.run(backend.set(KEY, entry))
+
+    assert backend.peek(KEY) == entry
+    assert json.loads(redis_client.data[backend.prefix + KEY]) == entry
+    assert redis_client.expiries[backend.prefix + KEY] == math.ceil(CACHE_HARD_TTL)
+
+
+def test_get_reads_through_l2_into_l1(redis_client):
+    writer = RedisCacheBackend(redis_client)
+    reader = RedisCacheBackend(redis_client)
+    entry = cache_entry()
+    asyncio.run(writer.set(KEY, entry))
+
+    # Another worker: L1 miss, L2 hit, then served from its own L1
+    assert asyncio.run(reader.get(KEY)) == entry
+    assert reader.peek(KEY) == entry
+    assert asyncio.run(reader.get(KEY)) == entry
+    assert l2_gets(redis_client) == 1
+
+    counters = reader.counters()
+    assert counters["l1"]["hits"] == 1 and counters["l1"]["misses"] == 1
+    assert counters["l2"] == {"hits": 1, "misses": 0, "errors": 0}
+
+
+def test_get_miss_in_both_layers(redis_client):
+    backend = RedisCacheBackend(redis_client)
+    assert asyncio.run(backend.get(KEY)) is None
+    assert backend.get_stats()["l2_misses"] == 1
+    assert backend.peek(KEY) is None
+
+
+def test_fetched_at_survives_json_round_trip(redis_client, clock):
+    writer = RedisCacheBackend(redis_client)
+    entry = cache_entry()
+    asyncio.run(writer.set(KEY, entry))
+
+    clock.advance(CACHE_SOFT_TTL + 1)
+    read = asyncio.run(RedisCacheBackend(redis_client).get(KEY))
+
+    # Freshness comes from when the entry was fetched, not when it was read
+    assert read["fetched_at"] == entry["fetched_at"]
+    assert isinstance(read["fetched_at"], float)
+    assert is_stale(read)
+
+
+def test_l2_errors_fall_back_to_l1(broken_redis_client):
+    backend = RedisCacheBackend(broken_redis_client)
+    entry = cache_entry()
+    asyncio.run(backend.set(KEY, entry))
+
+    assert asyncio.run(backend.get(KEY)) == entry
+    assert asyncio.run(backend.get("nepal:NPR:1000000")) is None
+
+    stats = backend.get_stats()
+    assert stats["l2_errors"] == 2
+    assert stats["l1"]["hits"] == 1 and stats["l1"]["misses"] == 1
+
+
+def test_l2_recovers_after_errors(broken_redis_client):
+    backend = RedisCacheBackend(broken_redis_client)
+    assert asyncio.run(backend.get(KEY)) is None
+
+    broken_redis_client.fail = False
+    entry = cache_entry()
+    broken_redis_client.data[backend.prefix + KEY] = json.dumps(entry)
+    assert asyncio.run(backend.get(KEY)) == entry
+    assert backend.get_stats()["l2_errors"] == 1
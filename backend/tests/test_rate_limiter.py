@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+import rate_limiter
+from rate_limiter import InMemoryRateLimiter, RedisRateLimiter
+
+LIMIT = 10
+WINDOW = 60.0
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch, clock):
+    monkeypatch.setattr(rate_limiter, "time", clock)
+
+
+def hits(limiter, key: str, count: int) -> list:
+    async def run():
+        return [await limiter.hit(key) for _ in range(count)]
+    return asyncio.run(run())
+
+
+# --- InMemoryRateLimiter ---
+
+def test_memory_rejects_over_limit():
+    limiter = InMemoryRateLimiter(LIMIT, WINDOW)
+    assert hits(limiter, "1.2.3.4", LIMIT) == [True] * LIMIT
+    assert hits(limiter, "1.2.3.4", 3) == [False] * 3
+    # Other clients have their own counters
+    assert hits(limiter, "5.6.7.8", 1) == [True]
+
+
+def test_memory_rollover_weights_previous_window(clock):
+    limiter = InMemoryRateLimiter(LIMIT, WINDOW)
+    hits(limiter, "client", LIMIT)
+
+    # Halfway into the next window the full previous window still counts as 5
+    clock.advance(WINDOW * 1.5)
+    assert hits(limiter, "client", 6) == [True] * 5 + [False]
+
+
+def test_memory_rejected_hits_are_not_counted(clock):
+    limiter = InMemoryRateLimiter(LIMIT, WINDOW)
+    hits(limiter, "client", LIMIT + 20)
+
+    clock.advance(WINDOW * 1.5)
+    assert hits(limiter, "client", 6) == [True] * 5 + [False]
+
+
+def test_memory_resets_after_two_idle_windows(clock):
+    limiter = InMemoryRateLimiter(LIMIT, WINDOW)
+    hits(limiter, "client", LIMIT)
+
+    clock.advance(WINDOW * 2)
+    assert hits(limiter, "client", LIMIT) == [True] * LIMIT
+
+
+def test_memory_evicts_idle_keys(clock):
+    limiter = InMemoryRateLimiter(LIMIT, WINDOW)
+    hits(limiter, "idle", 1)
+    clock.advance(WINDOW)
+    hits(limiter, "active", 1)
+    assert limiter.get_stats()["tracked_keys"] == 2
+
+    clock.advance(WINDOW)
+    assert set(limiter.counters) == {"active"}
+    clock.advance(WINDOW)
+    assert limiter.get_stats()["tracked_keys"] == 0
+
+
+def test_memory_caps_tracked_keys():
+    limiter = InMemoryRateLimiter(LIMIT, WINDOW, max_keys=2)
+    for key in ("a", "b", "c"):
+        hits(limiter, key, 1)
+    assert limiter.get_stats()["tracked_keys"] == 2
+
+
+# --- RedisRateLimiter ---
+
+def test_redis_counts_are_shared_between_workers(redis_client):
+    first = RedisRateLimiter(redis_client, LIMIT, WINDOW)
+    second = RedisRateLimiter(redis_client, LIMIT, WINDOW)
+    assert hits(first, "client", 5) == [True] * 5
+    assert hits(second, "client", 5) == [True] * 5
+    assert hits(first, "client", 1) == [False]
+    assert first.backend_errors == second.backend_errors == 0
+
+
+def test_redis_rejected_hit_is_decremented(redis_client, clock):
+    limiter = RedisRateLimiter(redis_client, LIMIT, WINDOW)
+    hits(limiter, "client", LIMIT + 3)
+
+    window_key = f"{limiter.prefix}client:{int(clock.time() // WINDOW)}"
+    assert redis_client.data[window_key] == LIMIT
+    assert [call for call in redis_client.calls if call[0] == "decr"] == [("decr", window_key)] * 3
+    assert redis_client.expiries[window_key] == int(WINDOW * 2) + 1
+
+
+def test_redis_rollover_weights_previous_window(redis_client, clock):
+    limiter = RedisRateLimiter(redis_client, LIMIT, WINDOW)
+    hits(limiter, "client", LIMIT)
+
+    clock.advance(WINDOW * 1.5)
+    assert hits(limiter, "client", 6) == [True] * 5 + [False]
+
+
+def test_redis_falls_back_to_local_limiter(broken_redis_client):
+    limiter = RedisRateLimiter(broken_redis_client, LIMIT, WINDOW)
+    assert hits(limiter, "client", LIMIT + 1) == [True] * LIMIT + [False]
+
+    stats = limiter.get_stats()
+    assert stats["backend_errors"] == LIMIT + 1
+    assert stats["fallback"]["tracked_keys"] == 1
+
+
+def test_redis_recovers_after_backend_returns(broken_redis_client):
+    limiter = RedisRateLimiter(broken_redis_client, LIMIT, WINDOW)
+    hits(limiter, "client", 3)
+
+    broken_redis_client.fail = False
+    assert hits(limiter, "client", 1) == [True]
+    assert limiter.backend_errors == 3
+    assert broken_redis_client.calls[0][0] == "incr"
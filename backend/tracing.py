@@ -0,0 +1,263 @@
+"""
+Lightweight in-process request tracing.
+
+A trace is started per API request (see `traced`) and held in a context
+variable, so it follows the request into the fan-out and provider tasks
+(asyncio tasks copy the context they were created in). `span(name)` records
+a timed section under the current span; outside a trace it is a no-op.
+
+The aiohttp TraceConfig from `trace_config()` is attached to the pooled
+sessions and records each upstream request with its connection phases
+(waiting for a pool slot, DNS, connect incl. TLS / proxy CONNECT) under the
+span that issued it, e.g. the provider span.
+
+Spans marked `timing=True` are reported in the request's Server-Timing
+header. Traces slower than TRACE_SLOW_THRESHOLD seconds are kept in a
+bounded ring buffer for /debug/traces.
+"""
+
+import os
+import re
+import time
+import uuid
+import functools
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import aiohttp
+
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+TRACE_SLOW_THRESHOLD = float(os.getenv('TRACE_SLOW_THRESHOLD', '1.5'))
+TRACE_BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', '100'))
+# Spans beyond this are counted but not recorded
+TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', '256'))
+
+
+class Span:
+    __slots__ = ("span_id", "name", "parent_id", "start", "end", "attrs", "timing")
+
+    def __init__(self, span_id: int, name: str, parent_id: Optional[int], start: float, attrs: Dict, timing: bool):
+        self.span_id = span_id
+        self.name = name
+        self.parent_id = parent_id
+        self.start = start
+        self.end: Optional[float] = None
+        self.attrs = attrs
+        self.timing = timing
+
+    def to_dict(self, origin: float) -> Dict:
+        return {
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 1),
+            "duration_ms": round((self.end - self.start) * 1000, 1) if self.end is not None else None,
+            **({"attrs": self.attrs} if self.attrs else {}),
+        }
+
+
+class Trace:
+    def __init__(self, name: str, max_spans: int = TRACE_MAX_SPANS):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.end is not None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def open_span(self, name: str, parent_id: Optional[int], attrs: Dict = None, timing: bool = False) -> Optional[Span]:
+        # Work outliving the request (e.g. a background refresh) is not recorded
+        if self.finished:
+            return None
+        if len(self.spans) >= self.max_spans:
+            self.dropped_spans += 1
+            return None
+        span = Span(len(self.spans), name, parent_id, time.perf_counter(), attrs or {}, timing)
+        self.spans.append(span)
+        return span
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: total plus the longest span per timing name."""
+        durations: Dict[str, float] = {}
+        for span in self.spans:
+            if span.timing and span.end is not None:
+                durations[span.name] = max(durations.get(span.name, 0.0), span.end - span.start)
+        entries = [f"total;dur={self.duration * 1000:.1f}"]
+        entries.extend(
+            f"{re.sub(r'[^A-Za-z0-9_-]', '_', name)};dur={duration * 1000:.1f}"
+            for name, duration in durations.items()
+        )
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(timespec='milliseconds'),
+            "duration_ms": round(self.duration * 1000, 1),
+            "dropped_spans": self.dropped_spans,
+            "spans": [span.to_dict(self.start) for span in self.spans],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[int]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    def __init__(self,
+                 enabled: bool = TRACING_ENABLED,
+                 slow_threshold: float = TRACE_SLOW_THRESHOLD,
+                 buffer_size: int = TRACE_BUFFER_SIZE):
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.slow_traces: deque = deque(maxlen=buffer_size)
+        self.traces = 0
+        self.slow_count = 0
+
+    def current(self) -> Optional[Trace]:
+        return _current_trace.get()
+
+    @contextmanager
+    def trace(self, name: str):
+        """Trace the enclosed block as one request (yields None when tracing is disabled)."""
+        if not self.enabled:
+            yield None
+            return
+        trace = Trace(name)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(None)
+        try:
+            yield trace
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            self._finish(trace)
+
+    def _finish(self, trace: Trace):
+        trace.end = time.perf_counter()
+        self.traces += 1
+        if trace.duration >= self.slow_threshold:
+            self.slow_count += 1
+            self.slow_traces.append(trace)
+
+    @contextmanager
+    def span(self, name: str, timing: bool = False, **attrs):
+        """Record the enclosed block as a child of the current span."""
+        trace = _current_trace.get()
+        span = trace.open_span(name, _current_span.get(), attrs, timing) if trace is not None else None
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span.span_id)
+        try:
+            yield span
+        except BaseException as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+
+    def traced(self, name: str):
+        """
+        Decorator for an endpoint: traces each call and, if the endpoint takes
+        a `response: Response` parameter, sets its Server-Timing header.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.trace(name) as trace:
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        response = kwargs.get("response")
+                        if trace is not None and response is not None:
+                            response.headers["Server-Timing"] = trace.server_timing()
+            return wrapper
+        return decorator
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """aiohttp hooks recording upstream requests and their connection phases."""
+        config = aiohttp.TraceConfig()
+
+        def phase(name: str):
+            async def on_start(session, ctx, params):
+                trace = _current_trace.get()
+                request_span = getattr(ctx, "request_span", None)
+                if trace is not None and request_span is not None:
+                    setattr(ctx, name, trace.open_span(name, request_span.span_id))
+
+            async def on_end(session, ctx, params):
+                span = getattr(ctx, name, None)
+                if span is not None:
+                    span.end = time.perf_counter()
+            return on_start, on_end
+
+        async def on_request_start(session, ctx, params):
+            trace = _current_trace.get()
+            ctx.request_span = trace.open_span(
+                "http", _current_span.get(), {"method": params.method, "host": params.url.host}
+            ) if trace is not None else None
+
+        async def on_request_end(session, ctx, params):
+            span = ctx.request_span
+            if span is not None:
+                span.end = time.perf_counter()
+                span.attrs["status"] = params.response.status
+
+        async def on_request_exception(session, ctx, params):
+            span = ctx.request_span
+            if span is not None:
+                span.end = time.perf_counter()
+                span.attrs["error"] = type(params.exception).__name__
+
+        async def on_connection_reuseconn(session, ctx, params):
+            span = getattr(ctx, "request_span", None)
+            if span is not None:
+                span.attrs["reused_connection"] = True
+
+        config.on_request_start.append(on_request_start)
+        config.on_request_end.append(on_request_end)
+        config.on_request_exception.append(on_request_exception)
+        config.on_connection_reuseconn.append(on_connection_reuseconn)
+        for name, start_signal, end_signal in (
+            ("queued", config.on_connection_queued_start, config.on_connection_queued_end),
+            ("dns", config.on_dns_resolvehost_start, config.on_dns_resolvehost_end),
+            ("connect", config.on_connection_create_start, config.on_connection_create_end),
+        ):
+            on_start, on_end = phase(name)
+            start_signal.append(on_start)
+            end_signal.append(on_end)
+        return config
+
+    def recent_slow(self, limit: int = 20) -> List[Dict]:
+        """Most recent slow traces first."""
+        return [trace.to_dict() for trace in list(self.slow_traces)[::-1][:limit]]
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "slow_threshold_seconds": self.slow_threshold,
+            "traces": self.traces,
+            "slow_traces": self.slow_count,
+            "buffered": len(self.slow_traces),
+            "buffer_size": self.slow_traces.maxlen,
+        }
+
+
+# Global tracer
+tracer = Tracer()
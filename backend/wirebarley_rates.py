@@ -0,0 +1,203 @@
+"""
+Wirebarley rate table cache.
+
+Wirebarley publishes one `/exrate/KR/KRW` table that covers every country,
+currency and amount. The table is downloaded once per refresh interval and
+compiled into a (country, currency) index with sorted tier arrays, so quotes
+for any route or amount are computed locally with a bisect lookup.
+
+Downloads run as a background task under their own timeout: quotes keep
+using the current table while it refreshes, and only the very first load
+is waited for.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from parsers import parse_wirebarley_rates
+from providers import upstream_url
+
+logger = logging.getLogger(__name__)
+
+WIREBARLEY_RATE_URL = "https://www.wirebarley.com/my/remittance/api/v1/exrate/KR/KRW"
+WIREBARLEY_HEADERS = {
+    'Accept': '*/*',
+    'Content-Type': 'application/json',
+    'Referer': 'https://www.wirebarley.com/',
+    'device-type': 'WEB',
+    'device-model': 'Safari',
+    'device-version': '604.1',
+    'lang': 'ko'
+}
+
+# Seconds between table downloads
+WIREBARLEY_REFRESH_INTERVAL = float(os.getenv('WIREBARLEY_REFRESH_INTERVAL', '60'))
+# A table older than this is dropped if refreshes keep failing
+WIREBARLEY_MAX_STALE = float(os.getenv('WIREBARLEY_MAX_STALE', '600'))
+# Time limit for one table download, independent of any quote's deadline
+WIREBARLEY_REFRESH_TIMEOUT = float(os.getenv('WIREBARLEY_REFRESH_TIMEOUT', '10'))
+# Wait before retrying a failed download
+WIREBARLEY_RETRY_DELAY = 5.0
+
+
+@dataclass
+class WirebarleyRoute:
+    """Precompiled rate tiers and transfer fees for one (country, currency)."""
+    base_rate: float
+    override_rate: Optional[float] = None
+    # Sorted tier thresholds and the rate in effect from each threshold upward
+    tier_thresholds: List[float] = field(default_factory=list)
+    tier_rates: List[float] = field(default_factory=list)
+    # transferFees ranges sorted by 'min': (min, max, threshold1, fee1, fee2)
+    fee_mins: List[float] = field(default_factory=list)
+    fee_ranges: List[Tuple] = field(default_factory=list)
+
+    @classmethod
+    def from_ex_rate(cls, ex_rate: Dict) -> "WirebarleyRoute":
+        wb_rate_data = ex_rate.get('wbRateData', {}) or {}
+
+        # threshold1..8 are applied in order and the last satisfied one wins,
+        # so for each sorted threshold keep the rate of the highest tier index
+        # reached so far.
+        tiers = []
+        for i in range(1, 9):
+            threshold = wb_rate_data.get(f'threshold{i}')
+            if threshold and f'wbRate{i}' in wb_rate_data:
+                tiers.append((threshold, i, wb_rate_data[f'wbRate{i}']))
+        tiers.sort(key=lambda tier: tier[0])
+
+        tier_thresholds, tier_rates = [], []
+        best_index, best_rate = 0, None
+        for threshold, index, rate in tiers:
+            if index > best_index:
+                best_index, best_rate = index, rate
+            tier_thresholds.append(threshold)
+            tier_rates.append(best_rate)
+
+        # Fee ranges are assumed not to overlap
+        fee_ranges = sorted(
+            (
+                (
+                    fee_info.get('min', 0),
+                    fee_info.get('max', float('inf')),
+                    fee_info.get('threshold1'),
+                    fee_info.get('fee1', 0) or 0,
+                    fee_info.get('fee2', 0) or 0,
+                )
+                for fee_info in ex_rate.get('transferFees', []) or []
+            ),
+            key=lambda fee_range: fee_range[0]
+        )
+
+        return cls(
+            base_rate=wb_rate_data.get('wbRate', 0),
+            override_rate=wb_rate_data.get('wbRate9') or None,
+            tier_thresholds=tier_thresholds,
+            tier_rates=tier_rates,
+            fee_mins=[fee_range[0] for fee_range in fee_ranges],
+            fee_ranges=fee_ranges,
+        )
+
+    def rate_for(self, send_amount: float) -> float:
+        """Exchange rate for the send amount."""
+        # wbRate9 is usually the highest tier rate
+        if self.override_rate:
+            return self.override_rate
+        position = bisect_right(self.tier_thresholds, send_amount)
+        if position:
+            return self.tier_rates[position - 1]
+        return self.base_rate
+
+    def fee_for(self, send_amount: float) -> float:
+        """Transfer fee for the send amount (transferFees, matches website)."""
+        position = bisect_right(self.fee_mins, send_amount)
+        if not position:
+            return 0
+        _, max_amount, threshold1, fee1, fee2 = self.fee_ranges[position - 1]
+        if send_amount > max_amount:
+            return 0
+        if threshold1 and send_amount >= threshold1:
+            return fee2  # Usually 0 for amounts >= 500,000₩
+        return fee1  # Usually 5,000₩ for smaller amounts
+
+
+def compile_routes(ex_rates: List[Dict]) -> Dict[Tuple[str, str], WirebarleyRoute]:
+    """(country, currency) -> compiled route for a raw `exRates` list."""
+    routes = {}
+    for ex_rate in ex_rates:
+        key = (ex_rate.get('country'), ex_rate.get('currency'))
+        # Keep the first entry per route, as the linear scan did
+        if key not in routes:
+            routes[key] = WirebarleyRoute.from_ex_rate(ex_rate)
+    return routes
+
+
+class WirebarleyRateTable:
+    """Periodically refreshed, indexed copy of the Wirebarley rate table."""
+
+    def __init__(self,
+                 refresh_interval: float = WIREBARLEY_REFRESH_INTERVAL,
+                 max_stale: float = WIREBARLEY_MAX_STALE):
+        self.refresh_interval = refresh_interval
+        self.max_stale = max_stale
+        self.routes: Dict[Tuple[str, str], WirebarleyRoute] = {}
+        self.fetched_at = 0.0
+        self.retry_after = 0.0
+        self.refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def is_expired(self) -> bool:
+        return time.time() - self.fetched_at >= self.refresh_interval
+
+    async def get_route(self, session: aiohttp.ClientSession, country_code: str, currency: str) -> Optional[WirebarleyRoute]:
+        """Look up a route, refreshing an expired table in the background."""
+        if self.is_expired() and time.time() >= self.retry_after:
+            task = self.start_refresh(session)
+            if not self.routes:
+                # Nothing to serve yet; a cancelled caller leaves the download running
+                await asyncio.shield(task)
+        return self.routes.get((country_code, currency))
+
+    def start_refresh(self, session: aiohttp.ClientSession) -> asyncio.Task:
+        """Start a background refresh unless one is already running."""
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_task = asyncio.create_task(self.refresh(session))
+        return self.refresh_task
+
+    async def refresh(self, session: aiohttp.ClientSession):
+        """Download and recompile the table (one download at a time)."""
+        async with self._lock:
+            # Another request refreshed the table while we waited
+            if not self.is_expired() or time.time() < self.retry_after:
+                return
+
+            try:
+                async with session.get(upstream_url(WIREBARLEY_RATE_URL), headers=WIREBARLEY_HEADERS,
+                                       timeout=aiohttp.ClientTimeout(total=WIREBARLEY_REFRESH_TIMEOUT)) as response:
+                    if response.status != 200:
+                        raise ValueError(f"status {response.status}")
+                    text = await response.text()
+
+                self.load(parse_wirebarley_rates(text))
+            except Exception as e:
+                self.retry_after = time.time() + WIREBARLEY_RETRY_DELAY
+                logger.warning(f"Wirebarley rate table refresh failed: {type(e).__name__} - {e}")
+                if time.time() - self.fetched_at > self.max_stale:
+                    self.routes = {}
+
+    def load(self, ex_rates: List[Dict]):
+        """Compile a raw `exRates` list into the route index."""
+        self.routes = compile_routes(ex_rates)
+        self.fetched_at = time.time()
+        logger.info(f"Wirebarley rate table refreshed ({len(self.routes)} routes)")
+
+
+# Global Wirebarley rate table
+wirebarley_rate_table = WirebarleyRateTable()